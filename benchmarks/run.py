@@ -0,0 +1,433 @@
+"""
+认证与用户接口基准测试
+
+默认通过 create_app('testing') 的测试客户端在进程内运行，也可以启动真实的 gunicorn。
+结果写入JSON文件，并可与基线对比，超过阈值时以非零状态码退出。
+
+用法:
+    python -m benchmarks.run --users 10000 --output bench.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+    python -m benchmarks.run --gunicorn --workers 4 --concurrency 16
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+
+from benchmarks.seed import SEED_PASSWORD, seed_users
+
+# 预先生成Token的用户数量
+TOKEN_USERS = 50
+# 大页列表场景的每页数量
+LARGE_PAGE = 10000
+
+
+class Scenario:
+    """基准场景"""
+
+    def __init__(self, name, method, build, requests):
+        """
+        Args:
+            name: 场景名称
+            method: HTTP方法
+            build: 回调 (ctx, i) -> (path, headers, json_body)
+            requests: 默认请求数
+        """
+        self.name = name
+        self.method = method
+        self.build = build
+        self.requests = requests
+
+
+def _auth(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _build_login(ctx, i):
+    user_id = random.choice(ctx['user_ids'])
+    return '/api/auth/login', {}, {'username': f'bench{user_id - 1}', 'password': SEED_PASSWORD}
+
+
+def _build_refresh(ctx, i):
+    user_id = random.choice(ctx['token_user_ids'])
+    # POST请求需要JSON的Content-Type才能通过内容类型校验
+    return '/api/auth/refresh', _auth(ctx['refresh_tokens'][user_id]), {}
+
+
+def _build_me(ctx, i):
+    user_id = random.choice(ctx['token_user_ids'])
+    return '/api/auth/me', _auth(ctx['access_tokens'][user_id]), None
+
+
+def _build_get_users(ctx, i):
+    user_id = random.choice(ctx['token_user_ids'])
+    per_page = ctx['per_page']
+    pages = max(1, len(ctx['user_ids']) // per_page)
+    page = random.randint(1, pages)
+    return f'/api/users?page={page}&per_page={per_page}', _auth(ctx['access_tokens'][user_id]), None
+
+
+def _build_get_users_10k(ctx, i):
+    # 大页列表（每页10000行），衡量单行序列化开销
+    user_id = random.choice(ctx['token_user_ids'])
+    pages = max(1, len(ctx['user_ids']) // LARGE_PAGE)
+    page = random.randint(1, pages)
+    return f'/api/users?page={page}&per_page={LARGE_PAGE}', _auth(ctx['access_tokens'][user_id]), None
+
+
+def _build_get_user(ctx, i):
+    user_id = random.choice(ctx['token_user_ids'])
+    target = random.choice(ctx['user_ids'])
+    return f'/api/users/{target}', _auth(ctx['access_tokens'][user_id]), None
+
+
+def _build_update_user(ctx, i):
+    user_id = random.choice(ctx['token_user_ids'])
+    body = {'email': f'bench{user_id - 1}.{i}@example.org'}
+    return f'/api/users/{user_id}', _auth(ctx['access_tokens'][user_id]), body
+
+
+# 登录包含bcrypt校验，默认请求数更少
+SCENARIOS = [
+    Scenario('login', 'POST', _build_login, 20),
+    Scenario('refresh', 'POST', _build_refresh, 200),
+    Scenario('me', 'GET', _build_me, 200),
+    Scenario('get_users', 'GET', _build_get_users, 200),
+    Scenario('get_users_10k', 'GET', _build_get_users_10k, 10),
+    Scenario('get_user', 'GET', _build_get_user, 200),
+    Scenario('update_user', 'PUT', _build_update_user, 200),
+]
+
+
+class TestClientTransport:
+    """进程内测试客户端"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, headers, body):
+        response = self.client.open(path, method=method, headers=headers, json=body)
+        return response.status_code
+
+
+class HttpTransport:
+    """真实HTTP客户端（用于gunicorn模式）"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def request(self, method, path, headers, body):
+        data = None
+        headers = dict(headers)
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def percentile(sorted_values, pct):
+    """
+    计算百分位（最近秩法）
+
+    Args:
+        sorted_values: 已排序的数值列表
+        pct: 百分位（0~100）
+
+    Returns:
+        百分位值
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def run_scenario(scenario, transport, ctx, requests, concurrency=1, query_counter=None):
+    """
+    运行单个场景
+
+    Returns:
+        结果字典
+    """
+    latencies = []
+    errors = 0
+    queries_before = query_counter['count'] if query_counter else 0
+
+    def one(i):
+        path, headers, body = scenario.build(ctx, i)
+        started = time.perf_counter()
+        status = transport.request(scenario.method, path, headers, body)
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(requests)))
+    else:
+        results = [one(i) for i in range(requests)]
+    elapsed = time.perf_counter() - started
+
+    for latency, status in results:
+        latencies.append(latency * 1000)
+        if status >= 400:
+            errors += 1
+
+    latencies.sort()
+    result = {
+        'requests': requests,
+        'errors': errors,
+        'throughput_rps': round(requests / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries_per_request': None
+    }
+    if query_counter is not None:
+        result['queries_per_request'] = round((query_counter['count'] - queries_before) / requests, 2)
+    return result
+
+
+def build_context(app, users, per_page):
+    """
+    填充数据并预先生成Token
+
+    Returns:
+        场景上下文
+    """
+    from flask_jwt_extended import create_access_token, create_refresh_token
+    from flaskr.extensions import db
+
+    with app.app_context():
+        db.create_all()
+        seed_users(users)
+        user_ids = list(range(1, users + 1))
+        token_user_ids = user_ids[:TOKEN_USERS]
+        return {
+            'user_ids': user_ids,
+            'token_user_ids': token_user_ids,
+            'per_page': per_page,
+            'access_tokens': {uid: create_access_token(identity=uid) for uid in token_user_ids},
+            'refresh_tokens': {uid: create_refresh_token(identity=uid) for uid in token_user_ids},
+        }
+
+
+def create_bench_app():
+    """创建关闭速率限制的测试应用（gunicorn模式下作为应用工厂）"""
+    from flaskr import create_app
+    from flaskr.extensions import limiter
+
+    app = create_app('testing')
+    # 基准测试需要远超速率限制的请求量
+    limiter.enabled = False
+    return app
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(proc, port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'gunicorn 启动失败，退出码 {proc.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn 未在 {timeout}s 内启动')
+
+
+def run_benchmarks(args):
+    """
+    运行所有选中的场景
+
+    Returns:
+        报告字典
+    """
+    selected = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+    gunicorn_proc = None
+    tmp_dir = None
+
+    if args.gunicorn:
+        # 多进程共享数据，需要使用文件数据库
+        tmp_dir = tempfile.TemporaryDirectory()
+        os.environ.setdefault('TEST_DATABASE_URL', f'sqlite:///{tmp_dir.name}/bench.db')
+
+    app = create_bench_app()
+    ctx = build_context(app, args.users, args.per_page)
+
+    query_counter = None
+    if args.gunicorn:
+        port = _free_port()
+        # 使用项目的 gunicorn.conf.py（包括钩子），仅把日志和pid文件重定向到临时位置
+        env = dict(os.environ)
+        env.update({
+            'GUNICORN_ERROR_LOG': '-',
+            'GUNICORN_ACCESS_LOG': os.devnull,
+            'GUNICORN_PIDFILE': os.path.join(tmp_dir.name, 'gunicorn.pid'),
+            'GUNICORN_LOG_LEVEL': 'warning',
+        })
+        gunicorn_proc = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn',
+                '--config', 'gunicorn.conf.py',
+                '--workers', str(args.workers),
+                '--bind', f'127.0.0.1:{port}',
+                'benchmarks.run:create_bench_app()'
+            ],
+            env=env
+        )
+        _wait_for_port(gunicorn_proc, port)
+        transport = HttpTransport(f'http://127.0.0.1:{port}')
+    else:
+        from flaskr.extensions import db
+
+        transport = TestClientTransport(app)
+        query_counter = {'count': 0}
+        with app.app_context():
+            engine = db.engine
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def count_query(*_):
+            query_counter['count'] += 1
+
+    results = {}
+    try:
+        for scenario in selected:
+            requests = args.requests or scenario.requests
+            # 预热，不计入结果
+            run_scenario(scenario, transport, ctx, min(5, requests), args.concurrency)
+            results[scenario.name] = run_scenario(
+                scenario, transport, ctx, requests, args.concurrency, query_counter
+            )
+            print(f"{scenario.name:<12} {results[scenario.name]}")
+    finally:
+        if gunicorn_proc is not None:
+            gunicorn_proc.terminate()
+            gunicorn_proc.wait(timeout=30)
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    return {
+        'meta': {
+            'mode': 'gunicorn' if args.gunicorn else 'test_client',
+            'users': args.users,
+            'per_page': args.per_page,
+            'concurrency': args.concurrency,
+            'python': platform.python_version(),
+            'timestamp': int(time.time())
+        },
+        'results': results
+    }
+
+
+def compare_with_baseline(report, baseline, threshold):
+    """
+    与基线对比
+
+    Args:
+        report: 本次结果
+        baseline: 基线结果
+        threshold: 允许的相对退化比例（0.2 表示 20%）
+
+    Returns:
+        退化描述列表
+    """
+    regressions = []
+    for name, current in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+
+        if base['p99_ms'] and current['p99_ms'] > base['p99_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p99 {base['p99_ms']}ms -> {current['p99_ms']}ms")
+
+        if base['throughput_rps'] and current['throughput_rps'] < base['throughput_rps'] * (1 - threshold):
+            regressions.append(
+                f"{name}: 吞吐量 {base['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+
+        # 查询次数是确定性的，任何增加都视为退化
+        base_queries = base.get('queries_per_request')
+        current_queries = current.get('queries_per_request')
+        if base_queries is not None and current_queries is not None and current_queries > base_queries:
+            regressions.append(f"{name}: 每请求查询数 {base_queries} -> {current_queries}")
+
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='认证与用户接口基准测试')
+    parser.add_argument('--users', type=int, default=1000, help='填充的用户数量')
+    parser.add_argument('--per-page', type=int, default=10, help='列表接口每页数量')
+    parser.add_argument('--requests', type=int, default=0, help='每个场景的请求数（默认按场景设置）')
+    parser.add_argument('--scenarios', nargs='*', help='只运行指定场景')
+    parser.add_argument('--concurrency', type=int, default=1, help='并发数（gunicorn模式下有效）')
+    parser.add_argument('--gunicorn', action='store_true', help='启动真实gunicorn进行测试')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn工作进程数')
+    parser.add_argument('--output', default='bench_output.json', help='结果输出文件')
+    parser.add_argument('--baseline', help='基线结果文件')
+    parser.add_argument('--threshold', type=float, default=0.2, help='允许的退化比例')
+    parser.add_argument('--save-baseline', action='store_true', help='将本次结果保存为基线')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.gunicorn:
+        # 测试客户端与内存SQLite不是线程安全的
+        args.concurrency = 1
+
+    report = run_benchmarks(args)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'结果已写入 {args.output}')
+
+    if args.baseline:
+        if args.save_baseline:
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f'基线已保存到 {args.baseline}')
+            return 0
+
+        if not os.path.exists(args.baseline):
+            print(f'基线文件 {args.baseline} 不存在，跳过对比（可先运行 make bench-baseline 生成）')
+            return 0
+
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.threshold)
+        if regressions:
+            print('性能退化:')
+            for item in regressions:
+                print(f'  - {item}')
+            return 1
+        print('未发现性能退化')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+基准测试数据填充
+"""
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from flaskr.extensions import db
+from flaskr.models.user import User
+
+# 所有种子用户共用的明文密码
+SEED_PASSWORD = 'benchpass123'
+
+
+def seed_users(count, chunk_size=5000):
+    """
+    批量写入测试用户（需要在应用上下文中调用）
+
+    只计算一次bcrypt哈希，所有用户共用，避免填充耗时被哈希主导。
+
+    Args:
+        count: 用户数量
+        chunk_size: 每批插入的行数
+
+    Returns:
+        写入的用户数量
+    """
+    template = User()
+    template.set_password(SEED_PASSWORD)
+    password_hash = template.password_hash
+    now = datetime.utcnow()
+
+    for start in range(0, count, chunk_size):
+        rows = [
+            {
+                'username': f'bench{i}',
+                'email': f'bench{i}@example.com',
+                'password_hash': password_hash,
+                'created_at': now,
+                'updated_at': now,
+                'is_active': True
+            }
+            for i in range(start, min(start + chunk_size, count))
+        ]
+        db.session.execute(insert(User), rows)
+        db.session.commit()
+
+    return count
@@ -15,7 +15,35 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
                               'sqlite:///flaskr.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_RECORD_QUERIES = True
+    # 记录每条查询的开销较大，只在开发环境开启；生产环境使用慢查询日志
+    SQLALCHEMY_RECORD_QUERIES = False
+    # 慢查询日志：超过阈值或按采样率命中的查询记录规范化语句、耗时、路由，后台线程获取执行计划
+    SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '200'))
+    SLOW_QUERY_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_SAMPLE_RATE', '0'))
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+    # 慢查询日志文件（JSON Lines），flask slow-queries report 从该文件汇总；相对路径按 instance 目录解析
+    SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE', 'slow_queries.jsonl')
+    # 异步视图使用的数据库URL；未设置且 ASYNC_ENGINE_ENABLED 开启时由 SQLALCHEMY_DATABASE_URI 推导
+    # （sqlite -> sqlite+aiosqlite，postgresql -> postgresql+asyncpg），否则异步视图回退到同步引擎
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+    # 异步视图是否使用独立的 AsyncEngine（开启后连接预算由两个引擎平分）
+    ASYNC_ENGINE_ENABLED = os.environ.get('ASYNC_ENGINE_ENABLED', 'false').lower() == 'true'
+    ASYNC_ENGINE_OPTIONS = {}
+    # gunicorn 工作进程接收流量前预先建立的数据库连接数
+    DB_POOL_WARM_CONNECTIONS = int(os.environ.get('DB_POOL_WARM_CONNECTIONS', '1'))
+
+    # 工作进程内存看门狗（gunicorn post_request 钩子中检查，均为0时不启用）
+    # RSS超过上限（MB，每个进程带随机抖动）或增长速度超过阈值（MB/分钟）时优雅回收工作进程
+    MEMORY_CEILING_MB = int(os.environ.get('MEMORY_CEILING_MB', '0'))
+    MEMORY_CEILING_JITTER = float(os.environ.get('MEMORY_CEILING_JITTER', '0.1'))
+    MEMORY_GROWTH_MB_PER_MIN = float(os.environ.get('MEMORY_GROWTH_MB_PER_MIN', '0'))
+    MEMORY_GROWTH_WINDOW_SECONDS = int(os.environ.get('MEMORY_GROWTH_WINDOW_SECONDS', '300'))
+    MEMORY_CHECK_INTERVAL_REQUESTS = int(os.environ.get('MEMORY_CHECK_INTERVAL_REQUESTS', '10'))
+    # 单机两次回收之间的最小间隔（秒），通过共享状态文件协调，避免多个进程同时重启
+    MEMORY_RECYCLE_MIN_INTERVAL = int(os.environ.get('MEMORY_RECYCLE_MIN_INTERVAL', '30'))
+    # 共享回收状态文件，默认为 instance 目录下的 memory-recycle.json
+    MEMORY_RECYCLE_STATE_FILE = os.environ.get('MEMORY_RECYCLE_STATE_FILE')
 
     # JWT配置
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or SECRET_KEY
@@ -25,6 +53,12 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
     # Refresh Token过期时间（7天）
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
+    # 每个用户最多保留的有效刷新token数（签发新token时在同一事务中删除最旧的与已失效的），0表示不限制
+    MAX_ACTIVE_REFRESH_TOKENS = int(os.environ.get('MAX_ACTIVE_REFRESH_TOKENS', '5'))
+    # 刷新token查找结果的进程内缓存时间（秒），0表示不缓存
+    REFRESH_TOKEN_CACHE_TTL = int(os.environ.get('REFRESH_TOKEN_CACHE_TTL', '5'))
+    # 按摘要找不到时是否再按旧版原文列查找（原文列没有索引，只在升级期间旧版本实例仍在签发token时开启）
+    REFRESH_TOKEN_LEGACY_LOOKUP = os.environ.get('REFRESH_TOKEN_LEGACY_LOOKUP', 'false').lower() == 'true'
     # Token在header中的位置
     JWT_TOKEN_LOCATION = ['headers']
     JWT_HEADER_NAME = 'Authorization'
@@ -33,12 +67,116 @@ class Config:
     # 认证安全配置
     MAX_LOGIN_ATTEMPTS = int(os.environ.get('MAX_LOGIN_ATTEMPTS', '5'))
     LOCKOUT_DURATION_MINUTES = int(os.environ.get('LOCKOUT_DURATION_MINUTES', '30'))
+    # 登录暴力破解限流：窗口为锁定时长，用户名/IP的失败阈值为 MAX_LOGIN_ATTEMPTS 的倍数
+    LOGIN_THROTTLE_ENABLED = os.environ.get('LOGIN_THROTTLE_ENABLED', 'true').lower() == 'true'
+    LOGIN_THROTTLE_USERNAME_FACTOR = int(os.environ.get('LOGIN_THROTTLE_USERNAME_FACTOR', '2'))
+    LOGIN_THROTTLE_IP_FACTOR = int(os.environ.get('LOGIN_THROTTLE_IP_FACTOR', '20'))
+    LOGIN_THROTTLE_SLOTS = int(os.environ.get('LOGIN_THROTTLE_SLOTS', '65536'))
+    # 同一台机器上的工作进程通过共享内存文件共享计数，默认 instance/login-throttle.bin；关闭时各进程分别计数
+    LOGIN_THROTTLE_SHARED = os.environ.get('LOGIN_THROTTLE_SHARED', 'true').lower() == 'true'
+    LOGIN_THROTTLE_FILE = os.environ.get('LOGIN_THROTTLE_FILE')
+    # 客户端与应用之间的可信反向代理层数（如 nginx 为1），用于从 X-Forwarded-For 取真实客户端IP；0 表示不信任转发头
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', '0'))
+    # 异步视图中bcrypt线程池大小（默认CPU核数）
+    ASYNC_PASSWORD_WORKERS = int(os.environ.get('ASYNC_PASSWORD_WORKERS', '0')) or None
 
     # 分页配置
     POSTS_PER_PAGE = 10
+    # 列表总数的统计策略：exact（每次 COUNT(*)）、cached（进程内缓存 COUNT_CACHE_TTL 秒，注册/删除用户时失效）、
+    # estimated（PostgreSQL reltuples / SQLite sqlite_stat1，估算值小于 COUNT_EXACT_BELOW 时精确计数）
+    COUNT_STRATEGY = os.environ.get('COUNT_STRATEGY', 'exact').lower()
+    COUNT_CACHE_TTL = int(os.environ.get('COUNT_CACHE_TTL', '60'))
+    COUNT_EXACT_BELOW = int(os.environ.get('COUNT_EXACT_BELOW', '10000'))
 
     # CORS配置
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
 
     # 日志配置
     LOG_TO_STDOUT = os.environ.get('LOG_TO_STDOUT')
+    # 错误日志聚合限流（404/405/406/429），窗口内相同 (状态码, 路由, IP) 只输出一次并汇总计数
+    ERROR_LOG_THROTTLE_ENABLED = os.environ.get('ERROR_LOG_THROTTLE_ENABLED', 'true').lower() == 'true'
+    ERROR_LOG_THROTTLE_WINDOW = int(os.environ.get('ERROR_LOG_THROTTLE_WINDOW', '60'))
+    ERROR_LOG_THROTTLE_MAX_KEYS = int(os.environ.get('ERROR_LOG_THROTTLE_MAX_KEYS', '10000'))
+
+    # 按需请求分析（cProfile）
+    # 开启后，携带有效 X-Profile-Token 签名头的请求或按采样率命中的请求会被分析
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_SECRET = os.environ.get('PROFILER_SECRET')
+    PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', '0'))
+    PROFILER_OUTPUT_DIR = os.environ.get('PROFILER_OUTPUT_DIR', 'profiles')
+
+    # 准入控制：按排队时间（上游 X-Request-Start 请求头）与进程内并发数，过载时优先拒绝低优先级请求
+    ADMISSION_CONTROL_ENABLED = os.environ.get('ADMISSION_CONTROL_ENABLED', 'true').lower() == 'true'
+    # 单进程最大并发数，0 表示与 GUNICORN_THREADS 一致（低优先级请求只能占用一半）
+    ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', '0'))
+    # 各优先级允许的最大排队时间（毫秒），0表示不限制
+    ADMISSION_LOW_QUEUE_MS = int(os.environ.get('ADMISSION_LOW_QUEUE_MS', '1000'))
+    ADMISSION_NORMAL_QUEUE_MS = int(os.environ.get('ADMISSION_NORMAL_QUEUE_MS', '5000'))
+    ADMISSION_CRITICAL_QUEUE_MS = int(os.environ.get('ADMISSION_CRITICAL_QUEUE_MS', '15000'))
+    ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', '1'))
+    # 低优先级（列表、搜索、文档）与关键（认证、健康检查）端点，其余为普通优先级
+    ADMISSION_LOW_PRIORITY_ENDPOINTS = ['get_users_route', 'search_users_route', 'docs_route', 'index_route']
+    ADMISSION_CRITICAL_ENDPOINTS = [
+        'login_route', 'refresh_route', 'register_route', 'logout_route', 'me_route',
+        'login_async_route', 'refresh_async_route', 'register_async_route', 'me_async_route',
+        'health_check_route', 'get_metrics_route'
+    ]
+
+    # 请求处理时间预算（毫秒），应小于 gunicorn 的 timeout，超时请求快速返回503；0表示不限制
+    REQUEST_DEADLINE_MS = int(os.environ.get('REQUEST_DEADLINE_MS', '10000'))
+    # 按路由覆盖预算，格式 "login_route=3000,get_users_route=2000"（优先于 @deadline 装饰器）
+    ROUTE_DEADLINES_MS = {
+        name.strip(): int(ms)
+        for name, _, ms in (
+            item.partition('=') for item in os.environ.get('ROUTE_DEADLINES_MS', '').split(',') if '=' in item
+        )
+    }
+
+    # 数据库熔断：请求中连续 CIRCUIT_BREAKER_FAILURE_THRESHOLD 次连接失败后熔断，
+    # 熔断期间依赖数据库的请求直接返回503，CIRCUIT_BREAKER_RESET_TIMEOUT 秒后放行一个探测请求
+    # CIRCUIT_BREAKER_LATENCY_MS 大于0时耗时超过该值的语句也计为失败（默认关闭）
+    CIRCUIT_BREAKER_ENABLED = os.environ.get('CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true'
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', '5'))
+    CIRCUIT_BREAKER_RESET_TIMEOUT = int(os.environ.get('CIRCUIT_BREAKER_RESET_TIMEOUT', '10'))
+    CIRCUIT_BREAKER_LATENCY_MS = int(os.environ.get('CIRCUIT_BREAKER_LATENCY_MS', '0'))
+    # 不访问数据库的端点，熔断期间继续服务
+    CIRCUIT_BREAKER_EXEMPT_ENDPOINTS = ['index_route', 'docs_route', 'health_check_route', 'get_metrics_route']
+
+    # 存活/就绪探针（/api/health/live、/api/health/ready），在WSGI层响应，不经过中间件与限流
+    HEALTH_PROBES_ENABLED = os.environ.get('HEALTH_PROBES_ENABLED', 'true').lower() == 'true'
+    # 就绪检查在后台线程中按间隔执行（秒），请求只读取缓存结果
+    READINESS_INTERVAL = int(os.environ.get('READINESS_INTERVAL', '5'))
+    # 连接池借出比例达到该值时视为未就绪
+    READINESS_POOL_SATURATION = float(os.environ.get('READINESS_POOL_SATURATION', '0.9'))
+    # 日志目录所在磁盘的最小剩余空间（MB）
+    READINESS_MIN_FREE_DISK_MB = int(os.environ.get('READINESS_MIN_FREE_DISK_MB', '100'))
+
+    # 定时任务（flaskr/crons），由 gunicorn 工作进程启动，选主后只有一个进程执行
+    CRON_ENABLED = os.environ.get('CRON_ENABLED', 'true').lower() == 'true'
+    # 选主方式：file（文件锁，单机一个主进程）/ postgres（advisory lock，集群一个主进程）
+    CRON_LEADER_LOCK = os.environ.get('CRON_LEADER_LOCK', 'file')
+    # 文件锁路径，默认为 instance 目录下的 cron.lock（每个部署实例独立）
+    CRON_LOCK_FILE = os.environ.get('CRON_LOCK_FILE')
+    CRON_ADVISORY_LOCK_KEY = int(os.environ.get('CRON_ADVISORY_LOCK_KEY', '7301'))
+    CRON_LEADER_RETRY_SECONDS = int(os.environ.get('CRON_LEADER_RETRY_SECONDS', '30'))
+    CRON_MAX_WORKERS = int(os.environ.get('CRON_MAX_WORKERS', '2'))
+    # 各任务的执行间隔（秒）
+    CRON_INTERVALS = {
+        'cleanup_expired_tokens': int(os.environ.get('TOKEN_CLEANUP_INTERVAL', '3600')),
+    }
+
+    # 后台任务队列（flaskr/tasks），默认使用 instance/tasks.db（SQLite），也可以使用 postgresql:// URL
+    TASK_QUEUE_URL = os.environ.get('TASK_QUEUE_URL')
+    TASK_WORKER_CONCURRENCY = int(os.environ.get('TASK_WORKER_CONCURRENCY', '4'))
+    TASK_BATCH_SIZE = int(os.environ.get('TASK_BATCH_SIZE', '20'))
+    TASK_POLL_INTERVAL = float(os.environ.get('TASK_POLL_INTERVAL', '1'))
+    # 可见性超时（秒）：领取后超过该时间未完成的任务会被重新领取，应大于任务的最长执行时间
+    TASK_VISIBILITY_TIMEOUT = int(os.environ.get('TASK_VISIBILITY_TIMEOUT', '300'))
+    TASK_RETRY_BACKOFF_BASE = float(os.environ.get('TASK_RETRY_BACKOFF_BASE', '2'))
+    # 登录尝试等审计记录交给后台任务写入（需要运行 flask tasks worker）
+    AUDIT_ASYNC = os.environ.get('AUDIT_ASYNC', 'false').lower() == 'true'
+
+    # 指标配置
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    # 访问 /api/metrics 需要携带 X-Metrics-Token 请求头；开发、测试环境之外未设置时拒绝访问
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
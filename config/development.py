@@ -13,4 +13,5 @@ class DevelopmentConfig(Config):
     
     # 开发环境特定配置
     SQLALCHEMY_ECHO = True  # 打印SQL语句
+    SQLALCHEMY_RECORD_QUERIES = True
 
@@ -37,11 +37,20 @@ class ProductionConfig(Config):
     
     # 生产环境特定配置
     SQLALCHEMY_ECHO = False
+    # DB_POOL_AUTOSIZE=false 时使用这里的固定值（max_overflow 为SQLAlchemy默认值10）
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_size': 10,
         'pool_recycle': 3600,
         'pool_pre_ping': True
     }
+
+    # 连接池大小按 单机连接预算 / 工作进程数 / 线程数 自动计算（flaskr/utils/db_pool.py）
+    # 单机所有工作进程的连接总数（含溢出连接）不超过 DB_CONNECTION_BUDGET
+    DB_POOL_AUTOSIZE = os.environ.get('DB_POOL_AUTOSIZE', 'true').lower() == 'true'
+    DB_CONNECTION_BUDGET = int(os.environ.get('DB_CONNECTION_BUDGET', '100'))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '5'))
+    # 使用PgBouncer等外部连接池时开启，本进程不保留连接（NullPool）
+    DB_EXTERNAL_POOLER = os.environ.get('DB_EXTERNAL_POOLER', 'false').lower() == 'true'
     
     # 安全配置
     SESSION_COOKIE_SECURE = True  # 仅HTTPS传输
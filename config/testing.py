@@ -1,16 +1,20 @@
 """
 测试环境配置
 """
+import os
 from config.base import Config
 
 
 class TestingConfig(Config):
     """测试环境配置"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # 默认使用内存数据库；基准测试等需要多进程共享数据时可指定文件数据库
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
     
     # 测试环境特定配置
     SECRET_KEY = 'test-secret-key'
     SQLALCHEMY_ECHO = False
-
+    SLOW_QUERY_LOG_FILE = None
+    # 限流计数使用进程内匿名内存，避免跨测试运行残留
+    LOGIN_THROTTLE_SHARED = False
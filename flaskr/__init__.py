@@ -7,6 +7,7 @@ import os
 from flask import Flask
 
 from config import config as config_dict
+from flaskr.utils.startup import StartupTimer
 
 # 创建基础logger
 logger = logging.getLogger(__name__)
@@ -22,25 +23,42 @@ def create_app(config_name=None):
     Returns:
         Flask应用实例
     """
-    app = Flask(__name__)
+    timer = StartupTimer()
+
+    with timer.phase('flask'):
+        app = Flask(__name__)
 
     # 设置基础日志
-    setup_basic_logging()
+    with timer.phase('basic_logging'):
+        setup_basic_logging()
 
     # 加载配置
-    setup_config(app, config_name)
+    with timer.phase('config'):
+        setup_config(app, config_name)
 
     # 初始化日志系统
-    setup_logging(app)
+    with timer.phase('logging'):
+        setup_logging(app)
 
     # 初始化扩展
-    setup_extensions(app)
+    with timer.phase('extensions'):
+        setup_extensions(app)
 
     # 注册中间件
-    setup_middlewares(app)
+    with timer.phase('middlewares'):
+        setup_middlewares(app)
 
     # 注册蓝图
-    setup_blueprints(app)
+    with timer.phase('blueprints'):
+        setup_blueprints(app)
+
+    # 注册命令行命令（仅由 flask 命令行加载应用时）
+    if is_cli_context():
+        from flaskr.commands import register_commands
+        register_commands(app)
+
+    # 记录启动耗时
+    setup_startup_report(app, timer)
 
     app.logger.info("应用初始化完成")
     return app
@@ -81,15 +99,26 @@ def setup_logging(app):
 def setup_extensions(app):
     from flaskr.extensions import (
         db,
-        migrate,
         cors,
         jwt,
         limiter
     )
     from flaskr.core.token import configure_jwt_handlers
+    from flaskr.core.async_db import init_async_db
+    from flaskr.utils.db_pool import apply_pool_settings, configured_max_overflow, register_pool_collector
+    from flaskr.utils.deadline import install_deadline_hooks
+    from flaskr.utils.slow_query import init_slow_query_log
 
     # 初始化数据库
+    apply_pool_settings(app)
     db.init_app(app)
+    with app.app_context():
+        register_pool_collector(db.engine, configured_max_overflow(app))
+        # 请求截止时间转换为数据库语句超时
+        install_deadline_hooks(db.engine)
+        init_slow_query_log(app, db.engine)
+    # 异步视图使用的数据库执行器（首次使用时才建立连接）
+    init_async_db(app)
 
     cors.init_app(app)
 
@@ -99,9 +128,36 @@ def setup_extensions(app):
     # 配置JWT错误处理
     configure_jwt_handlers(jwt)
 
+    # 数据库迁移只在命令行（flask db ...）中需要，延迟导入 Flask-Migrate/Alembic
+    if is_cli_context():
+        from flaskr.extensions import migrate
+        migrate.init_app(app, db)
+
     logger.info("扩展初始化成功")
 
 
+def is_cli_context():
+    """是否由 flask 命令行加载应用（click 上下文存在）"""
+    import click
+    return click.get_current_context(silent=True) is not None
+
+
+def setup_startup_report(app, timer):
+    """
+    保存并输出启动耗时
+
+    Args:
+        app: Flask应用实例
+        timer: StartupTimer
+    """
+    from flaskr.utils.metrics import metrics
+
+    report = timer.report()
+    app.extensions['startup_timings'] = report
+    metrics.register_collector('startup', lambda: report)
+    logger.info("启动耗时: %s", timer.summary())
+
+
 def setup_blueprints(app):
     from flaskr.routes import bp
     app.register_blueprint(bp)
@@ -113,7 +169,13 @@ def setup_middlewares(app):
         add_security_headers,
         remove_sensitive_headers,
         validate_content_type,
-        register_error_handlers
+        register_error_handlers,
+        register_profiler,
+        register_admission_control,
+        register_request_deadlines,
+        register_db_circuit_breaker,
+        register_health_probes,
+        register_proxy_fix
     )
 
     app.after_request(add_security_headers)
@@ -126,4 +188,26 @@ def setup_middlewares(app):
             return error
 
     register_error_handlers(app)
+
+    # 按需请求分析（关闭时不注册钩子）
+    register_profiler(app)
+
+    # 准入控制（插入到 before_request 链最前面）
+    register_admission_control(app)
+
+    # 请求处理时间预算
+    register_request_deadlines(app)
+
+    # 数据库熔断
+    register_db_circuit_breaker(app)
+
+    # 存活/就绪探针（包装 wsgi_app，绕过以上中间件）
+    register_health_probes(app)
+
+    # 可信反向代理（最外层，先还原客户端IP再交给其他中间件）
+    register_proxy_fix(app)
+
+    # 工作进程首个请求耗时
+    from flaskr.utils.warmup import register_first_request_metrics
+    register_first_request_metrics(app)
     logger.info("中间件注册成功")
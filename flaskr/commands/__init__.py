@@ -0,0 +1,24 @@
+"""
+命令行命令模块
+"""
+from flaskr.commands.dataset import dataset_cli
+from flaskr.commands.slow_queries import slow_queries_cli
+from flaskr.commands.tasks import tasks_cli
+from flaskr.commands.tokens import tokens_cli
+from flaskr.commands.users import users_cli
+
+__all__ = ['dataset_cli', 'slow_queries_cli', 'tasks_cli', 'tokens_cli', 'users_cli', 'register_commands']
+
+
+def register_commands(app):
+    """
+    注册 flask 命令行命令
+
+    Args:
+        app: Flask应用实例
+    """
+    app.cli.add_command(dataset_cli)
+    app.cli.add_command(slow_queries_cli)
+    app.cli.add_command(tasks_cli)
+    app.cli.add_command(tokens_cli)
+    app.cli.add_command(users_cli)
@@ -0,0 +1,45 @@
+"""
+合成数据命令
+flask dataset generate
+"""
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from flaskr.core.dataset import DATASET_PASSWORD, DatasetSpec, generate_dataset
+from flaskr.extensions import db
+
+dataset_cli = AppGroup('dataset', help='合成数据（规模测试）')
+
+
+@dataset_cli.command('generate')
+@click.option('--users', default=100000, show_default=True, help='用户数')
+@click.option('--attempts', default=1000000, show_default=True, help='登录尝试记录数')
+@click.option('--tokens-per-user', default=2.0, show_default=True, help='每个用户平均刷新token数')
+@click.option('--lockout-rate', default=0.02, show_default=True, help='有失败记录的用户比例')
+@click.option('--prefix', default='user', show_default=True, help='用户名前缀')
+@click.option('--processes', default=1, show_default=True, help='写入进程数（内存SQLite只能为1）')
+@click.option('--chunk-size', default=20000, show_default=True, help='每次写入的行数')
+@click.option('--seed', default=42, show_default=True, help='随机种子')
+@click.option('--force', is_flag=True, help='允许在生产配置下运行（会写入使用公开密码的账号）')
+def generate_command(users, attempts, tokens_per_user, lockout_rate, prefix, processes, chunk_size, seed, force):
+    """按接近生产的分布生成 users / user_lockouts / refresh_tokens / login_attempts"""
+    # 合成用户使用公开的固定密码，只允许写入开发、测试数据库
+    if not (current_app.debug or current_app.testing or force):
+        raise click.ClickException('当前为生产配置，拒绝写入合成数据；确认目标数据库用于规模测试时请加 --force')
+
+    spec = DatasetSpec(
+        users=users,
+        attempts=attempts,
+        tokens_per_user=tokens_per_user,
+        lockout_rate=lockout_rate,
+        prefix=prefix,
+        seed=seed
+    )
+
+    def progress(table, rows, seconds):
+        rate = rows / seconds if seconds else 0
+        click.echo(f'{table}: {rows} 行，耗时 {seconds:.1f} 秒，{rate:.0f} 行/秒')
+
+    counts = generate_dataset(db.engine, spec, processes=processes, chunk_size=chunk_size, progress=progress)
+    click.echo(f'生成完成：共 {sum(counts.values())} 行；合成用户的密码为 {DATASET_PASSWORD}')
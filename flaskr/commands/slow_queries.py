@@ -0,0 +1,46 @@
+"""
+慢查询命令
+flask slow-queries report
+"""
+import json
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from flaskr.utils.slow_query import aggregate_log_file, resolve_log_file
+
+slow_queries_cli = AppGroup('slow-queries', help='慢查询日志')
+
+
+@slow_queries_cli.command('report')
+@click.option('--top', 'top_n', default=10, show_default=True, help='输出前N条语句')
+@click.option('--sort', type=click.Choice(['total_ms', 'count', 'max_ms']), default='total_ms',
+              show_default=True, help='排序字段')
+@click.option('--file', 'log_file', default=None, help='慢查询日志文件（默认 SLOW_QUERY_LOG_FILE）')
+@click.option('--json', 'as_json', is_flag=True, help='以JSON格式输出')
+def report_command(top_n, sort, log_file, as_json):
+    """汇总慢查询日志，输出耗时最多的语句"""
+    log_file = log_file or resolve_log_file(current_app)
+    if not log_file or not os.path.exists(log_file):
+        raise click.ClickException(f'慢查询日志文件不存在: {log_file}')
+
+    items = aggregate_log_file(log_file, n=top_n, sort=sort)
+    if as_json:
+        click.echo(json.dumps(items, ensure_ascii=False, indent=2))
+        return
+
+    if not items:
+        click.echo('没有慢查询记录')
+        return
+
+    for index, entry in enumerate(items, 1):
+        click.echo(
+            f"{index}. total={entry['total_ms']}ms count={entry['count']} "
+            f"avg={entry['total_ms'] / entry['count']:.1f}ms max={entry['max_ms']}ms "
+            f"routes={','.join(entry['routes']) or '-'}"
+        )
+        click.echo(f"   {entry['statement']}")
+        for line in entry['plan'] or []:
+            click.echo(f"     {line}")
@@ -0,0 +1,51 @@
+"""
+后台任务命令
+flask tasks worker / flask tasks stats
+"""
+import json
+import signal
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from flaskr.tasks import TaskWorker, get_task_store, registered_tasks
+
+tasks_cli = AppGroup('tasks', help='后台任务队列')
+
+
+@tasks_cli.command('worker')
+@click.option('--concurrency', '-c', default=None, type=int, help='并发执行的任务数（默认 TASK_WORKER_CONCURRENCY）')
+@click.option('--batch-size', default=None, type=int, help='每次最多领取的任务数（默认 TASK_BATCH_SIZE）')
+@click.option('--poll-interval', default=None, type=float, help='队列为空时的轮询间隔（秒）')
+def worker_command(concurrency, batch_size, poll_interval):
+    """启动任务工作进程（SIGTERM/SIGINT 时处理完当前任务后退出）"""
+    app = current_app._get_current_object()
+    config = app.config
+    registry = registered_tasks()
+    worker = TaskWorker(
+        app,
+        get_task_store(app),
+        registry,
+        concurrency=concurrency or config.get('TASK_WORKER_CONCURRENCY', 4),
+        batch_size=batch_size or config.get('TASK_BATCH_SIZE', 20),
+        poll_interval=poll_interval or config.get('TASK_POLL_INTERVAL', 1.0),
+        visibility_timeout=config.get('TASK_VISIBILITY_TIMEOUT', 300),
+        backoff_base=config.get('TASK_RETRY_BACKOFF_BASE', 2.0)
+    )
+
+    def handle_signal(signum, frame):
+        click.echo('正在停止，等待执行中的任务完成...')
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    click.echo(f'任务工作进程已启动: concurrency={worker.concurrency}, tasks={", ".join(registry)}')
+    worker.run()
+
+
+@tasks_cli.command('stats')
+def stats_command():
+    """按状态统计队列中的任务数"""
+    click.echo(json.dumps(get_task_store().stats(), ensure_ascii=False))
@@ -0,0 +1,34 @@
+"""
+刷新token维护命令
+flask tokens migrate-digests / flask tokens backfill-digests
+"""
+import click
+from flask.cli import AppGroup
+
+from flaskr.core.token import TokenService
+from flaskr.extensions import db
+from flaskr.models.auth import drop_legacy_token_index, upgrade_refresh_token_schema
+
+tokens_cli = AppGroup('tokens', help='刷新token维护')
+
+
+@tokens_cli.command('backfill-digests')
+@click.option('--batch-size', default=1000, show_default=True, help='每批处理的行数')
+def backfill_digests_command(batch_size):
+    """为旧版token计算摘要并清空原文列"""
+    migrated = TokenService.backfill_digests(batch_size=batch_size)
+    click.echo(f'已迁移 {migrated} 个刷新token')
+
+
+@tokens_cli.command('migrate-digests')
+@click.option('--batch-size', default=1000, show_default=True, help='每批处理的行数')
+def migrate_digests_command(batch_size):
+    """从保存原文的旧版本升级：增加 token_digest 列与唯一索引，迁移已有token，删除原文列索引"""
+    with db.engine.begin() as connection:
+        if upgrade_refresh_token_schema(connection):
+            click.echo('已更新 refresh_tokens 表结构（token_digest 列及唯一索引）')
+    migrated = TokenService.backfill_digests(batch_size=batch_size)
+    click.echo(f'已迁移 {migrated} 个刷新token')
+    with db.engine.begin() as connection:
+        drop_legacy_token_index(connection)
+    click.echo('已删除旧版 token 原文列索引')
@@ -0,0 +1,53 @@
+"""
+用户管理命令
+flask users import / flask users search-index
+"""
+import click
+from flask.cli import AppGroup
+
+from flaskr.core.user_import import UserImporter, read_records
+from flaskr.extensions import db
+from flaskr.models.search import create_search_index
+
+users_cli = AppGroup('users', help='用户管理')
+
+
+@users_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None, help='文件格式（默认按扩展名判断）')
+@click.option('--chunk-size', default=5000, show_default=True, help='每块的行数')
+@click.option('--processes', default=None, type=int, help='计算密码哈希的进程数（默认CPU核数）')
+@click.option('--checkpoint', default=None, help='断点文件（默认 <PATH>.checkpoint.json）')
+@click.option('--resume/--no-resume', default=True, show_default=True, help='是否从断点继续')
+def import_command(path, fmt, chunk_size, processes, checkpoint, resume):
+    """从 CSV 或 NDJSON 文件批量导入用户"""
+    importer = UserImporter(
+        chunk_size=chunk_size,
+        processes=processes,
+        checkpoint_path=checkpoint or f'{path}.checkpoint.json'
+    )
+    offset, _ = importer.load_checkpoint() if resume else (0, {})
+    if offset:
+        click.echo(f'从断点继续：跳过已处理的 {offset} 行')
+
+    def progress(stats):
+        click.echo(f'已处理 {stats.processed} 行，写入 {stats.inserted}，{stats.rate:.0f} 行/秒')
+
+    stats = importer.run(read_records(path, fmt), resume=resume, progress=progress)
+
+    click.echo(
+        f'导入完成：处理 {stats.processed} 行，写入 {stats.inserted}，'
+        f'文件内重复 {stats.duplicate_in_file}，已存在 {stats.duplicate_in_db}，无效 {stats.invalid}；'
+        f'本次 {stats.run_processed} 行，耗时 {stats.elapsed:.1f} 秒，{stats.rate:.0f} 行/秒'
+    )
+
+
+@users_cli.command('search-index')
+def search_index_command():
+    """为已有数据库创建用户搜索索引（SQLite FTS5 / PostgreSQL pg_trgm）"""
+    with db.engine.begin() as connection:
+        created = create_search_index(connection)
+    if created:
+        click.echo('用户搜索索引已创建')
+    else:
+        click.echo('当前数据库不支持搜索索引，搜索将使用 LIKE 扫描')
@@ -0,0 +1,277 @@
+"""
+异步认证功能
+供异步视图使用：bcrypt 在线程池中执行，数据库操作通过 AsyncDatabase 执行
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import bcrypt
+from flask import request, current_app
+from sqlalchemy import select, insert, update, or_
+
+from flaskr.core.async_db import get_async_db
+from flaskr.core.auth import is_account_locked, record_failed_login, reset_failed_logins
+from flaskr.core.token import consume_refresh_token, issue_refresh_token
+from flaskr.models.auth import LoginAttempt, UserLockout
+from flaskr.models.user import User
+from flaskr.utils.login_throttle import client_ip, get_login_throttle
+from flaskr.utils.row_count import invalidate_count
+
+users = User.__table__
+lockouts = UserLockout.__table__
+login_attempts = LoginAttempt.__table__
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_password_executor():
+    """
+    获取密码哈希线程池（延迟创建，保证在fork之后）
+
+    bcrypt 在计算期间释放GIL，线程池即可并行利用多核
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = current_app.config.get('ASYNC_PASSWORD_WORKERS') or os.cpu_count() or 1
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        return _executor
+
+
+async def hash_password(password):
+    """在线程池中计算密码哈希"""
+    loop = asyncio.get_running_loop()
+    salt = bcrypt.gensalt(rounds=12)
+    hashed = await loop.run_in_executor(_get_password_executor(), bcrypt.hashpw, password.encode('utf-8'), salt)
+    return hashed.decode('utf-8')
+
+
+async def check_password(password_hash, password):
+    """在线程池中校验密码"""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            _get_password_executor(),
+            bcrypt.checkpw,
+            password.encode('utf-8'),
+            password_hash.encode('utf-8')
+        )
+    except Exception:
+        return False
+
+
+def row_to_user(row):
+    """将users表的行转换为未关联会话的User对象（仅用于序列化）"""
+    return User(**dict(row._mapping))
+
+
+def _refresh_expires():
+    return current_app.config.get('JWT_REFRESH_TOKEN_EXPIRES', timedelta(days=7))
+
+
+def _max_active_refresh_tokens():
+    return current_app.config.get('MAX_ACTIVE_REFRESH_TOKENS', 0)
+
+
+class AsyncAuthService:
+    """异步认证服务类（行为与 AuthService 保持一致）"""
+
+    @staticmethod
+    async def register(username, email, password):
+        """
+        用户注册
+
+        Returns:
+            (user, refresh_token, error_message)
+        """
+        async_db = get_async_db()
+
+        def exists(conn):
+            if conn.execute(select(users.c.id).where(users.c.username == username)).first():
+                return True
+            return conn.execute(select(users.c.id).where(users.c.email == email)).first() is not None
+
+        if await async_db.run(exists):
+            return None, None, '用户名或密码错误'  # 模糊提示
+
+        password_hash = await hash_password(password)
+        # 数据库函数运行在后台事件循环线程中，不能访问 current_app
+        refresh_expires = _refresh_expires()
+        max_active = _max_active_refresh_tokens()
+
+        def create(conn):
+            now = datetime.utcnow()
+            result = conn.execute(insert(users).values(
+                username=username,
+                email=email,
+                password_hash=password_hash,
+                is_active=True,
+                created_at=now,
+                updated_at=now
+            ))
+            user_id = result.inserted_primary_key[0]
+            token = issue_refresh_token(conn, user_id, refresh_expires, max_active, now)
+            row = conn.execute(select(users).where(users.c.id == user_id)).first()
+            return row, token
+
+        try:
+            row, token = await async_db.run(create)
+        except Exception:
+            return None, None, '注册失败，请稍后重试'
+
+        invalidate_count(User)
+        return row_to_user(row), token, None
+
+    @staticmethod
+    async def login(username_or_email, password):
+        """
+        用户登录
+
+        Returns:
+            (user, refresh_token, error_message, is_locked)
+
+        Raises:
+            LoginThrottled: 用户名或IP的失败次数超过限流阈值
+        """
+        throttle = get_login_throttle()
+        throttle_ip = client_ip()
+        if throttle is not None:
+            throttle.check(username_or_email, throttle_ip)
+
+        async_db = get_async_db()
+        attempt = {
+            'username': username_or_email,
+            'ip_address': request.remote_addr,
+            'user_agent': request.headers.get('User-Agent', ''),
+            'success': False,
+            'attempted_at': datetime.utcnow()
+        }
+
+        def load(conn):
+            user = conn.execute(select(users).where(
+                or_(users.c.username == username_or_email, users.c.email == username_or_email)
+            )).first()
+            locked = user is not None and is_account_locked(conn, user.id)
+            return user, locked
+
+        # 与同步登录一致：AUDIT_ASYNC 开启时登录尝试在事务结束后交给后台任务写入
+        audit_async = current_app.config.get('AUDIT_ASYNC', False)
+
+        def record_attempt(conn):
+            if not audit_async:
+                conn.execute(insert(login_attempts).values(**attempt))
+
+        def enqueue_attempt():
+            if audit_async:
+                from flaskr.tasks.audit import enqueue_login_attempt
+                enqueue_login_attempt(**attempt)
+
+        def failed():
+            enqueue_attempt()
+            if throttle is not None:
+                throttle.record_failure(username_or_email, throttle_ip)
+
+        async def rejected():
+            # 未校验密码就拒绝时单独写入登录尝试（后台写入时不占用数据库连接）
+            if not audit_async:
+                await async_db.run(record_attempt)
+            failed()
+
+        user, locked = await async_db.run(load)
+
+        if user is None:
+            await rejected()
+            return None, None, '用户名或密码错误', False
+
+        now = datetime.utcnow()
+        if locked:
+            await rejected()
+            return None, None, '账号已被锁定，请稍后再试', True
+
+        if not user.is_active:
+            await rejected()
+            return None, None, '用户名或密码错误', False
+
+        # bcrypt 校验期间不持有数据库连接
+        if not await check_password(user.password_hash, password):
+            max_attempts = current_app.config.get('MAX_LOGIN_ATTEMPTS', 5)
+            lockout_minutes = current_app.config.get('LOCKOUT_DURATION_MINUTES', 30)
+
+            def record_failure(conn):
+                # 单条 upsert 原子地增加失败次数，锁定状态在SQL中计算
+                _, locked_until = record_failed_login(conn, user.id, max_attempts, lockout_minutes, now)
+                record_attempt(conn)
+                return locked_until is not None and now < locked_until
+
+            is_locked = await async_db.run(record_failure)
+            failed()
+            if is_locked:
+                return None, None, '账号已被锁定，请稍后再试', True
+            return None, None, '用户名或密码错误', False
+
+        refresh_expires = _refresh_expires()
+        max_active = _max_active_refresh_tokens()
+
+        def record_success(conn):
+            reset_failed_logins(conn, user.id, now)
+            conn.execute(update(users).where(users.c.id == user.id).values(last_login=now, updated_at=now))
+            attempt.update(success=True, username=user.username)
+            record_attempt(conn)
+            token = issue_refresh_token(conn, user.id, refresh_expires, max_active, now)
+            return conn.execute(select(users).where(users.c.id == user.id)).first(), token
+
+        row, token = await async_db.run(record_success)
+        enqueue_attempt()
+        if throttle is not None:
+            throttle.record_success(username_or_email)
+        return row_to_user(row), token, None, False
+
+    @staticmethod
+    async def rotate_refresh_token(token):
+        """
+        轮换刷新Token：旧token作废，同一事务中签发新token（与 TokenService.rotate_refresh_token 一致）
+
+        Returns:
+            (user_id, new_token, error_message)
+        """
+        config = current_app.config
+        legacy_lookup = config.get('REFRESH_TOKEN_LEGACY_LOOKUP', False)
+        cache_ttl = config.get('REFRESH_TOKEN_CACHE_TTL', 0)
+        refresh_expires = _refresh_expires()
+        max_active = _max_active_refresh_tokens()
+
+        def rotate(conn):
+            user_id = consume_refresh_token(conn, token, legacy_lookup=legacy_lookup, cache_ttl=cache_ttl)
+            if user_id is None:
+                return None, None
+            return user_id, issue_refresh_token(conn, user_id, refresh_expires, max_active)
+
+        user_id, new_token = await get_async_db().run(rotate)
+        if user_id is None:
+            return None, None, '刷新token无效、已过期或已被使用'
+        return user_id, new_token, None
+
+    @staticmethod
+    async def get_user(user_id):
+        """
+        获取用户及其锁定状态
+
+        Returns:
+            (user, is_locked)，用户不存在时为 (None, False)
+        """
+        def load(conn):
+            row = conn.execute(select(users).where(users.c.id == user_id)).first()
+            lockout = conn.execute(
+                select(lockouts.c.locked_until).where(lockouts.c.user_id == user_id)
+            ).first()
+            return row, lockout
+
+        row, lockout = await get_async_db().run(load)
+        if row is None:
+            return None, False
+        is_locked = bool(lockout and lockout.locked_until and datetime.utcnow() < lockout.locked_until)
+        return row_to_user(row), is_locked
@@ -0,0 +1,174 @@
+"""
+异步数据库访问
+为异步视图提供基于 AsyncEngine 的数据库执行器
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from flaskr.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# 同步驱动 -> 异步驱动
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+}
+
+
+def derive_async_url(url):
+    """
+    根据同步数据库URL推导异步URL
+
+    Args:
+        url: SQLALCHEMY_DATABASE_URI
+
+    Returns:
+        异步URL；无法推导（例如内存SQLite，异步连接无法共享同一个库）时返回None
+    """
+    scheme, sep, rest = url.partition('://')
+    if not sep or scheme not in ASYNC_DRIVERS:
+        return None
+    if scheme == 'sqlite' and rest in ('', '/', '/:memory:'):
+        return None
+    return f'{ASYNC_DRIVERS[scheme]}://{rest}'
+
+
+class AsyncDatabase:
+    """
+    异步数据库执行器
+
+    Flask 的异步视图为每个请求创建独立的事件循环，而异步驱动的连接绑定在创建它的事件循环上。
+    因此 AsyncEngine 运行在每个进程一个的后台事件循环线程中，连接池可以跨请求复用；
+    请求中的协程通过 run() 把数据库操作提交到该循环并等待结果。
+
+    数据库操作以 fn(connection) 的同步函数形式编写，通过 AsyncConnection.run_sync 执行，
+    这样在没有异步驱动时可以直接回退到同步引擎（在线程池中执行，不阻塞请求的事件循环）。
+    """
+
+    def __init__(self, url=None, engine_options=None):
+        """
+        Args:
+            url: 异步数据库URL，为None时使用同步引擎回退
+            engine_options: 传给 create_async_engine 的参数
+        """
+        self.url = url
+        self.engine_options = engine_options or {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._engine = None
+        self._fallback_executor = None
+
+    @property
+    def is_async(self):
+        """是否使用异步驱动"""
+        return self.url is not None
+
+    def _start(self):
+        """延迟启动后台事件循环（在fork之后的首次使用时）"""
+        with self._lock:
+            if self._loop is not None:
+                return
+            try:
+                from sqlalchemy.ext.asyncio import create_async_engine
+                engine = create_async_engine(self.url, **self.engine_options)
+            except Exception as e:
+                logger.warning("异步数据库引擎不可用，回退到同步引擎: %s", e)
+                self.url = None
+                return
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='async-db-loop', daemon=True)
+            thread.start()
+            self._engine = engine
+            self._loop = loop
+
+    async def run(self, fn):
+        """
+        在事务中执行数据库操作
+
+        Args:
+            fn: 同步函数 fn(connection) -> 结果
+
+        Returns:
+            fn 的返回值
+        """
+        if self.is_async and self._loop is None:
+            self._start()
+
+        if not self.is_async:
+            engine = db.engine
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_fallback_executor(), self._run_sync, engine, fn)
+
+        future = asyncio.run_coroutine_threadsafe(self._run_async(fn), self._loop)
+        return await asyncio.wrap_future(future)
+
+    async def _run_async(self, fn):
+        async with self._engine.begin() as conn:
+            return await conn.run_sync(fn)
+
+    @staticmethod
+    def _run_sync(engine, fn):
+        with engine.begin() as conn:
+            return fn(conn)
+
+    def _get_fallback_executor(self):
+        with self._lock:
+            if self._fallback_executor is None:
+                self._fallback_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='sync-db')
+            return self._fallback_executor
+
+    def dispose(self):
+        """释放连接并停止后台事件循环"""
+        with self._lock:
+            loop, engine = self._loop, self._engine
+            self._loop = None
+            self._engine = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def async_database_url(config):
+    """
+    异步视图使用的数据库URL
+
+    设置了 ASYNC_DATABASE_URL 时直接使用；否则只有 ASYNC_ENGINE_ENABLED 开启时才由同步URL推导，
+    未开启时异步视图回退到同步引擎，不额外占用连接。
+
+    Args:
+        config: 应用配置
+
+    Returns:
+        异步URL，使用同步引擎回退时返回None
+    """
+    if config.get('ASYNC_DATABASE_URL'):
+        return config['ASYNC_DATABASE_URL']
+    if not config.get('ASYNC_ENGINE_ENABLED', False):
+        return None
+    return derive_async_url(config['SQLALCHEMY_DATABASE_URI'])
+
+
+def init_async_db(app):
+    """
+    创建异步数据库执行器（不建立连接）
+
+    Args:
+        app: Flask应用实例
+    """
+    url = async_database_url(app.config)
+    options = dict(app.config.get('ASYNC_ENGINE_OPTIONS') or {})
+    app.extensions['async_db'] = AsyncDatabase(url, options)
+
+
+def get_async_db():
+    """获取当前应用的异步数据库执行器"""
+    return current_app.extensions['async_db']
@@ -7,11 +7,103 @@ from functools import wraps
 
 from flask import request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import case, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from flaskr.extensions import db
 from flaskr.models.auth import LoginAttempt, UserLockout, RefreshToken
 from flaskr.models.user import User
+from flaskr.utils.deadline import check_deadline
+from flaskr.utils.login_throttle import client_ip, get_login_throttle
 from flaskr.utils.response import error_response
+from flaskr.utils.row_count import invalidate_count
+
+
+lockouts = UserLockout.__table__
+
+
+def record_failed_login(conn, user_id, max_attempts, lockout_minutes, now=None):
+    """
+    原子地增加失败次数（单条 INSERT ... ON CONFLICT DO UPDATE ... RETURNING）
+
+    锁定状态在SQL中计算：累计失败次数达到 max_attempts 时设置 locked_until，
+    并发的失败请求不会丢失计数，也不需要先读后写。
+
+    Args:
+        conn: SQLAlchemy连接（调用方负责提交事务）
+        user_id: 用户ID
+        max_attempts: 最大失败次数
+        lockout_minutes: 锁定时长（分钟）
+        now: 当前时间
+
+    Returns:
+        (failed_attempts, locked_until)
+    """
+    now = now or datetime.utcnow()
+    lock_until = now + timedelta(minutes=lockout_minutes)
+    dialect = conn.dialect.name
+
+    if dialect not in ('postgresql', 'sqlite'):
+        # 其他数据库：条件UPDATE在数据库中自增，不存在时再插入
+        result = conn.execute(update(lockouts).where(lockouts.c.user_id == user_id).values(
+            failed_attempts=lockouts.c.failed_attempts + 1,
+            locked_until=case(
+                (lockouts.c.failed_attempts + 1 >= max_attempts, lock_until), else_=lockouts.c.locked_until
+            ),
+            updated_at=now
+        ))
+        if result.rowcount == 0:
+            conn.execute(insert(lockouts).values(
+                user_id=user_id, failed_attempts=1, locked_until=lock_until if max_attempts <= 1 else None,
+                created_at=now, updated_at=now
+            ))
+        return tuple(conn.execute(
+            select(lockouts.c.failed_attempts, lockouts.c.locked_until).where(lockouts.c.user_id == user_id)
+        ).one())
+
+    dialect_insert = postgresql_insert if dialect == 'postgresql' else sqlite_insert
+    stmt = dialect_insert(lockouts).values(
+        user_id=user_id,
+        failed_attempts=1,
+        locked_until=lock_until if max_attempts <= 1 else None,
+        created_at=now,
+        updated_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[lockouts.c.user_id],
+        set_={
+            'failed_attempts': lockouts.c.failed_attempts + 1,
+            'locked_until': case(
+                (lockouts.c.failed_attempts + 1 >= max_attempts, lock_until), else_=lockouts.c.locked_until
+            ),
+            'updated_at': now
+        }
+    ).returning(lockouts.c.failed_attempts, lockouts.c.locked_until)
+    return tuple(conn.execute(stmt).one())
+
+
+def reset_failed_logins(conn, user_id, now=None):
+    """
+    登录成功后重置失败次数（条件UPDATE，没有失败记录时不写入）
+
+    Args:
+        conn: SQLAlchemy连接（调用方负责提交事务）
+        user_id: 用户ID
+        now: 当前时间
+    """
+    conn.execute(update(lockouts).where(
+        lockouts.c.user_id == user_id,
+        or_(lockouts.c.failed_attempts > 0, lockouts.c.locked_until.is_not(None))
+    ).values(failed_attempts=0, locked_until=None, updated_at=now or datetime.utcnow()))
+
+
+def is_account_locked(conn, user_id, now=None):
+    """账号当前是否处于锁定状态（在SQL中比较时间）"""
+    return conn.execute(select(lockouts.c.id).where(
+        lockouts.c.user_id == user_id,
+        lockouts.c.locked_until > (now or datetime.utcnow())
+    )).first() is not None
 
 
 class AuthService:
@@ -44,11 +136,13 @@ class AuthService:
             email=email,
             is_active=True
         )
+        check_deadline('bcrypt')
         user.set_password(password)
 
         try:
             db.session.add(user)
             db.session.commit()
+            invalidate_count(User)
             return user, None
         except Exception as e:
             db.session.rollback()
@@ -65,17 +159,27 @@ class AuthService:
             
         Returns:
             (user, error_message, is_locked)
+
+        Raises:
+            LoginThrottled: 用户名或IP的失败次数超过限流阈值
         """
         # 获取客户端信息
         ip_address = request.remote_addr
         user_agent = request.headers.get('User-Agent', '')
 
+        # 失败次数过多的用户名/IP直接拒绝，不查询数据库、不计算bcrypt
+        throttle = get_login_throttle()
+        throttle_ip = client_ip()
+        if throttle is not None:
+            throttle.check(username_or_email, throttle_ip)
+
         # 记录登录尝试
         login_attempt = LoginAttempt(
             username=username_or_email,
             ip_address=ip_address,
             user_agent=user_agent,
-            success=False
+            success=False,
+            attempted_at=datetime.utcnow()
         )
 
         # 查找用户（支持用户名或邮箱登录）
@@ -86,50 +190,57 @@ class AuthService:
         # 如果用户不存在，记录失败尝试并返回模糊提示
         if not user:
             login_attempt.success = False
-            db.session.add(login_attempt)
+            AuthService._record_login_attempt(login_attempt)
             db.session.commit()
+            if throttle is not None:
+                throttle.record_failure(username_or_email, throttle_ip)
             return None, '用户名或密码错误', False
 
         # 检查账号是否被锁定
-        lockout = UserLockout.query.filter_by(user_id=user.id).first()
-        if lockout and lockout.is_locked():
+        if is_account_locked(db.session.connection(), user.id):
             login_attempt.success = False
-            db.session.add(login_attempt)
+            AuthService._record_login_attempt(login_attempt)
             db.session.commit()
+            if throttle is not None:
+                throttle.record_failure(username_or_email, throttle_ip)
             return None, '账号已被锁定，请稍后再试', True
 
         # 检查账号是否激活
         if not user.is_active:
             login_attempt.success = False
-            db.session.add(login_attempt)
+            AuthService._record_login_attempt(login_attempt)
             db.session.commit()
+            if throttle is not None:
+                throttle.record_failure(username_or_email, throttle_ip)
             return None, '用户名或密码错误', False
 
-        # 验证密码
+        # 验证密码（bcrypt耗时较长，超过预算时不再计算）
+        check_deadline('bcrypt')
         if not user.check_password(password):
-            # 密码错误，增加失败尝试次数
-            if not lockout:
-                lockout = UserLockout(user_id=user.id, failed_attempts=0)
-                db.session.add(lockout)
-
-            is_locked = lockout.increment_failed_attempts(
+            # 密码错误，原子地增加失败尝试次数
+            now = datetime.utcnow()
+            _, locked_until = record_failed_login(
+                db.session.connection(),
+                user.id,
                 max_attempts=current_app.config.get('MAX_LOGIN_ATTEMPTS', 5),
-                lockout_duration_minutes=current_app.config.get('LOCKOUT_DURATION_MINUTES', 30)
+                lockout_minutes=current_app.config.get('LOCKOUT_DURATION_MINUTES', 30),
+                now=now
             )
 
             login_attempt.success = False
-            db.session.add(login_attempt)
+            AuthService._record_login_attempt(login_attempt)
             db.session.commit()
+            if throttle is not None:
+                throttle.record_failure(username_or_email, throttle_ip)
 
-            if is_locked:
+            if locked_until is not None and now < locked_until:
                 return None, '账号已被锁定，请稍后再试', True
             else:
                 return None, '用户名或密码错误', False
 
         # 登录成功
         # 重置失败尝试次数
-        if lockout:
-            lockout.reset_failed_attempts()
+        reset_failed_logins(db.session.connection(), user.id)
 
         # 更新最后登录时间
         user.last_login = datetime.utcnow()
@@ -138,11 +249,36 @@ class AuthService:
         login_attempt.success = True
         login_attempt.username = user.username
 
-        db.session.add(login_attempt)
+        AuthService._record_login_attempt(login_attempt)
         db.session.commit()
+        if throttle is not None:
+            throttle.record_success(username_or_email)
 
         return user, None, False
 
+    @staticmethod
+    def _record_login_attempt(login_attempt):
+        """
+        记录登录尝试
+
+        AUDIT_ASYNC 开启时交给后台任务写入，请求不等待；否则随当前事务一起提交。
+
+        Args:
+            login_attempt: LoginAttempt对象（未加入会话）
+        """
+        if not current_app.config.get('AUDIT_ASYNC', False):
+            db.session.add(login_attempt)
+            return
+
+        from flaskr.tasks.audit import enqueue_login_attempt
+        enqueue_login_attempt(
+            login_attempt.username,
+            login_attempt.ip_address,
+            login_attempt.user_agent,
+            login_attempt.success,
+            login_attempt.attempted_at or datetime.utcnow()
+        )
+
 
 def admin_required(f):
     """管理员权限装饰器"""
@@ -171,6 +307,7 @@ def active_user_required(f):
     @wraps(f)
     @jwt_required()
     def decorated_function(*args, **kwargs):
+        check_deadline('auth')
         user_id = get_jwt_identity()
         user = User.query.get(user_id)
 
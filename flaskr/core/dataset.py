@@ -0,0 +1,282 @@
+"""
+合成数据生成
+按接近生产环境的分布批量生成 users、user_lockouts、refresh_tokens、login_attempts，用于规模测试
+"""
+import csv
+import io
+import random
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+from sqlalchemy import create_engine, event, text
+
+from flaskr.models.user import hash_password
+
+# 所有合成用户的明文密码（只预先计算少量哈希，用户之间复用）
+DATASET_PASSWORD = 'datasetpass123'
+
+_TABLES = {
+    'users': ('id', 'username', 'email', 'password_hash', 'created_at', 'updated_at', 'is_active', 'last_login'),
+    'user_lockouts': ('user_id', 'failed_attempts', 'locked_until', 'created_at', 'updated_at'),
+    'refresh_tokens': ('user_id', 'token_digest', 'expires_at', 'created_at', 'revoked'),
+    'login_attempts': ('username', 'ip_address', 'user_agent', 'success', 'attempted_at'),
+}
+
+_USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2) AppleWebKit/605.1.15 Version/17.2 Safari/605.1.15',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148',
+    'Mozilla/5.0 (Linux; Android 14) AppleWebKit/537.36 Chrome/120.0 Mobile Safari/537.36',
+    'okhttp/4.12.0',
+    'python-requests/2.31.0',
+)
+
+_EMAIL_DOMAINS = ('example.com', 'example.org', 'example.net', 'mail.example.com')
+
+
+class DatasetSpec:
+    """数据规模与分布参数"""
+
+    def __init__(self, users, attempts, tokens_per_user=2.0, lockout_rate=0.02, locked_ratio=0.15,
+                 success_rate=0.85, unknown_user_rate=0.05, prefix='user', seed=42, password_hashes=None):
+        """
+        Args:
+            users: 用户数
+            attempts: 登录尝试记录数
+            tokens_per_user: 每个用户平均刷新token数（指数分布，约60%已过期，约10%已撤销）
+            lockout_rate: 有失败记录（user_lockouts 行）的用户比例
+            locked_ratio: 其中当前处于锁定状态的比例
+            success_rate: 登录成功比例
+            unknown_user_rate: 使用不存在用户名的登录尝试比例
+            prefix: 用户名前缀
+            seed: 随机种子（相同参数生成相同数据）
+            password_hashes: 预先计算的密码哈希
+        """
+        self.users = users
+        self.attempts = attempts
+        self.tokens_per_user = tokens_per_user
+        self.lockout_rate = lockout_rate
+        self.locked_ratio = locked_ratio
+        self.success_rate = success_rate
+        self.unknown_user_rate = unknown_user_rate
+        self.prefix = prefix
+        self.seed = seed
+        self.password_hashes = password_hashes or []
+        self.base_id = 1
+        self.now = datetime.utcnow()
+
+
+def precompute_password_hashes(count=4, password=DATASET_PASSWORD):
+    """预先计算少量密码哈希（所有合成用户复用，登录时可使用 DATASET_PASSWORD）"""
+    return [hash_password(password) for _ in range(count)]
+
+
+def _fmt(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f') if isinstance(value, datetime) else value
+
+
+def _fmt_copy(value):
+    # COPY 的 CSV 格式中 bytea 使用十六进制文本
+    return '\\x' + value.hex() if isinstance(value, bytes) else _fmt(value)
+
+
+def _user_rows(spec, rng, start, end):
+    two_years = 730 * 86400
+    for i in range(start, end):
+        user_id = spec.base_id + i
+        created_at = spec.now - timedelta(seconds=rng.random() * two_years)
+        # 约70%的用户最近90天内登录过，越近越多
+        last_login = spec.now - timedelta(seconds=(rng.random() ** 2) * 90 * 86400) if rng.random() < 0.7 else None
+        yield (
+            user_id,
+            f'{spec.prefix}{user_id}',
+            f'{spec.prefix}{user_id}@{_EMAIL_DOMAINS[user_id % len(_EMAIL_DOMAINS)]}',
+            spec.password_hashes[user_id % len(spec.password_hashes)],
+            created_at,
+            created_at,
+            rng.random() < 0.97,
+            last_login,
+        )
+
+
+def _lockout_rows(spec, rng, start, end):
+    for i in range(start, end):
+        if rng.random() >= spec.lockout_rate:
+            continue
+        updated_at = spec.now - timedelta(seconds=rng.random() * 30 * 86400)
+        if rng.random() < spec.locked_ratio:
+            failed, locked_until = 5, spec.now + timedelta(minutes=rng.randint(1, 30))
+        else:
+            failed, locked_until = rng.randint(1, 4), None
+        yield spec.base_id + i, failed, locked_until, updated_at, updated_at
+
+
+def _token_rows(spec, rng, start, end):
+    for i in range(start, end):
+        for _ in range(min(int(rng.expovariate(1 / spec.tokens_per_user)), 20) if spec.tokens_per_user else 0):
+            # 约60%已过期
+            offset = timedelta(seconds=rng.uniform(-30, 7) * 86400)
+            expires_at = spec.now + offset
+            yield (
+                spec.base_id + i,
+                rng.getrandbits(256).to_bytes(32, 'big'),
+                expires_at,
+                expires_at - timedelta(days=7),
+                rng.random() < 0.1,
+            )
+
+
+def _attempt_rows(spec, rng, start, end):
+    ninety_days = 90 * 86400
+    ip_pool = [f'10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}' for _ in range(5000)]
+    for _ in range(start, end):
+        if spec.users and rng.random() >= spec.unknown_user_rate:
+            # 少量活跃用户贡献大部分登录（幂律分布）
+            username = f'{spec.prefix}{spec.base_id + int(spec.users * rng.random() ** 3)}'
+            success = rng.random() < spec.success_rate
+        else:
+            username = f'unknown{rng.randint(0, 10 ** 6)}'
+            success = False
+        yield (
+            username,
+            rng.choice(ip_pool),
+            rng.choice(_USER_AGENTS),
+            success,
+            spec.now - timedelta(seconds=rng.random() * ninety_days),
+        )
+
+
+_GENERATORS = {
+    'users': _user_rows,
+    'user_lockouts': _lockout_rows,
+    'refresh_tokens': _token_rows,
+    'login_attempts': _attempt_rows,
+}
+
+
+def insert_rows(conn, table, rows):
+    """
+    批量写入（PostgreSQL 使用 COPY，其他数据库使用 executemany）
+
+    Args:
+        conn: SQLAlchemy连接
+        table: 表名
+        rows: 按 _TABLES[table] 列顺序的元组列表
+    """
+    columns = _TABLES[table]
+    if conn.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([_fmt_copy(v) for v in row] for row in rows)
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        placeholders = ', '.join('?' for _ in columns)
+        conn.exec_driver_sql(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            [tuple(_fmt(v) for v in row) for row in rows]
+        )
+
+
+def generate_range(engine, spec, table, start, end, chunk_size):
+    """
+    生成并写入 [start, end) 范围的数据（users/user_lockouts/refresh_tokens 按用户序号，login_attempts 按记录序号）
+
+    Returns:
+        写入的行数
+    """
+    # 每个范围使用独立的随机序列，结果与进程数无关
+    rng = random.Random(f'{spec.seed}:{table}:{spec.base_id}:{start}')
+    rows_iter = _GENERATORS[table](spec, rng, start, end)
+    written = 0
+    while True:
+        chunk = [row for _, row in zip(range(chunk_size), rows_iter)]
+        if not chunk:
+            return written
+        with engine.begin() as conn:
+            insert_rows(conn, table, chunk)
+        written += len(chunk)
+
+
+_worker_engine = None
+
+
+def _worker_init(url):
+    global _worker_engine
+    _worker_engine = create_engine(url, connect_args={'timeout': 60} if url.startswith('sqlite') else {})
+    if url.startswith('sqlite'):
+        @event.listens_for(_worker_engine, 'connect')
+        def set_pragmas(dbapi_connection, connection_record):
+            dbapi_connection.execute('PRAGMA journal_mode=WAL')
+            dbapi_connection.execute('PRAGMA synchronous=OFF')
+
+
+def _worker_generate(job):
+    spec, table, start, end, chunk_size = job
+    return table, generate_range(_worker_engine, spec, table, start, end, chunk_size)
+
+
+def generate_dataset(engine, spec, processes=1, chunk_size=20000, progress=None):
+    """
+    生成合成数据集
+
+    先生成 users（其余表依赖用户ID），再并行生成其余三张表。
+    processes > 1 时每个进程使用独立的数据库连接（不支持内存SQLite）。
+
+    Args:
+        engine: SQLAlchemy引擎
+        spec: DatasetSpec
+        processes: 进程数
+        chunk_size: 每次写入的行数
+        progress: 每张表完成后的回调 progress(table, rows, seconds)
+
+    Returns:
+        {表名: 写入行数}
+    """
+    if not spec.password_hashes:
+        spec.password_hashes = precompute_password_hashes()
+    with engine.connect() as conn:
+        spec.base_id = (conn.execute(text('SELECT max(id) FROM users')).scalar() or 0) + 1
+
+    url = engine.url.render_as_string(hide_password=False)
+    if processes > 1 and ':memory:' in url:
+        processes = 1
+
+    # 每个任务为一个写入块：负载均衡，且划分（随机序列）与进程数无关
+    def jobs(table, total):
+        return [(spec, table, start, min(start + chunk_size, total), chunk_size)
+                for start in range(0, total, chunk_size)]
+
+    phases = [
+        [('users', spec.users)],
+        [('user_lockouts', spec.users), ('refresh_tokens', spec.users), ('login_attempts', spec.attempts)],
+    ]
+    counts = {}
+    pool = Pool(processes, initializer=_worker_init, initargs=(url,)) if processes > 1 else None
+    try:
+        for phase in phases:
+            started = time.perf_counter()
+            phase_jobs = [job for table, total in phase for job in jobs(table, total)]
+            if pool is not None:
+                results = pool.imap_unordered(_worker_generate, phase_jobs)
+            else:
+                results = ((job[1], generate_range(engine, *job)) for job in phase_jobs)
+            for table, written in results:
+                counts[table] = counts.get(table, 0) + written
+            if progress:
+                for table, _ in phase:
+                    progress(table, counts.get(table, 0), time.perf_counter() - started)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as conn:
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT max(id) FROM users))"))
+            conn.execute(text('ANALYZE users, user_lockouts, refresh_tokens, login_attempts'))
+    return counts
@@ -2,15 +2,143 @@
 Token核心功能
 整合所有JWT和Token相关的功能
 """
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-import secrets
 
 from flask import current_app
+from sqlalchemy import bindparam, delete, insert, select, update
 
 from flaskr.extensions import db
 from flaskr.models.auth import RefreshToken
 from flaskr.utils.response import error_response
 
+refresh_tokens = RefreshToken.__table__
+
+
+class TokenLookupCache:
+    """
+    刷新token查找结果的短期缓存（进程内，按摘要索引）
+
+    正缓存保存 (id, user_id, expires_at)，负缓存保存 None（不存在、已撤销或已使用的token）。
+    本进程撤销或使用token时立即改为负缓存；其他进程的变更最多延迟一个TTL生效。
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        """
+        Returns:
+            (是否命中, 缓存值)
+        """
+        entry = self._entries.get(digest)
+        if entry is None or entry[0] < time.monotonic():
+            return False, None
+        return True, entry[1]
+
+    def set(self, digest, value, ttl):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenLookupCache()
+
+
+def _find_token(conn, token, legacy_lookup=False):
+    """按摘要查找token，找不到且允许时再按旧版原文列查找"""
+    columns = (refresh_tokens.c.id, refresh_tokens.c.user_id, refresh_tokens.c.expires_at, refresh_tokens.c.revoked)
+    row = conn.execute(select(*columns).where(refresh_tokens.c.token_digest == RefreshToken.digest(token))).first()
+    if row is None and legacy_lookup:
+        row = conn.execute(select(*columns).where(refresh_tokens.c.token == token)).first()
+    return row
+
+
+def issue_refresh_token(conn, user_id, expires_in, max_active=0, now=None):
+    """
+    写入新的刷新token，并在同一事务中用一条DELETE清理该用户多余的token
+
+    清理后只保留最新的 max_active 个有效（未撤销、未过期）token，已撤销与已过期的一并删除，
+    表的大小与活跃会话数成正比。
+
+    Args:
+        conn: SQLAlchemy连接（调用方负责提交事务）
+        user_id: 用户ID
+        expires_in: 有效期（timedelta）
+        max_active: 每个用户最多保留的有效token数，0表示不限制
+        now: 当前时间
+
+    Returns:
+        token字符串
+    """
+    now = now or datetime.utcnow()
+    token = RefreshToken.generate_token()
+    conn.execute(insert(refresh_tokens).values(
+        user_id=user_id,
+        token_digest=RefreshToken.digest(token),
+        expires_at=now + expires_in,
+        created_at=now,
+        revoked=False
+    ))
+
+    if max_active > 0:
+        keep = select(refresh_tokens.c.id).where(
+            refresh_tokens.c.user_id == user_id,
+            refresh_tokens.c.revoked.is_(False),
+            refresh_tokens.c.expires_at > now
+        ).order_by(refresh_tokens.c.id.desc()).limit(max_active)
+        conn.execute(delete(refresh_tokens).where(
+            refresh_tokens.c.user_id == user_id,
+            refresh_tokens.c.id.not_in(keep.scalar_subquery())
+        ))
+    return token
+
+
+def consume_refresh_token(conn, token, now=None, legacy_lookup=False, cache_ttl=0):
+    """
+    使用（撤销）刷新token，条件UPDATE保证同一个token只能成功使用一次
+
+    Args:
+        conn: SQLAlchemy连接（调用方负责提交事务）
+        token: 刷新token字符串
+        now: 当前时间
+        legacy_lookup: 是否回退到旧版原文列查找
+        cache_ttl: 负缓存时间（秒），无效token在此期间不再查询数据库
+
+    Returns:
+        用户ID，token无效、已过期、已撤销或已被使用时返回 None
+    """
+    now = now or datetime.utcnow()
+    digest = RefreshToken.digest(token)
+    hit, cached = token_cache.get(digest)
+    if hit and cached is None:
+        return None
+
+    row = _find_token(conn, token, legacy_lookup)
+    if row is None or row.revoked or row.expires_at <= now:
+        token_cache.set(digest, None, cache_ttl)
+        return None
+
+    result = conn.execute(
+        update(refresh_tokens)
+        .where(refresh_tokens.c.id == row.id, refresh_tokens.c.revoked.is_(False))
+        .values(revoked=True)
+    )
+    token_cache.set(digest, None, cache_ttl)
+    return row.user_id if result.rowcount == 1 else None
+
 
 class TokenService:
     """Token服务类"""
@@ -18,29 +146,59 @@ class TokenService:
     @staticmethod
     def create_refresh_token(user_id):
         """
-        创建刷新Token
-        
+        创建刷新Token（超过 MAX_ACTIVE_REFRESH_TOKENS 时在同一事务中删除最旧的token）
+
         Args:
             user_id: 用户ID
-            
+
         Returns:
-            RefreshToken对象
+            token字符串
         """
-        # 生成token
-        token = RefreshToken.generate_token()
-
-        # 创建刷新token记录
-        refresh_expires = current_app.config.get('JWT_REFRESH_TOKEN_EXPIRES', timedelta(days=7))
-        refresh_token = RefreshToken(
-            user_id=user_id,
-            token=token,
-            expires_at=datetime.utcnow() + refresh_expires
+        config = current_app.config
+        token = issue_refresh_token(
+            db.session.connection(),
+            user_id,
+            config.get('JWT_REFRESH_TOKEN_EXPIRES', timedelta(days=7)),
+            config.get('MAX_ACTIVE_REFRESH_TOKENS', 0)
         )
-
-        db.session.add(refresh_token)
         db.session.commit()
+        return token
+
+    @staticmethod
+    def rotate_refresh_token(token):
+        """
+        轮换刷新Token：旧token作废，同一事务中签发新token
 
-        return refresh_token
+        Args:
+            token: 客户端提交的刷新token字符串
+
+        Returns:
+            (user_id, new_token, error_message)
+        """
+        config = current_app.config
+        conn = db.session.connection()
+        try:
+            user_id = consume_refresh_token(
+                conn,
+                token,
+                legacy_lookup=config.get('REFRESH_TOKEN_LEGACY_LOOKUP', False),
+                cache_ttl=config.get('REFRESH_TOKEN_CACHE_TTL', 0)
+            )
+            if user_id is None:
+                db.session.rollback()
+                return None, None, '刷新token无效、已过期或已被使用'
+
+            new_token = issue_refresh_token(
+                conn,
+                user_id,
+                config.get('JWT_REFRESH_TOKEN_EXPIRES', timedelta(days=7)),
+                config.get('MAX_ACTIVE_REFRESH_TOKENS', 0)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return user_id, new_token, None
 
     @staticmethod
     def revoke_refresh_token(token):
@@ -50,43 +208,85 @@ class TokenService:
         Args:
             token: 刷新token字符串
         """
-        refresh_token = RefreshToken.query.filter_by(token=token).first()
-        if refresh_token:
-            refresh_token.revoked = True
+        config = current_app.config
+        row = _find_token(db.session.connection(), token, config.get('REFRESH_TOKEN_LEGACY_LOOKUP', False))
+        if row is not None:
+            db.session.execute(update(refresh_tokens).where(refresh_tokens.c.id == row.id).values(revoked=True))
             db.session.commit()
+        token_cache.set(RefreshToken.digest(token), None, config.get('REFRESH_TOKEN_CACHE_TTL', 0))
 
     @staticmethod
     def validate_refresh_token(token):
         """
-        验证刷新Token
+        验证刷新Token（结果在 REFRESH_TOKEN_CACHE_TTL 秒内缓存）
         
         Args:
             token: 刷新token字符串
             
         Returns:
-            (RefreshToken对象, error_message)
+            (RefreshToken对象（未关联会话）, error_message)
         """
-        refresh_token = RefreshToken.query.filter_by(token=token).first()
+        config = current_app.config
+        digest = RefreshToken.digest(token)
+        hit, cached = token_cache.get(digest)
+        if not hit:
+            row = _find_token(db.session.connection(), token, config.get('REFRESH_TOKEN_LEGACY_LOOKUP', False))
+            cached = None if row is None or row.revoked else (row.id, row.user_id, row.expires_at)
+            token_cache.set(digest, cached, config.get('REFRESH_TOKEN_CACHE_TTL', 0))
 
-        if not refresh_token:
+        if cached is None:
             return None, '无效的刷新token'
 
+        token_id, user_id, expires_at = cached
+        refresh_token = RefreshToken(id=token_id, user_id=user_id, expires_at=expires_at, revoked=False)
         if not refresh_token.is_valid():
             return None, '刷新token已过期或已被撤销'
 
         return refresh_token, None
 
+    @staticmethod
+    def backfill_digests(batch_size=1000):
+        """
+        迁移旧版token：计算摘要写入 token_digest 并清空原文列（分批提交）
+
+        Args:
+            batch_size: 每批处理的行数
+
+        Returns:
+            迁移的行数
+        """
+        migrated = 0
+        while True:
+            rows = db.session.execute(
+                select(refresh_tokens.c.id, refresh_tokens.c.token)
+                .where(refresh_tokens.c.token_digest.is_(None), refresh_tokens.c.token.is_not(None))
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return migrated
+            db.session.execute(
+                update(refresh_tokens)
+                .where(refresh_tokens.c.id == bindparam('row_id'))
+                .values(token_digest=bindparam('digest'), token=None),
+                [{'row_id': row.id, 'digest': RefreshToken.digest(row.token)} for row in rows]
+            )
+            db.session.commit()
+            migrated += len(rows)
+
     @staticmethod
     def cleanup_expired_tokens():
-        """清理过期的刷新token"""
-        expired_tokens = RefreshToken.query.filter(
-            RefreshToken.expires_at < datetime.utcnow()
-        ).all()
+        """
+        清理过期的刷新token（单条DELETE语句，不加载到内存）
 
-        for token in expired_tokens:
-            db.session.delete(token)
+        Returns:
+            删除的数量
+        """
+        deleted = RefreshToken.query.filter(
+            RefreshToken.expires_at < datetime.utcnow()
+        ).delete(synchronize_session=False)
 
         db.session.commit()
+        return deleted
 
 
 def configure_jwt_handlers(jwt):
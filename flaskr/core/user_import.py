@@ -0,0 +1,246 @@
+"""
+批量导入用户
+进程池并行计算密码哈希，集合查询去重，分块批量写入，支持断点续传
+"""
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import insert, select
+
+from flaskr.extensions import db
+from flaskr.models.user import BCRYPT_ROUNDS, User, hash_password
+from flaskr.utils.input_validation import validate_email
+from flaskr.utils.row_count import invalidate_count
+
+# 写入 users 表的列（顺序与 COPY 一致）
+_COLUMNS = ('username', 'email', 'password_hash', 'created_at', 'updated_at', 'is_active')
+
+
+def read_records(path, fmt=None):
+    """
+    逐行读取导入文件
+
+    Args:
+        path: CSV（表头含 username,email,password[,is_active]）或 NDJSON 文件
+        fmt: 'csv' / 'ndjson'，默认按扩展名判断
+
+    Returns:
+        记录字典的迭代器
+    """
+    fmt = fmt or ('csv' if path.endswith('.csv') else 'ndjson')
+    with open(path, encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    if value is None or value == '':
+        return True
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+class ImportStats:
+    """导入统计"""
+
+    def __init__(self, **counts):
+        self.processed = counts.get('processed', 0)
+        self.inserted = counts.get('inserted', 0)
+        self.invalid = counts.get('invalid', 0)
+        self.duplicate_in_file = counts.get('duplicate_in_file', 0)
+        self.duplicate_in_db = counts.get('duplicate_in_db', 0)
+        # 本次运行（不含断点之前）处理的行数与开始时间
+        self.run_processed = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        """本次运行的耗时（秒）"""
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        """本次运行的处理速度（行/秒）"""
+        elapsed = self.elapsed
+        return self.run_processed / elapsed if elapsed else 0.0
+
+    def to_dict(self):
+        return {
+            'processed': self.processed,
+            'inserted': self.inserted,
+            'invalid': self.invalid,
+            'duplicate_in_file': self.duplicate_in_file,
+            'duplicate_in_db': self.duplicate_in_db
+        }
+
+
+class UserImporter:
+    """
+    用户批量导入器（需要在应用上下文中使用）
+
+    每个分块：校验 -> 文件内去重 -> 数据库去重（IN 查询）-> 进程池计算哈希 -> 批量写入并提交 -> 保存断点。
+    断点保存在提交之后；若两者之间中断，续传时重复的行会被数据库去重跳过。
+    """
+
+    def __init__(self, chunk_size=5000, processes=None, rounds=BCRYPT_ROUNDS, checkpoint_path=None):
+        """
+        Args:
+            chunk_size: 每块的行数
+            processes: 计算哈希的进程数，默认CPU核数
+            rounds: bcrypt 计算轮数
+            checkpoint_path: 断点文件路径，为空时不保存断点
+        """
+        self.chunk_size = chunk_size
+        self.processes = processes or os.cpu_count()
+        self.rounds = rounds
+        self.checkpoint_path = checkpoint_path
+        self._seen_usernames = set()
+        self._seen_emails = set()
+
+    def load_checkpoint(self):
+        """读取断点，返回已处理的行数与统计"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0, {}
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            data = json.load(f)
+        return data['offset'], data.get('stats', {})
+
+    def _save_checkpoint(self, offset, stats):
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'offset': offset, 'stats': stats.to_dict()}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def run(self, records, resume=True, progress=None):
+        """
+        执行导入
+
+        Args:
+            records: 记录迭代器（read_records 的返回值）
+            resume: 是否从断点继续
+            progress: 每块完成后的回调 progress(stats)
+
+        Returns:
+            ImportStats
+        """
+        offset, previous = self.load_checkpoint() if resume else (0, {})
+        stats = ImportStats(**previous)
+        records = iter(records)
+        if offset:
+            # 跳过已处理的行（按与导入相同的校验与去重规则，恢复文件内去重所需的用户名与邮箱）
+            for record in islice(records, offset):
+                parsed = self._parse_record(record)
+                if parsed is not None:
+                    self._claim(parsed)
+
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            while True:
+                chunk = list(islice(records, self.chunk_size))
+                if not chunk:
+                    break
+                self._import_chunk(chunk, pool, stats)
+                offset += len(chunk)
+                self._save_checkpoint(offset, stats)
+                if progress:
+                    progress(stats)
+
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return stats
+
+    @staticmethod
+    def _parse_record(record):
+        """校验一行记录，返回 (username, email, password, is_active)，无效时返回 None"""
+        username = str(record.get('username') or '').strip()
+        email = str(record.get('email') or '').strip()
+        password = record.get('password') or ''
+        if not username or len(password) < 8 or not validate_email(email)[0]:
+            return None
+        return username, email, password, _parse_bool(record.get('is_active'))
+
+    def _claim(self, parsed):
+        """登记用户名与邮箱，文件内已出现过时返回 False"""
+        username, email = parsed[0], parsed[1]
+        if username in self._seen_usernames or email in self._seen_emails:
+            return False
+        self._seen_usernames.add(username)
+        self._seen_emails.add(email)
+        return True
+
+    def _import_chunk(self, chunk, pool, stats):
+        candidates = []
+        for record in chunk:
+            parsed = self._parse_record(record)
+            if parsed is None:
+                stats.invalid += 1
+                continue
+            if not self._claim(parsed):
+                stats.duplicate_in_file += 1
+                continue
+            candidates.append(parsed)
+
+        if candidates:
+            existing_usernames = set(db.session.scalars(
+                select(User.username).where(User.username.in_([c[0] for c in candidates]))
+            ))
+            existing_emails = set(db.session.scalars(
+                select(User.email).where(User.email.in_([c[1] for c in candidates]))
+            ))
+            fresh = [c for c in candidates if c[0] not in existing_usernames and c[1] not in existing_emails]
+            stats.duplicate_in_db += len(candidates) - len(fresh)
+
+            if fresh:
+                hashes = pool.map(
+                    hash_password, [c[2] for c in fresh], [self.rounds] * len(fresh),
+                    chunksize=max(1, len(fresh) // (self.processes * 4))
+                )
+                now = datetime.utcnow()
+                rows = [
+                    (username, email, password_hash, now, now, is_active)
+                    for (username, email, _, is_active), password_hash in zip(fresh, hashes)
+                ]
+                bulk_insert_users(rows)
+                stats.inserted += len(rows)
+
+        stats.processed += len(chunk)
+        stats.run_processed += len(chunk)
+
+
+def bulk_insert_users(rows):
+    """
+    批量写入用户并提交（PostgreSQL 使用 COPY，其他数据库使用 executemany）
+
+    Args:
+        rows: 按 _COLUMNS 顺序的元组列表
+    """
+    if db.engine.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(value.isoformat() if isinstance(value, datetime) else value for value in row)
+        buffer.seek(0)
+
+        connection = db.session.connection()
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY users ({', '.join(_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        db.session.execute(insert(User), [dict(zip(_COLUMNS, row)) for row in rows])
+    db.session.commit()
+    invalidate_count(User)
@@ -0,0 +1,118 @@
+"""
+用户搜索
+按 username 前缀与子串匹配，结果按相关度排序并使用游标（keyset）分页
+
+用户名是公开标识（返回时不脱敏），可以任意匹配；邮箱返回时脱敏，不参与搜索，
+否则按邮箱前缀搜索就能逐个字符试出完整邮箱。
+"""
+import base64
+import json
+
+from sqlalchemy import case, column, func, literal, literal_column, select, table, tuple_
+
+from flaskr.extensions import db
+from flaskr.models.user import User
+
+# trigram 索引至少需要3个字符，更短的查询只做前缀匹配
+MIN_SUBSTRING_LENGTH = 3
+
+_fts = table('users_search', column('rowid'))
+
+
+class InvalidCursorError(ValueError):
+    """无法解析的分页游标"""
+
+
+def encode_cursor(tier, score, user_id):
+    """编码分页游标（排序键）"""
+    raw = json.dumps([tier, score, user_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解析分页游标
+
+    Raises:
+        InvalidCursorError: 游标格式错误
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        tier, score, user_id = json.loads(raw)
+        return int(tier), float(score), int(user_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorError('无效的分页游标')
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _has_fts_table(connection):
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_search'"
+    ).first() is not None
+
+
+def search_users(query, columns, limit=20, cursor=None):
+    """
+    搜索用户
+
+    排序键为 (tier, score, id)：tier 0 为完全匹配，1 为前缀匹配，2 为子串匹配；
+    score 越小越相关（SQLite 为 bm25，PostgreSQL 为负的 trigram 相似度）。
+
+    Args:
+        query: 搜索词
+        columns: 需要查询的列（结果行的前 len(columns) 项）
+        limit: 每页数量
+        cursor: 上一页返回的游标
+
+    Returns:
+        (rows, next_cursor)
+
+    Raises:
+        InvalidCursorError: 游标格式错误
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    prefix = _escape_like(query) + '%'
+    substring = '%' + _escape_like(query) + '%'
+
+    if dialect == 'postgresql':
+        exact = func.lower(User.username) == query.lower()
+        is_prefix = User.username.ilike(prefix, escape='\\')
+    else:
+        exact = User.username == query
+        is_prefix = User.username.like(prefix, escape='\\')
+    tier = case((exact, 0), (is_prefix, 1), else_=2)
+
+    stmt = select(*columns, tier.label('tier'))
+    if len(query) < MIN_SUBSTRING_LENGTH:
+        stmt = stmt.add_columns(literal(0.0).label('score')).where(is_prefix)
+    elif dialect == 'postgresql':
+        # pg_trgm GIN 索引支持 ILIKE 子串匹配
+        stmt = stmt.add_columns((-func.similarity(User.username, query)).label('score')).where(
+            User.username.ilike(substring, escape='\\')
+        )
+    elif dialect == 'sqlite' and _has_fts_table(connection):
+        # 限定 username 列的短语查询：trigram 分词下匹配任意位置的子串
+        match = 'username : "' + query.replace('"', '""') + '"'
+        stmt = stmt.add_columns(func.bm25(literal_column('users_search')).label('score')).join(
+            _fts, _fts.c.rowid == User.id
+        ).where(literal_column('users_search').op('MATCH')(match))
+    else:
+        stmt = stmt.add_columns(literal(0.0).label('score')).where(User.username.like(substring, escape='\\'))
+
+    ranked = stmt.add_columns(User.id.label('sort_id')).subquery()
+    keys = (ranked.c.tier, ranked.c.score, ranked.c.sort_id)
+    page = select(*[ranked.c[col.key] for col in columns], *keys).order_by(*keys).limit(limit + 1)
+    if cursor:
+        page = page.where(tuple_(*keys) > tuple_(*decode_cursor(cursor)))
+
+    rows = connection.execute(page).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.tier, last.score, last.sort_id)
+    return rows, next_cursor
@@ -0,0 +1,64 @@
+"""
+定时任务模块
+由 gunicorn 的 post_worker_init 钩子启动，各工作进程选主后只有一个进程执行任务
+"""
+import logging
+
+from flaskr.crons.leader import FileLeaderLock, AdvisoryLeaderLock, create_leader_lock
+from flaskr.crons.scheduler import Job, Scheduler, cron, registered_jobs
+
+__all__ = [
+    'FileLeaderLock',
+    'AdvisoryLeaderLock',
+    'Job',
+    'Scheduler',
+    'cron',
+    'start_scheduler',
+    'stop_scheduler'
+]
+
+logger = logging.getLogger(__name__)
+
+_scheduler = None
+
+
+def start_scheduler(app):
+    """
+    启动当前进程的定时任务调度器（CRON_ENABLED 关闭时不启动）
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        Scheduler 或 None
+    """
+    global _scheduler
+    if not app.config.get('CRON_ENABLED', True) or _scheduler is not None:
+        return _scheduler
+
+    # 导入任务定义，完成注册
+    import flaskr.crons.jobs  # noqa: F401
+
+    jobs = registered_jobs()
+    for name, interval in app.config.get('CRON_INTERVALS', {}).items():
+        if name in jobs:
+            jobs[name].interval = interval
+
+    _scheduler = Scheduler(
+        app,
+        create_leader_lock(app),
+        jobs,
+        leader_retry=app.config.get('CRON_LEADER_RETRY_SECONDS', 30),
+        max_workers=app.config.get('CRON_MAX_WORKERS', 2)
+    )
+    _scheduler.start()
+    logger.info("定时任务调度器已启动: %s", ', '.join(jobs))
+    return _scheduler
+
+
+def stop_scheduler():
+    """停止当前进程的定时任务调度器"""
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
@@ -0,0 +1,18 @@
+"""
+定时任务定义
+执行间隔可以通过 CRON_INTERVALS 配置覆盖
+"""
+import logging
+
+from flaskr.crons.scheduler import cron
+
+logger = logging.getLogger(__name__)
+
+
+@cron(interval=3600)
+def cleanup_expired_tokens():
+    """清理过期的刷新token"""
+    from flaskr.core.token import TokenService
+
+    deleted = TokenService.cleanup_expired_tokens()
+    logger.info("已清理过期刷新token: %s", deleted)
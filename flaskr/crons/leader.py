@@ -0,0 +1,159 @@
+"""
+定时任务选主
+同一时刻只有持有锁的进程执行定时任务：文件锁（单机）或 PostgreSQL advisory lock（集群）
+"""
+import fcntl
+import logging
+import os
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from flaskr.utils.safe_file import instance_file, open_private_file
+
+logger = logging.getLogger(__name__)
+
+
+class FileLeaderLock:
+    """
+    基于文件锁的选主（单机范围）
+
+    进程退出时操作系统自动释放锁，其他进程下次尝试时即可接替。
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: 锁文件路径
+        """
+        self.path = path
+        self._fd = None
+
+    def try_acquire(self):
+        """
+        尝试成为主进程（非阻塞）
+
+        Returns:
+            是否持有锁
+
+        Raises:
+            OSError: 锁文件是符号链接或不安全
+        """
+        if self._fd is not None:
+            return True
+        fd = open_private_file(self.path, '定时任务锁文件')
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def is_held(self):
+        """是否仍持有锁"""
+        return self._fd is not None
+
+    def release(self):
+        """释放锁"""
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+class AdvisoryLeaderLock:
+    """
+    基于 PostgreSQL session 级 advisory lock 的选主（集群范围）
+
+    锁由一个专用连接持有，连接断开时数据库自动释放锁。
+    """
+
+    def __init__(self, engine, key):
+        """
+        Args:
+            engine: SQLAlchemy引擎（应与请求使用的连接池分开）
+            key: advisory lock 的键（bigint）
+        """
+        self.engine = engine
+        self.key = key
+        self._conn = None
+
+    def try_acquire(self):
+        """
+        尝试成为主进程（非阻塞）
+
+        Returns:
+            是否持有锁
+        """
+        if self._conn is not None:
+            return self.is_held()
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': self.key}).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    def is_held(self):
+        """检查持有锁的连接是否仍然可用（连接断开即失去锁）"""
+        if self._conn is None:
+            return False
+        try:
+            self._conn.execute(text('SELECT 1'))
+            self._conn.commit()
+            return True
+        except Exception as e:
+            logger.warning("定时任务锁连接已断开: %s", e)
+            self._close()
+            return False
+
+    def release(self):
+        """释放锁"""
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': self.key})
+            self._conn.commit()
+        finally:
+            self._close()
+
+    def _close(self):
+        try:
+            self._conn.invalidate()
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+
+def create_leader_lock(app):
+    """
+    根据配置创建选主锁
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        FileLeaderLock 或 AdvisoryLeaderLock
+    """
+    if app.config.get('CRON_LEADER_LOCK', 'file') == 'postgres':
+        from flaskr.extensions import db
+
+        with app.app_context():
+            url = db.engine.url
+        # 主进程在任期内一直占用锁连接，使用独立引擎（NullPool），不占请求连接池的名额
+        engine = create_engine(url, poolclass=NullPool)
+        return AdvisoryLeaderLock(engine, app.config.get('CRON_ADVISORY_LOCK_KEY', 7301))
+    return FileLeaderLock(app.config.get('CRON_LOCK_FILE') or instance_file(app, 'cron.lock'))
@@ -0,0 +1,202 @@
+"""
+进程内定时任务调度器
+在独立线程中运行，只有选主成功的进程执行任务，任务不会在请求线程中运行
+"""
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flaskr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 已注册的定时任务
+_registry = {}
+
+
+class Job:
+    """定时任务"""
+
+    def __init__(self, name, func, interval, jitter=0.1):
+        """
+        Args:
+            name: 任务名称
+            func: 任务函数（在应用上下文中调用，无参数）
+            interval: 执行间隔（秒）
+            jitter: 间隔的随机抖动比例，避免多个任务或多台机器同时执行
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.running = False
+        self.next_run = None
+        self.last_run = None
+        self.last_duration_ms = None
+        self.last_error = None
+
+    def schedule_next(self, now, first=False):
+        """计算下次执行时间（首次执行在一个间隔内随机错开）"""
+        if first:
+            self.next_run = now + random.uniform(0, self.interval * max(self.jitter, 0.1))
+        else:
+            spread = self.interval * self.jitter
+            self.next_run = now + self.interval + random.uniform(-spread, spread)
+
+
+def cron(interval, jitter=0.1, name=None):
+    """
+    注册定时任务
+
+    Args:
+        interval: 执行间隔（秒）
+        jitter: 间隔的随机抖动比例
+        name: 任务名称，默认使用函数名
+
+    Returns:
+        装饰器函数
+    """
+
+    def decorator(f):
+        job_name = name or f.__name__
+        _registry[job_name] = Job(job_name, f, interval, jitter)
+        return f
+
+    return decorator
+
+
+def registered_jobs():
+    """已注册的定时任务"""
+    return dict(_registry)
+
+
+class Scheduler:
+    """
+    定时任务调度器
+
+    - 非主进程每隔 leader_retry 秒尝试成为主进程（主进程退出后由其他进程接替）
+    - 任务在线程池中执行；同一任务上一次尚未结束时跳过本次执行
+    """
+
+    def __init__(self, app, lock, jobs, leader_retry=30, max_workers=2):
+        """
+        Args:
+            app: Flask应用实例
+            lock: 选主锁（FileLeaderLock / AdvisoryLeaderLock）
+            jobs: {名称: Job}
+            leader_retry: 选主重试间隔（秒）
+            max_workers: 同时执行的任务数
+        """
+        self.app = app
+        self.lock = lock
+        self.jobs = jobs
+        self.leader_retry = leader_retry
+        self.is_leader = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cron-job')
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """启动调度线程"""
+        self._thread = threading.Thread(target=self._run, name='cron-scheduler', daemon=True)
+        self._thread.start()
+        metrics.register_collector('crons', self.status)
+
+    def stop(self):
+        """停止调度并释放锁"""
+        self._stop.set()
+        self._executor.shutdown(wait=False)
+        if self.is_leader:
+            self.lock.release()
+            self.is_leader = False
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._ensure_leader():
+                self._stop.wait(self.leader_retry)
+                continue
+
+            now = time.monotonic()
+            for job in self.jobs.values():
+                if job.next_run is None:
+                    job.schedule_next(now, first=True)
+                elif now >= job.next_run:
+                    self._submit(job)
+                    job.schedule_next(now)
+
+            next_run = min((job.next_run for job in self.jobs.values()), default=now + self.leader_retry)
+            self._stop.wait(max(0.05, min(next_run - time.monotonic(), self.leader_retry)))
+
+    def _ensure_leader(self):
+        try:
+            held = self.lock.try_acquire() if not self.is_leader else self.lock.is_held()
+        except Exception as e:
+            logger.warning("定时任务选主失败: %s", e)
+            held = False
+
+        if held != self.is_leader:
+            self.is_leader = held
+            metrics.set_gauge('cron_leader', int(held))
+            logger.info("进程 %s %s定时任务主进程", os.getpid(), '成为' if held else '不再是')
+            if not held:
+                for job in self.jobs.values():
+                    job.next_run = None
+        return held
+
+    def _submit(self, job):
+        if job.running:
+            metrics.incr('cron_job_skipped', job=job.name)
+            logger.warning("定时任务 %s 上一次执行尚未结束，跳过本次执行", job.name)
+            return
+        job.running = True
+        self._executor.submit(self.run_job, job)
+
+    def run_job(self, job):
+        """
+        在应用上下文中执行任务并记录耗时
+
+        Args:
+            job: Job
+        """
+        from flaskr.extensions import db
+
+        started = time.perf_counter()
+        status = 'ok'
+        try:
+            with self.app.app_context():
+                try:
+                    job.func()
+                finally:
+                    db.session.remove()
+            job.last_error = None
+        except Exception as e:
+            status = 'error'
+            job.last_error = str(e)
+            logger.error("定时任务 %s 执行失败: %s", job.name, e, exc_info=True)
+        finally:
+            job.running = False
+            job.last_run = time.time()
+            job.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            metrics.incr('cron_job_runs', job=job.name, status=status)
+            metrics.observe('cron_job_duration_ms', job.last_duration_ms, job=job.name)
+
+    def status(self):
+        """调度器状态（用于指标）"""
+        now = time.monotonic()
+        return {
+            'leader': self.is_leader,
+            'jobs': {
+                job.name: {
+                    'interval': job.interval,
+                    'running': job.running,
+                    'last_run': job.last_run,
+                    'last_duration_ms': job.last_duration_ms,
+                    'last_error': job.last_error,
+                    'next_run_in': round(job.next_run - now, 1) if job.next_run is not None else None
+                }
+                for job in self.jobs.values()
+            }
+        }
@@ -6,15 +6,11 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
 # 数据库
 db = SQLAlchemy()
 
-# 数据库迁移
-migrate = Migrate()
-
 # CORS
 cors = CORS()
 
@@ -42,3 +38,17 @@ RATE_LIMITS = {
         'default': "1000 per hour",
     }
 }
+
+
+def __getattr__(name):
+    """
+    数据库迁移实例延迟创建
+
+    Flask-Migrate 会导入 Alembic，只有命令行（flask db ...）需要，
+    Web 进程不访问 migrate 时不产生导入开销。
+    """
+    if name == 'migrate':
+        from flask_migrate import Migrate
+        globals()['migrate'] = Migrate()
+        return globals()['migrate']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -4,11 +4,23 @@
 from flaskr.middleware.security_headers import add_security_headers, remove_sensitive_headers
 from flaskr.middleware.input_validation import validate_content_type
 from flaskr.middleware.error_handler import register_error_handlers
+from flaskr.middleware.profiler import register_profiler
+from flaskr.middleware.admission import register_admission_control
+from flaskr.middleware.deadline import register_request_deadlines
+from flaskr.middleware.circuit_breaker import register_db_circuit_breaker
+from flaskr.middleware.health_probe import register_health_probes
+from flaskr.middleware.proxy import register_proxy_fix
 
 __all__ = [
     'add_security_headers',
     'remove_sensitive_headers',
     'validate_content_type',
-    'register_error_handlers'
+    'register_error_handlers',
+    'register_profiler',
+    'register_admission_control',
+    'register_request_deadlines',
+    'register_db_circuit_breaker',
+    'register_health_probes',
+    'register_proxy_fix'
 ]
 
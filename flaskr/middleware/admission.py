@@ -0,0 +1,178 @@
+"""
+准入控制中间件
+根据排队时间与进程内并发数，在过载时优先拒绝低优先级请求（快速返回503）
+"""
+import logging
+import os
+import threading
+import time
+
+from flask import g, request
+
+from flaskr.utils.metrics import metrics
+from flaskr.utils.response import error_response
+
+logger = logging.getLogger(__name__)
+
+REQUEST_START_HEADER = 'X-Request-Start'
+
+PRIORITY_CRITICAL = 'critical'
+PRIORITY_NORMAL = 'normal'
+PRIORITY_LOW = 'low'
+
+
+def parse_request_start(value, now=None):
+    """
+    解析上游代理写入的请求开始时间，计算排队时间
+
+    支持 nginx 的 "t=1700000000.123"（秒）以及毫秒、微秒时间戳。
+
+    Args:
+        value: X-Request-Start 请求头的值
+        now: 当前时间戳（秒），默认 time.time()
+
+    Returns:
+        排队时间（毫秒），无法解析时返回None
+    """
+    if not value:
+        return None
+    if value.startswith('t='):
+        value = value[2:]
+    try:
+        started = float(value)
+    except ValueError:
+        return None
+
+    # 按数量级区分单位：微秒 / 毫秒 / 秒
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+
+    queue_ms = ((now or time.time()) - started) * 1000
+    return max(0.0, queue_ms)
+
+
+class AdmissionController:
+    """
+    准入控制器（每个工作进程一份）
+
+    - 排队时间超过对应优先级的阈值时拒绝（客户端很可能已经超时，不再做bcrypt等昂贵操作）
+    - 低优先级请求只能占用一半的并发容量，普通请求不能超过全部容量，关键请求不按并发拒绝
+    """
+
+    def __init__(self, endpoint_priorities, queue_limits_ms, max_in_flight):
+        """
+        Args:
+            endpoint_priorities: {endpoint: 优先级}，未列出的为普通优先级
+            queue_limits_ms: {优先级: 最大排队时间（毫秒）}，0表示不限制
+            max_in_flight: 单进程最大并发数
+        """
+        self.endpoint_priorities = endpoint_priorities
+        self.queue_limits_ms = queue_limits_ms
+        self.in_flight_limits = {
+            PRIORITY_LOW: max(1, max_in_flight // 2),
+            PRIORITY_NORMAL: max(1, max_in_flight),
+        }
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def enter(self):
+        """请求开始，返回包含当前请求在内的并发数"""
+        with self._lock:
+            self.in_flight += 1
+            return self.in_flight
+
+    def leave(self):
+        """请求结束"""
+        with self._lock:
+            self.in_flight -= 1
+
+    def priority_of(self, endpoint):
+        """获取端点优先级"""
+        return self.endpoint_priorities.get(endpoint, PRIORITY_NORMAL)
+
+    def check(self, priority, queue_ms, in_flight):
+        """
+        判断是否拒绝请求
+
+        Args:
+            priority: 请求优先级
+            queue_ms: 排队时间（毫秒），未知时为None
+            in_flight: 当前并发数（含本请求）
+
+        Returns:
+            拒绝原因（'queue_time' / 'concurrency'），允许时返回None
+        """
+        limit = self.queue_limits_ms.get(priority)
+        if limit and queue_ms is not None and queue_ms > limit:
+            return 'queue_time'
+
+        in_flight_limit = self.in_flight_limits.get(priority)
+        if in_flight_limit and in_flight > in_flight_limit:
+            return 'concurrency'
+        return None
+
+
+def _build_priorities(app):
+    priorities = {}
+    for endpoint in app.config.get('ADMISSION_LOW_PRIORITY_ENDPOINTS', []):
+        priorities[f'main.{endpoint}'] = PRIORITY_LOW
+    for endpoint in app.config.get('ADMISSION_CRITICAL_ENDPOINTS', []):
+        priorities[f'main.{endpoint}'] = PRIORITY_CRITICAL
+    return priorities
+
+
+def register_admission_control(app):
+    """
+    注册准入控制钩子（插入到 before_request 链的最前面）
+
+    ADMISSION_CONTROL_ENABLED 关闭时不注册任何钩子。
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('ADMISSION_CONTROL_ENABLED', True):
+        return
+
+    # 默认与 gunicorn 每进程线程数一致（由 gunicorn.conf.py 写入环境变量）
+    max_in_flight = app.config.get('ADMISSION_MAX_IN_FLIGHT') or int(os.environ.get('GUNICORN_THREADS', '1'))
+    controller = AdmissionController(
+        endpoint_priorities=_build_priorities(app),
+        queue_limits_ms={
+            PRIORITY_LOW: app.config.get('ADMISSION_LOW_QUEUE_MS', 1000),
+            PRIORITY_NORMAL: app.config.get('ADMISSION_NORMAL_QUEUE_MS', 5000),
+            PRIORITY_CRITICAL: app.config.get('ADMISSION_CRITICAL_QUEUE_MS', 15000),
+        },
+        max_in_flight=max_in_flight
+    )
+    retry_after = str(app.config.get('ADMISSION_RETRY_AFTER', 1))
+    app.extensions['admission_controller'] = controller
+    metrics.register_collector('admission', lambda: {'in_flight': controller.in_flight})
+
+    def admit_request():
+        in_flight = controller.enter()
+        g._admission_entered = True
+
+        queue_ms = parse_request_start(request.headers.get(REQUEST_START_HEADER))
+        if queue_ms is not None:
+            metrics.observe('request_queue_ms', queue_ms)
+
+        priority = controller.priority_of(request.endpoint)
+        reason = controller.check(priority, queue_ms, in_flight)
+        if reason is None:
+            return None
+
+        metrics.incr('admission_rejected', priority=priority, reason=reason)
+        response, status_code = error_response('服务繁忙，请稍后重试', 503)
+        response.headers['Retry-After'] = retry_after
+        return response, status_code
+
+    @app.teardown_request
+    def release_request(exc):
+        if g.pop('_admission_entered', False):
+            controller.leave()
+
+    # 放在其他 before_request 钩子之前，被拒绝的请求不再执行后续检查
+    app.before_request_funcs.setdefault(None, []).insert(0, admit_request)
+    logger.info("准入控制已启用: max_in_flight=%s", max_in_flight)
@@ -0,0 +1,53 @@
+"""
+数据库熔断中间件
+熔断期间依赖数据库的请求直接返回503，不再等待连接超时
+"""
+import logging
+
+from flask import request
+
+from flaskr.utils.circuit_breaker import CircuitBreaker, install_circuit_breaker
+from flaskr.utils.metrics import metrics
+from flaskr.utils.response import error_response
+
+logger = logging.getLogger(__name__)
+
+
+def register_db_circuit_breaker(app):
+    """
+    注册数据库熔断器（需要在 db.init_app 之后调用）
+
+    CIRCUIT_BREAKER_EXEMPT_ENDPOINTS 中的端点不访问数据库，熔断期间继续服务。
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('CIRCUIT_BREAKER_ENABLED', True):
+        return
+
+    from flaskr.extensions import db
+
+    breaker = CircuitBreaker(
+        'database',
+        failure_threshold=app.config.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5),
+        reset_timeout=app.config.get('CIRCUIT_BREAKER_RESET_TIMEOUT', 10),
+        latency_threshold_ms=app.config.get('CIRCUIT_BREAKER_LATENCY_MS', 0)
+    )
+    with app.app_context():
+        install_circuit_breaker(db.engine, breaker)
+    app.extensions['db_circuit_breaker'] = breaker
+    metrics.register_collector('db_circuit_breaker', breaker.status)
+
+    exempt = {f'main.{name}' for name in app.config.get('CIRCUIT_BREAKER_EXEMPT_ENDPOINTS', [])}
+    retry_after = str(app.config.get('CIRCUIT_BREAKER_RESET_TIMEOUT', 10))
+
+    @app.before_request
+    def check_db_circuit():
+        if request.endpoint is None or request.endpoint in exempt:
+            return None
+        if breaker.allow():
+            return None
+        metrics.incr('circuit_breaker_rejected', breaker=breaker.name)
+        response, status_code = error_response('服务暂时不可用，请稍后重试', 503)
+        response.headers['Retry-After'] = retry_after
+        return response, status_code
@@ -0,0 +1,53 @@
+"""
+请求截止时间中间件
+为每个请求设置处理时间预算，超时请求快速失败而不是占满 gunicorn 的 timeout
+"""
+import logging
+
+from flask import g, request
+
+from flaskr.utils.deadline import DeadlineExceeded, reset_deadline, start_deadline
+from flaskr.utils.metrics import metrics
+from flaskr.utils.response import error_response
+
+logger = logging.getLogger(__name__)
+
+
+def register_request_deadlines(app):
+    """
+    注册请求截止时间钩子与超时错误处理
+
+    预算优先级：ROUTE_DEADLINES_MS 配置 > @deadline 装饰器 > REQUEST_DEADLINE_MS；
+    为0时该请求不设置截止时间。
+
+    Args:
+        app: Flask应用实例
+    """
+    def budget_for(endpoint):
+        if endpoint is None:
+            return 0
+        route_deadlines = app.config.get('ROUTE_DEADLINES_MS', {})
+        name = endpoint.rsplit('.', 1)[-1]
+        if name in route_deadlines:
+            return route_deadlines[name]
+        view = app.view_functions.get(endpoint)
+        return getattr(view, 'deadline_ms', app.config.get('REQUEST_DEADLINE_MS', 0))
+
+    @app.before_request
+    def start_request_deadline():
+        budget_ms = budget_for(request.endpoint)
+        if budget_ms:
+            g._deadline_token = start_deadline(budget_ms)
+
+    @app.teardown_request
+    def reset_request_deadline(exc):
+        token = g.pop('_deadline_token', None)
+        if token is not None:
+            reset_deadline(token)
+
+    @app.errorhandler(DeadlineExceeded)
+    def deadline_exceeded(error):
+        """请求超过处理时间预算"""
+        metrics.incr('deadline_exceeded', endpoint=request.endpoint, stage=error.stage)
+        logger.warning("Deadline Exceeded: %s - stage=%s", request.url, error.stage)
+        return error_response('请求处理超时，请稍后重试', 503)
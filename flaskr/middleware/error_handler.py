@@ -4,11 +4,24 @@
 import logging
 from flask import request
 from werkzeug.exceptions import HTTPException
+from flaskr.utils.log_throttle import LogThrottle
+from flaskr.utils.metrics import metrics
 from flaskr.utils.response import error_response
 
 logger = logging.getLogger(__name__)
 
 
+def _event_key(status):
+    """
+    生成聚合键 (status, route, client_ip)
+
+    未匹配到路由时使用固定占位符，避免扫描路径导致键数量无限增长
+    """
+    rule = request.url_rule
+    route = rule.rule if rule is not None else '<unmatched>'
+    return status, route, request.remote_addr
+
+
 def register_error_handlers(app):
     """
     注册错误处理器
@@ -16,52 +29,71 @@ def register_error_handlers(app):
     Args:
         app: Flask应用实例
     """
+    # 对扫描/洪泛类错误（404、405、406、429）做聚合限流；
+    # 日志参数使用 request.path（已解析的属性），被抑制的事件不再拼接完整URL
+    throttle = None
+    if app.config.get('ERROR_LOG_THROTTLE_ENABLED', True):
+        throttle = LogThrottle(
+            logger,
+            window=app.config.get('ERROR_LOG_THROTTLE_WINDOW', 60),
+            max_keys=app.config.get('ERROR_LOG_THROTTLE_MAX_KEYS', 10000)
+        )
+        app.extensions['error_log_throttle'] = throttle
+        metrics.register_collector('error_log_throttle', throttle.stats)
+
+    def log_flood_event(level, status, msg, *args):
+        metrics.incr('http_errors', status=status)
+        if throttle is None:
+            logger.log(level, msg, *args)
+        else:
+            throttle.log(level, _event_key(status), msg, *args)
+
     @app.errorhandler(400)
     def bad_request(error):
         """400 Bad Request"""
-        logger.warning(f"Bad Request: {request.url} - {error}")
+        logger.warning("Bad Request: %s - %s", request.url, error)
         return error_response('请求参数错误', 400)
     
     @app.errorhandler(401)
     def unauthorized(error):
         """401 Unauthorized"""
-        logger.warning(f"Unauthorized: {request.url}")
+        logger.warning("Unauthorized: %s", request.url)
         return error_response('未授权访问', 401)
     
     @app.errorhandler(403)
     def forbidden(error):
         """403 Forbidden"""
-        logger.warning(f"Forbidden: {request.url}")
+        logger.warning("Forbidden: %s", request.url)
         return error_response('无权访问', 403)
     
     @app.errorhandler(404)
     def not_found(error):
         """404 Not Found"""
-        logger.info(f"Not Found: {request.url}")
+        log_flood_event(logging.INFO, 404, "Not Found: %s", request.path)
         return error_response('资源不存在', 404)
     
     @app.errorhandler(405)
     def method_not_allowed(error):
         """405 Method Not Allowed"""
-        logger.warning(f"Method Not Allowed: {request.method} {request.url}")
+        log_flood_event(logging.WARNING, 405, "Method Not Allowed: %s %s", request.method, request.path)
         return error_response('不允许的HTTP方法', 405)
     
     @app.errorhandler(406)
     def not_acceptable(error):
         """406 Not Acceptable"""
-        logger.warning(f"Not Acceptable: {request.url}")
+        log_flood_event(logging.WARNING, 406, "Not Acceptable: %s", request.path)
         return error_response('不支持的Content-Type', 406)
     
     @app.errorhandler(429)
     def rate_limit_exceeded(error):
         """429 Too Many Requests"""
-        logger.warning(f"Rate Limit Exceeded: {request.remote_addr} - {request.url}")
+        log_flood_event(logging.WARNING, 429, "Rate Limit Exceeded: %s - %s", request.remote_addr, request.path)
         return error_response('请求过于频繁，请稍后再试', 429)
     
     @app.errorhandler(500)
     def internal_server_error(error):
         """500 Internal Server Error"""
-        logger.error(f"Internal Server Error: {request.url} - {error}", exc_info=True)
+        logger.error("Internal Server Error: %s - %s", request.url, error, exc_info=True)
         if app.config.get('DEBUG', False):
             return error_response(f'服务器内部错误: {str(error)}', 500)
         else:
@@ -70,13 +102,13 @@ def register_error_handlers(app):
     @app.errorhandler(HTTPException)
     def http_exception_handler(error):
         """处理HTTP异常"""
-        logger.warning(f"HTTP Exception: {error.code} - {request.url}")
+        logger.warning("HTTP Exception: %s - %s", error.code, request.url)
         return error_response(error.description or '请求错误', error.code)
     
     @app.errorhandler(Exception)
     def general_exception_handler(error):
         """处理所有未捕获的异常"""
-        logger.error(f"Unhandled Exception: {request.url} - {error}", exc_info=True)
+        logger.error("Unhandled Exception: %s - %s", request.url, error, exc_info=True)
         if app.config.get('DEBUG', False):
             return error_response(f'服务器错误: {str(error)}', 500)
         else:
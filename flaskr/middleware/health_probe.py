@@ -0,0 +1,58 @@
+"""
+健康探针中间件
+在WSGI层直接响应存活与就绪检查，不经过Flask中间件链与限流
+"""
+import json
+
+from flaskr.utils.readiness import ReadinessProbe
+
+LIVE_PATH = '/api/health/live'
+READY_PATH = '/api/health/ready'
+
+_LIVE_BODY = json.dumps({'success': True, 'message': 'success', 'data': {'status': 'alive'}}).encode('utf-8')
+
+
+class HealthProbeMiddleware:
+    """WSGI中间件：拦截探针路径，其余请求交给Flask应用"""
+
+    def __init__(self, wsgi_app, probe):
+        """
+        Args:
+            wsgi_app: 下游WSGI应用
+            probe: ReadinessProbe
+        """
+        self.wsgi_app = wsgi_app
+        self.probe = probe
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO')
+        if path == LIVE_PATH:
+            return self._respond(start_response, '200 OK', _LIVE_BODY)
+        if path == READY_PATH:
+            ready, body = self.probe.snapshot()
+            return self._respond(start_response, '200 OK' if ready else '503 SERVICE UNAVAILABLE', body)
+        return self.wsgi_app(environ, start_response)
+
+    @staticmethod
+    def _respond(start_response, status, body):
+        start_response(status, [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+            ('Cache-Control', 'no-store'),
+        ])
+        return [body]
+
+
+def register_health_probes(app):
+    """
+    注册存活（/api/health/live）与就绪（/api/health/ready）探针
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('HEALTH_PROBES_ENABLED', True):
+        return
+
+    probe = ReadinessProbe(app, interval=app.config.get('READINESS_INTERVAL', 5))
+    app.extensions['readiness_probe'] = probe
+    app.wsgi_app = HealthProbeMiddleware(app.wsgi_app, probe)
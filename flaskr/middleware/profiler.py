@@ -0,0 +1,107 @@
+"""
+按需请求性能分析中间件
+仅在配置开启时注册，对单个请求运行 cProfile 并输出 pstats 文件
+"""
+import cProfile
+import hashlib
+import hmac
+import logging
+import os
+import random
+import time
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Token'
+
+
+def sign_profile_token(secret, ttl=300):
+    """
+    生成分析请求签名
+
+    Args:
+        secret: PROFILER_SECRET
+        ttl: 有效期（秒）
+
+    Returns:
+        放入 X-Profile-Token 请求头的字符串，格式 "<过期时间戳>:<签名>"
+    """
+    expires = str(int(time.time()) + ttl)
+    signature = hmac.new(secret.encode('utf-8'), expires.encode('utf-8'), hashlib.sha256).hexdigest()
+    return f'{expires}:{signature}'
+
+
+def verify_profile_token(secret, token):
+    """
+    校验分析请求签名
+
+    Args:
+        secret: PROFILER_SECRET
+        token: X-Profile-Token 请求头的值
+
+    Returns:
+        是否有效
+    """
+    expires, _, signature = token.partition(':')
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode('utf-8'), expires.encode('utf-8'), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def register_profiler(app):
+    """
+    注册请求分析钩子
+
+    PROFILER_ENABLED 关闭时不注册任何钩子，请求路径上没有额外开销。
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('PROFILER_ENABLED', False):
+        return
+
+    secret = app.config.get('PROFILER_SECRET')
+    sample_rate = float(app.config.get('PROFILER_SAMPLE_RATE', 0.0))
+    output_dir = app.config.get('PROFILER_OUTPUT_DIR', 'profiles')
+    os.makedirs(output_dir, exist_ok=True)
+
+    def should_profile():
+        token = request.headers.get(PROFILE_HEADER)
+        if token and secret:
+            return verify_profile_token(secret, token)
+        return sample_rate > 0 and random.random() < sample_rate
+
+    @app.before_request
+    def start_profiler():
+        if not should_profile():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 同一线程已有其他分析器在运行
+            return
+        g._profiler = profiler
+        g._profiler_started = time.perf_counter()
+
+    @app.teardown_request
+    def stop_profiler(exc):
+        profiler = g.pop('_profiler', None)
+        if profiler is None:
+            return
+        profiler.disable()
+
+        elapsed_ms = (time.perf_counter() - g.pop('_profiler_started')) * 1000
+        endpoint = (request.endpoint or 'unmatched').replace('.', '_')
+        filename = f'{endpoint}-{int(time.time() * 1000)}-{os.getpid()}.prof'
+        path = os.path.join(output_dir, filename)
+        try:
+            profiler.dump_stats(path)
+            logger.info("请求分析已保存: %s %s %.1fms -> %s", request.method, request.path, elapsed_ms, path)
+        except OSError as e:
+            logger.warning("请求分析保存失败: %s", e)
+
+    logger.info("请求分析已启用: 采样率=%s, 输出目录=%s", sample_rate, output_dir)
@@ -0,0 +1,17 @@
+"""
+反向代理中间件
+在可信代理之后部署时，按 X-Forwarded-For / X-Forwarded-Proto 还原客户端IP与协议
+"""
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+
+def register_proxy_fix(app):
+    """
+    按 TRUSTED_PROXY_COUNT（客户端与应用之间的可信代理层数）包装 wsgi_app，0 表示不信任转发头
+
+    Args:
+        app: Flask应用实例
+    """
+    count = app.config.get('TRUSTED_PROXY_COUNT', 0)
+    if count > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=count, x_proto=count)
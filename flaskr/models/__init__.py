@@ -3,5 +3,6 @@
 """
 from flaskr.models.auth import LoginAttempt, UserLockout, RefreshToken
 from flaskr.models.user import User
+from flaskr.models.search import create_search_index
 
-__all__ = ['User', 'LoginAttempt', 'UserLockout', 'RefreshToken']
+__all__ = ['User', 'LoginAttempt', 'UserLockout', 'RefreshToken', 'create_search_index']
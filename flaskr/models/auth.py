@@ -1,9 +1,12 @@
 """
 认证相关模型
 """
+import hashlib
 import secrets
 from datetime import datetime, timedelta
 
+from sqlalchemy import inspect, text
+
 from flaskr.extensions import db
 
 
@@ -67,7 +70,10 @@ class RefreshToken(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    token = db.Column(db.String(255), unique=True, nullable=False, index=True)
+    # token 的 SHA-256 摘要（32字节），按摘要查找，不保存原文
+    token_digest = db.Column(db.LargeBinary(32), unique=True, nullable=True, index=True)
+    # 旧版本保存的token原文，flask tokens migrate-digests 迁移后为空（不再建索引）
+    token = db.Column(db.String(255), nullable=True)
     expires_at = db.Column(db.DateTime, nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     revoked = db.Column(db.Boolean, default=False)
@@ -87,5 +93,77 @@ class RefreshToken(db.Model):
         """生成随机token"""
         return secrets.token_urlsafe(64)
 
+    @staticmethod
+    def digest(token):
+        """计算token的SHA-256摘要"""
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
     def __repr__(self):
         return f'<RefreshToken user_id={self.user_id} expires_at={self.expires_at}>'
+
+
+# 旧版本 token 原文列上的唯一索引（unique=True, index=True 生成）
+LEGACY_TOKEN_INDEX = 'ix_refresh_tokens_token'
+TOKEN_DIGEST_INDEX = 'ix_refresh_tokens_token_digest'
+
+
+def _rebuild_sqlite_table(connection, columns):
+    """SQLite 不支持修改列约束：按当前模型重建表并复制数据"""
+    table = RefreshToken.__tablename__
+    for index in inspect(connection).get_indexes(table):
+        connection.execute(text(f'DROP INDEX IF EXISTS {index["name"]}'))
+    connection.execute(text(f'ALTER TABLE {table} RENAME TO {table}_legacy'))
+    RefreshToken.__table__.create(connection)
+    copied = ', '.join(column for column in columns if column in RefreshToken.__table__.c)
+    connection.execute(text(f'INSERT INTO {table} ({copied}) SELECT {copied} FROM {table}_legacy'))
+    connection.execute(text(f'DROP TABLE {table}_legacy'))
+
+
+def upgrade_refresh_token_schema(connection):
+    """
+    为已有数据库增加 token_digest 列及其唯一索引，并允许旧版 token 原文列为空（已是新结构时跳过）
+
+    Args:
+        connection: SQLAlchemy连接（在事务中）
+
+    Returns:
+        是否修改了表结构
+    """
+    inspector = inspect(connection)
+    table = RefreshToken.__tablename__
+    columns = {column['name']: column for column in inspector.get_columns(table)}
+    has_digest = 'token_digest' in columns
+    token_nullable = columns['token']['nullable']
+
+    if connection.dialect.name == 'sqlite':
+        if has_digest and token_nullable:
+            return False
+        _rebuild_sqlite_table(connection, columns)
+        return True
+
+    changed = False
+    if not has_digest:
+        column_type = RefreshToken.__table__.c.token_digest.type.compile(dialect=connection.dialect)
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN token_digest {column_type}'))
+        changed = True
+    if not token_nullable:
+        connection.execute(text(f'ALTER TABLE {table} ALTER COLUMN token DROP NOT NULL'))
+        changed = True
+
+    # db.create_all 创建的表已有唯一约束或唯一索引
+    unique_columns = [index['column_names'] for index in inspector.get_indexes(table) if index['unique']]
+    unique_columns += [constraint['column_names'] for constraint in inspector.get_unique_constraints(table)]
+    if not has_digest or ['token_digest'] not in unique_columns:
+        connection.execute(text(f'CREATE UNIQUE INDEX IF NOT EXISTS {TOKEN_DIGEST_INDEX} ON {table} (token_digest)'))
+        changed = True
+    return changed
+
+
+def drop_legacy_token_index(connection):
+    """
+    删除旧版 token 原文列上的唯一索引（迁移完成后原文列为空，不再按原文查找）
+
+    Args:
+        connection: SQLAlchemy连接（在事务中）
+    """
+    connection.execute(text(f'DROP INDEX IF EXISTS {LEGACY_TOKEN_INDEX}'))
@@ -0,0 +1,69 @@
+"""
+用户搜索索引
+SQLite 使用 FTS5 trigram 虚拟表，由触发器在插入、更新、删除时同步；PostgreSQL 使用 pg_trgm GIN 索引
+"""
+import sqlite3
+
+from sqlalchemy import DDL, event, text
+
+from flaskr.models.user import User
+
+# FTS5 trigram 分词器需要 SQLite 3.34+
+SQLITE_TRIGRAM_SUPPORTED = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_search USING fts5("
+    "username, email, content='users', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_search(rowid, username, email) VALUES (new.id, new.username, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_search(users_search, rowid, username, email) "
+    "VALUES ('delete', old.id, old.username, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_search_au AFTER UPDATE OF username, email ON users BEGIN "
+    "INSERT INTO users_search(users_search, rowid, username, email) "
+    "VALUES ('delete', old.id, old.username, old.email); "
+    "INSERT INTO users_search(rowid, username, email) VALUES (new.id, new.username, new.email); END",
+)
+
+POSTGRES_SEARCH_DDL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS ix_users_username_trgm ON users USING gin (username gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (email gin_trgm_ops)',
+)
+
+
+def _sqlite_with_trigram(ddl, target, bind, **kw):
+    return bind.dialect.name == 'sqlite' and SQLITE_TRIGRAM_SUPPORTED
+
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(User.__table__, 'after_create', DDL(_statement).execute_if(callable_=_sqlite_with_trigram))
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(User.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+event.listen(
+    User.__table__, 'before_drop',
+    DDL('DROP TABLE IF EXISTS users_search').execute_if(callable_=_sqlite_with_trigram)
+)
+
+
+def create_search_index(connection):
+    """
+    为已有数据库创建搜索索引（已存在时跳过），SQLite 会按 users 表重建 FTS 内容
+
+    Args:
+        connection: SQLAlchemy连接（在事务中）
+
+    Returns:
+        是否创建了索引（数据库不支持时返回 False）
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite' and SQLITE_TRIGRAM_SUPPORTED:
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO users_search(users_search) VALUES ('rebuild')"))
+        return True
+    if dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+        return True
+    return False
@@ -7,6 +7,24 @@ import bcrypt
 
 from flaskr.extensions import db
 
+# bcrypt 计算轮数
+BCRYPT_ROUNDS = 12
+
+
+def hash_password(password, rounds=BCRYPT_ROUNDS):
+    """
+    计算密码哈希（模块级函数，可在进程池中调用）
+
+    Args:
+        password: 明文密码
+        rounds: bcrypt 计算轮数
+
+    Returns:
+        哈希字符串
+    """
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
 
 class User(db.Model):
     """用户模型"""
@@ -21,11 +39,13 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     last_login = db.Column(db.DateTime, nullable=True)
 
+    # to_dict / 列投影读取输出的字段（不含 password_hash）
+    PUBLIC_FIELDS = ('id', 'username', 'email', 'created_at', 'is_active', 'last_login')
+
     def set_password(self, password):
         """设置密码（使用bcrypt加密）"""
         # 生成随机salt并加密密码
-        salt = bcrypt.gensalt(rounds=12)
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         """验证密码"""
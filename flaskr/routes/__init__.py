@@ -8,7 +8,7 @@ from flask import Blueprint
 bp = Blueprint('main', __name__)
 
 # 导入所有路由
-from flaskr.routes import auth, users, health, common
+from flaskr.routes import auth, auth_async, users, health, common, metrics
 
-__all__ = ['bp', 'auth', 'users', 'health', 'common']
+__all__ = ['bp', 'auth', 'auth_async', 'users', 'health', 'common', 'metrics']
 
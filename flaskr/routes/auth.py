@@ -5,11 +5,13 @@ from flask_jwt_extended import jwt_required
 
 from flaskr.extensions import limiter, RATE_LIMITS
 from flaskr.routes import bp
+from flaskr.utils.deadline import deadline
 from flaskr.utils.input_validation import validate_json
 from flaskr.views.auth import register, login, refresh, logout, me
 
 
 @bp.route('/api/auth/register', methods=['POST'])
+@deadline(5000)
 @limiter.limit(RATE_LIMITS['auth']['register'])
 @validate_json(['username', 'email', 'password'])
 def register_route():
@@ -18,6 +20,7 @@ def register_route():
 
 
 @bp.route('/api/auth/login', methods=['POST'])
+@deadline(5000)
 @limiter.limit(RATE_LIMITS['auth']['login'])
 @validate_json(['username', 'password'])
 def login_route():
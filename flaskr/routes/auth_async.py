@@ -0,0 +1,41 @@
+"""
+异步认证路由
+与 /api/auth/* 对应，需要安装 Flask 的 async 依赖（asgiref）
+"""
+from flask_jwt_extended import jwt_required
+
+from flaskr.extensions import limiter, RATE_LIMITS
+from flaskr.routes import bp
+from flaskr.utils.input_validation import validate_json
+from flaskr.views.auth_async import register, login, refresh, me
+
+
+@bp.route('/api/async/auth/register', methods=['POST'])
+@limiter.limit(RATE_LIMITS['auth']['register'])
+@validate_json(['username', 'email', 'password'])
+async def register_async_route():
+    """用户注册路由（异步）"""
+    return await register()
+
+
+@bp.route('/api/async/auth/login', methods=['POST'])
+@limiter.limit(RATE_LIMITS['auth']['login'])
+@validate_json(['username', 'password'])
+async def login_async_route():
+    """用户登录路由（异步）"""
+    return await login()
+
+
+@bp.route('/api/async/auth/refresh', methods=['POST'])
+@limiter.limit(RATE_LIMITS['auth']['refresh'])
+async def refresh_async_route():
+    """刷新Token路由（异步）"""
+    return await refresh()
+
+
+@bp.route('/api/async/auth/me', methods=['GET'])
+@jwt_required()
+@limiter.limit(RATE_LIMITS['api']['read'])
+async def me_async_route():
+    """获取当前用户信息路由（异步）"""
+    return await me()
@@ -0,0 +1,11 @@
+"""
+指标路由
+"""
+from flaskr.routes import bp
+from flaskr.views.metrics import get_metrics
+
+
+@bp.route('/api/metrics', methods=['GET'])
+def get_metrics_route():
+    """进程内指标路由"""
+    return get_metrics()
@@ -6,11 +6,13 @@ from flask_jwt_extended import jwt_required
 from flaskr.extensions import limiter, RATE_LIMITS
 from flaskr.routes import bp
 from flaskr.core.auth import active_user_required
+from flaskr.utils.deadline import deadline
 from flaskr.utils.permission_check import check_resource_ownership
-from flaskr.views.users import get_users, get_user, update_user, delete_user
+from flaskr.views.users import get_users, get_user, search_users, update_user, delete_user
 
 
 @bp.route('/api/users', methods=['GET'])
+@deadline(3000)
 @jwt_required()
 @limiter.limit(RATE_LIMITS['api']['read'])
 def get_users_route():
@@ -18,6 +20,15 @@ def get_users_route():
     return get_users()
 
 
+@bp.route('/api/users/search', methods=['GET'])
+@deadline(3000)
+@jwt_required()
+@limiter.limit(RATE_LIMITS['api']['read'])
+def search_users_route():
+    """搜索用户路由（需要认证）"""
+    return search_users()
+
+
 @bp.route('/api/users/<int:user_id>', methods=['GET'])
 @jwt_required()
 @limiter.limit(RATE_LIMITS['api']['read'])
@@ -0,0 +1,129 @@
+"""
+后台任务模块
+请求中通过 enqueue / @task 把耗时的副作用交给后台任务，由 flask tasks worker 执行
+"""
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import current_app
+
+from flaskr.tasks.store import TaskStore, SQLiteTaskStore, PostgresTaskStore, create_task_store, encode_payload
+from flaskr.tasks.worker import TaskWorker
+
+__all__ = [
+    'TaskStore',
+    'SQLiteTaskStore',
+    'PostgresTaskStore',
+    'TaskWorker',
+    'task',
+    'enqueue',
+    'enqueue_many',
+    'get_task_store',
+    'registered_tasks'
+]
+
+# 已注册的任务 {名称: 函数}
+_registry = {}
+# 任务默认重试次数 {名称: max_retries}
+_max_retries = {}
+_store_lock = threading.Lock()
+
+
+def task(name=None, max_retries=3):
+    """
+    注册后台任务
+
+    被装饰的函数仍可直接调用；通过 func.delay(*args, **kwargs) 入队异步执行。
+
+    Args:
+        name: 任务名称，默认为 模块名.函数名
+        max_retries: 失败后的最大重试次数
+
+    Returns:
+        装饰器函数
+    """
+
+    def decorator(f):
+        task_name = name or f'{f.__module__}.{f.__name__}'
+        _registry[task_name] = f
+        _max_retries[task_name] = max_retries
+
+        @wraps(f)
+        def delay(*args, **kwargs):
+            return enqueue(task_name, *args, **kwargs)
+
+        f.task_name = task_name
+        f.delay = delay
+        return f
+
+    return decorator
+
+
+def registered_tasks():
+    """已注册的任务"""
+    import flaskr.tasks.audit  # noqa: F401  导入任务定义，完成注册
+    return dict(_registry)
+
+
+def get_task_store(app=None):
+    """
+    获取当前进程的任务存储（首次使用时创建，fork 后重新创建）
+
+    Args:
+        app: Flask应用实例，默认 current_app
+
+    Returns:
+        TaskStore
+    """
+    app = app or current_app._get_current_object()
+    cached = app.extensions.get('task_store')
+    if cached is not None and cached[0] == os.getpid():
+        return cached[1]
+
+    with _store_lock:
+        cached = app.extensions.get('task_store')
+        if cached is None or cached[0] != os.getpid():
+            url = app.config.get('TASK_QUEUE_URL') or 'sqlite:///' + os.path.join(app.instance_path, 'tasks.db')
+            cached = (os.getpid(), create_task_store(url))
+            app.extensions['task_store'] = cached
+    return cached[1]
+
+
+def enqueue(name, *args, countdown=0, **kwargs):
+    """
+    入队后台任务（参数必须可JSON序列化）
+
+    Args:
+        name: 任务名称
+        countdown: 延迟执行的秒数
+
+    Returns:
+        任务ID
+    """
+    return get_task_store().push(
+        name,
+        encode_payload(args, kwargs),
+        max_retries=_max_retries.get(name, 3),
+        run_at=time.time() + countdown
+    )
+
+
+def enqueue_many(name, calls, countdown=0):
+    """
+    批量入队同一任务（一次事务）
+
+    Args:
+        name: 任务名称
+        calls: [(args, kwargs)]
+        countdown: 延迟执行的秒数
+
+    Returns:
+        任务ID列表
+    """
+    run_at = time.time() + countdown
+    max_retries = _max_retries.get(name, 3)
+    return get_task_store().push_many([
+        (name, encode_payload(args, kwargs), max_retries, run_at) for args, kwargs in calls
+    ])
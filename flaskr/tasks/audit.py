@@ -0,0 +1,41 @@
+"""
+审计相关后台任务
+"""
+from datetime import datetime
+
+from flaskr.tasks import task
+
+
+@task(name='audit.record_login_attempt', max_retries=5)
+def record_login_attempt(username, ip_address, user_agent, success, attempted_at=None):
+    """
+    写入登录尝试记录
+
+    Args:
+        attempted_at: 登录尝试发生的时间（ISO格式），为空时使用任务执行时间（兼容旧任务）
+    """
+    from flaskr.extensions import db
+    from flaskr.models.auth import LoginAttempt
+
+    db.session.add(LoginAttempt(
+        username=username,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        success=success,
+        attempted_at=datetime.fromisoformat(attempted_at) if attempted_at else datetime.utcnow()
+    ))
+    db.session.commit()
+
+
+def enqueue_login_attempt(username, ip_address, user_agent, success, attempted_at):
+    """
+    把登录尝试交给后台任务写入（同步与异步登录共用）
+
+    Args:
+        username: 用户名
+        ip_address: 客户端IP
+        user_agent: User-Agent
+        success: 是否登录成功
+        attempted_at: 登录尝试发生的时间，任务排队与重试不会改变记录的时间
+    """
+    record_login_attempt.delay(username, ip_address, user_agent, success, attempted_at.isoformat())
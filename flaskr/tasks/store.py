@@ -0,0 +1,299 @@
+"""
+后台任务存储
+任务持久化到数据库，工作进程异常退出后任务在可见性超时后重新被领取
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_FAILED = 'failed'
+
+
+class TaskRecord:
+    """已领取的任务"""
+
+    __slots__ = ('id', 'name', 'args', 'kwargs', 'attempts', 'max_retries')
+
+    def __init__(self, id, name, payload, attempts, max_retries):
+        self.id = id
+        self.name = name
+        data = json.loads(payload)
+        self.args = data.get('args', [])
+        self.kwargs = data.get('kwargs', {})
+        self.attempts = attempts
+        self.max_retries = max_retries
+
+
+def encode_payload(args, kwargs):
+    """任务参数编码为JSON（参数必须可JSON序列化）"""
+    return json.dumps({'args': list(args), 'kwargs': kwargs}, ensure_ascii=False)
+
+
+class TaskStore:
+    """
+    任务存储接口
+
+    - push_many: 批量入队
+    - claim: 领取到期任务，设置可见性超时（超时未完成的任务会被重新领取）
+    - complete: 批量删除已完成任务
+    - retry / fail: 失败后重新排队或标记为最终失败
+    """
+
+    def push_many(self, items):
+        """
+        批量入队
+
+        Args:
+            items: [(name, payload, max_retries, run_at)]
+
+        Returns:
+            任务ID列表
+        """
+        raise NotImplementedError
+
+    def push(self, name, payload, max_retries=3, run_at=None):
+        """入队单个任务，返回任务ID"""
+        return self.push_many([(name, payload, max_retries, run_at or time.time())])[0]
+
+    def claim(self, limit, visibility_timeout):
+        """领取最多 limit 个到期任务，返回 TaskRecord 列表"""
+        raise NotImplementedError
+
+    def complete(self, ids):
+        """删除已完成的任务"""
+        raise NotImplementedError
+
+    def retry(self, task_id, error, run_at):
+        """任务失败，在 run_at 时重新排队"""
+        raise NotImplementedError
+
+    def fail(self, task_id, error):
+        """任务最终失败（超过重试次数）"""
+        raise NotImplementedError
+
+    def stats(self):
+        """按状态统计任务数"""
+        raise NotImplementedError
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_retries INTEGER NOT NULL DEFAULT 3,
+    run_at REAL NOT NULL,
+    locked_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_tasks_status_run_at ON tasks (status, run_at);
+"""
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    SQLite 任务存储（单机）
+
+    使用WAL模式，每个线程一个连接；领取任务时使用 BEGIN IMMEDIATE，多个工作进程不会领取到同一个任务。
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: 数据库文件路径
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(_SQLITE_SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def push_many(self, items):
+        conn = self._connection()
+        now = time.time()
+        ids = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for name, payload, max_retries, run_at in items:
+                cursor = conn.execute(
+                    'INSERT INTO tasks (name, payload, max_retries, run_at, created_at) VALUES (?, ?, ?, ?, ?)',
+                    (name, payload, max_retries, run_at, now)
+                )
+                ids.append(cursor.lastrowid)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return ids
+
+    def claim(self, limit, visibility_timeout):
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                'SELECT id, name, payload, attempts, max_retries FROM tasks '
+                'WHERE (status = ? AND run_at <= ?) OR (status = ? AND locked_until < ?) '
+                'ORDER BY run_at LIMIT ?',
+                (STATUS_QUEUED, now, STATUS_RUNNING, now, limit)
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    'UPDATE tasks SET status = ?, attempts = attempts + 1, locked_until = ? WHERE id = ?',
+                    [(STATUS_RUNNING, now + visibility_timeout, row[0]) for row in rows]
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [TaskRecord(id, name, payload, attempts + 1, max_retries)
+                for id, name, payload, attempts, max_retries in rows]
+
+    def complete(self, ids):
+        if not ids:
+            return
+        conn = self._connection()
+        # 连接处于自动提交模式，显式开启事务，一批删除只提交一次
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany('DELETE FROM tasks WHERE id = ?', [(task_id,) for task_id in ids])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def retry(self, task_id, error, run_at):
+        self._connection().execute(
+            'UPDATE tasks SET status = ?, run_at = ?, locked_until = NULL, last_error = ? WHERE id = ?',
+            (STATUS_QUEUED, run_at, error, task_id)
+        )
+
+    def fail(self, task_id, error):
+        self._connection().execute(
+            'UPDATE tasks SET status = ?, locked_until = NULL, last_error = ? WHERE id = ?',
+            (STATUS_FAILED, error, task_id)
+        )
+
+    def stats(self):
+        rows = self._connection().execute('SELECT status, count(*) FROM tasks GROUP BY status').fetchall()
+        return dict(rows)
+
+
+class PostgresTaskStore(TaskStore):
+    """
+    PostgreSQL 任务存储（多机共享）
+
+    领取任务使用 FOR UPDATE SKIP LOCKED，多个工作进程并发领取时互不阻塞。
+    表结构需要预先创建（见 create_schema）。
+    """
+
+    def __init__(self, url):
+        """
+        Args:
+            url: 数据库URL
+        """
+        self.engine = create_engine(url, pool_pre_ping=True)
+
+    def create_schema(self):
+        """创建任务表"""
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id BIGSERIAL PRIMARY KEY, name TEXT NOT NULL, payload TEXT NOT NULL, "
+                "status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0, "
+                "max_retries INTEGER NOT NULL DEFAULT 3, run_at DOUBLE PRECISION NOT NULL, "
+                "locked_until DOUBLE PRECISION, last_error TEXT, created_at DOUBLE PRECISION NOT NULL)"
+            ))
+            conn.execute(text('CREATE INDEX IF NOT EXISTS ix_tasks_status_run_at ON tasks (status, run_at)'))
+
+    def push_many(self, items):
+        now = time.time()
+        with self.engine.begin() as conn:
+            return [
+                conn.execute(text(
+                    'INSERT INTO tasks (name, payload, max_retries, run_at, created_at) '
+                    'VALUES (:name, :payload, :max_retries, :run_at, :now) RETURNING id'
+                ), {
+                    'name': name, 'payload': payload, 'max_retries': max_retries, 'run_at': run_at, 'now': now
+                }).scalar()
+                for name, payload, max_retries, run_at in items
+            ]
+
+    def claim(self, limit, visibility_timeout):
+        now = time.time()
+        with self.engine.begin() as conn:
+            rows = conn.execute(text(
+                'UPDATE tasks SET status = :running, attempts = attempts + 1, locked_until = :locked_until '
+                'WHERE id IN ('
+                '  SELECT id FROM tasks '
+                '  WHERE (status = :queued AND run_at <= :now) OR (status = :running AND locked_until < :now) '
+                '  ORDER BY run_at LIMIT :limit FOR UPDATE SKIP LOCKED'
+                ') RETURNING id, name, payload, attempts, max_retries'
+            ), {
+                'running': STATUS_RUNNING, 'queued': STATUS_QUEUED, 'now': now,
+                'locked_until': now + visibility_timeout, 'limit': limit
+            }).fetchall()
+        return [TaskRecord(*row) for row in rows]
+
+    def complete(self, ids):
+        if not ids:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text('DELETE FROM tasks WHERE id = ANY(:ids)'), {'ids': list(ids)})
+
+    def retry(self, task_id, error, run_at):
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                'UPDATE tasks SET status = :queued, run_at = :run_at, locked_until = NULL, last_error = :error '
+                'WHERE id = :id'
+            ), {'queued': STATUS_QUEUED, 'run_at': run_at, 'error': error, 'id': task_id})
+
+    def fail(self, task_id, error):
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                'UPDATE tasks SET status = :failed, locked_until = NULL, last_error = :error WHERE id = :id'
+            ), {'failed': STATUS_FAILED, 'error': error, 'id': task_id})
+
+    def stats(self):
+        with self.engine.connect() as conn:
+            return dict(conn.execute(text('SELECT status, count(*) FROM tasks GROUP BY status')).fetchall())
+
+
+def create_task_store(url):
+    """
+    根据URL创建任务存储
+
+    Args:
+        url: sqlite:///path/to/tasks.db 或 postgresql://...
+
+    Returns:
+        TaskStore
+    """
+    if url.startswith('sqlite:///'):
+        return SQLiteTaskStore(url[len('sqlite:///'):])
+    if url.startswith('postgresql'):
+        store = PostgresTaskStore(url)
+        store.create_schema()
+        return store
+    raise ValueError(f'不支持的任务队列URL: {url}')
@@ -0,0 +1,147 @@
+"""
+后台任务工作进程
+批量领取任务，在线程池中执行，失败按指数退避重试
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flaskr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempts, base=2.0, max_delay=3600):
+    """
+    第 attempts 次失败后的重试延迟（秒），带 ±20% 随机抖动
+
+    Args:
+        attempts: 已执行次数
+        base: 指数底数
+        max_delay: 最大延迟
+    """
+    delay = min(max_delay, base ** attempts)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class TaskWorker:
+    """
+    任务工作者
+
+    - 每轮按空闲线程数批量领取任务（一次事务），完成的任务批量删除
+    - 领取后设置可见性超时，进程异常退出后任务会被其他工作者重新领取
+    """
+
+    def __init__(self, app, store, registry, concurrency=4, batch_size=20, poll_interval=1.0,
+                 visibility_timeout=300, backoff_base=2.0):
+        """
+        Args:
+            app: Flask应用实例
+            store: TaskStore
+            registry: {任务名称: 任务函数}
+            concurrency: 并发执行的任务数
+            batch_size: 每次最多领取的任务数
+            poll_interval: 队列为空时的轮询间隔（秒）
+            visibility_timeout: 可见性超时（秒），应大于任务的最长执行时间
+            backoff_base: 重试退避的指数底数
+        """
+        self.app = app
+        self.store = store
+        self.registry = registry
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.visibility_timeout = visibility_timeout
+        self.backoff_base = backoff_base
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='task')
+        self._slots = threading.Semaphore(concurrency)
+        self._completed = []
+        self._completed_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self, max_batches=None):
+        """
+        运行直到 stop() 被调用
+
+        Args:
+            max_batches: 最多领取的批次数（主要用于测试）
+        """
+        batches = 0
+        while not self._stop.is_set():
+            self._flush_completed()
+            free = self._free_slots()
+            if not free:
+                time.sleep(0.01)
+                continue
+
+            records = self.store.claim(min(free, self.batch_size), self.visibility_timeout)
+            self._release_slots(free - len(records))
+            for record in records:
+                self._executor.submit(self._execute, record)
+
+            batches += 1
+            if max_batches is not None and batches >= max_batches:
+                break
+            if not records:
+                self._stop.wait(self.poll_interval)
+
+        self._executor.shutdown(wait=True)
+        self._flush_completed()
+
+    def stop(self):
+        """处理完正在执行的任务后停止"""
+        self._stop.set()
+
+    def _free_slots(self):
+        free = 0
+        while free < self.concurrency and self._slots.acquire(blocking=False):
+            free += 1
+        return free
+
+    def _release_slots(self, count):
+        for _ in range(count):
+            self._slots.release()
+
+    def _flush_completed(self):
+        with self._completed_lock:
+            ids, self._completed = self._completed, []
+        if ids:
+            self.store.complete(ids)
+
+    def _execute(self, record):
+        from flaskr.extensions import db
+
+        started = time.perf_counter()
+        try:
+            func = self.registry.get(record.name)
+            if func is None:
+                raise LookupError(f'未注册的任务: {record.name}')
+            with self.app.app_context():
+                try:
+                    func(*record.args, **record.kwargs)
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            self._handle_failure(record, e)
+        else:
+            with self._completed_lock:
+                self._completed.append(record.id)
+            metrics.incr('tasks_processed', task=record.name, status='ok')
+        finally:
+            metrics.observe('task_duration_ms', (time.perf_counter() - started) * 1000, task=record.name)
+            self._slots.release()
+
+    def _handle_failure(self, record, error):
+        message = f'{type(error).__name__}: {error}'
+        if record.attempts > record.max_retries:
+            self.store.fail(record.id, message)
+            metrics.incr('tasks_processed', task=record.name, status='failed')
+            logger.error("任务 %s(%s) 最终失败（已执行%s次）: %s", record.name, record.id, record.attempts, message)
+            return
+
+        delay = backoff_delay(record.attempts, self.backoff_base)
+        self.store.retry(record.id, message, time.time() + delay)
+        metrics.incr('tasks_processed', task=record.name, status='retry')
+        logger.warning("任务 %s(%s) 执行失败，%.1f秒后重试: %s", record.name, record.id, delay, message)
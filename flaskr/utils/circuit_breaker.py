@@ -0,0 +1,161 @@
+"""
+数据库熔断器
+连续出现连接失败时熔断（可选按耗时判断），熔断期间依赖数据库的请求快速失败
+"""
+import logging
+import threading
+import time
+
+from flask import has_request_context
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+
+from flaskr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# 语句超时被取消（PostgreSQL query_canceled）：请求自身预算用尽，不代表数据库不可用
+_QUERY_CANCELED = '57014'
+
+
+class CircuitBreaker:
+    """
+    熔断器（每个工作进程一份）
+
+    - closed: 正常放行；连续失败 failure_threshold 次后熔断
+    - open: 全部拒绝；reset_timeout 秒后进入 half_open
+    - half_open: 只放行一个探测请求，成功则恢复，失败则重新熔断
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=10, latency_threshold_ms=0):
+        """
+        Args:
+            name: 名称（用于日志与指标）
+            failure_threshold: 熔断前允许的连续失败次数
+            reset_timeout: 熔断后进入半开状态前的等待时间（秒）
+            latency_threshold_ms: 超过该耗时的调用视为失败，0表示不按耗时判断
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_threshold_ms = latency_threshold_ms
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probe_started_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        是否放行本次调用
+
+        Returns:
+            bool
+        """
+        if self.state == STATE_CLOSED:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            if self.state == STATE_OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+                self._transition(STATE_HALF_OPEN)
+
+            # 半开状态只放行一个探测请求；探测请求没有结果（例如未访问数据库）时超时后再放行下一个
+            if self._probe_started_at is not None and now - self._probe_started_at < self.reset_timeout:
+                return False
+            self._probe_started_at = now
+            return True
+
+    def record_success(self, latency_ms=0):
+        """
+        记录一次成功调用
+
+        Args:
+            latency_ms: 调用耗时（毫秒）
+        """
+        if self.latency_threshold_ms and latency_ms > self.latency_threshold_ms:
+            self.record_failure('latency')
+            return
+        if self.state == STATE_CLOSED and not self.failures:
+            return
+        with self._lock:
+            self.failures = 0
+            if self.state != STATE_CLOSED:
+                self._transition(STATE_CLOSED)
+
+    def record_failure(self, reason='error'):
+        """
+        记录一次失败调用
+
+        Args:
+            reason: 失败原因（error / latency）
+        """
+        metrics.incr('circuit_breaker_failures', breaker=self.name, reason=reason)
+        with self._lock:
+            self.failures += 1
+            if self.state == STATE_HALF_OPEN or (
+                    self.state == STATE_CLOSED and self.failures >= self.failure_threshold):
+                self._transition(STATE_OPEN)
+
+    def _transition(self, state):
+        previous, self.state = self.state, state
+        self._probe_started_at = None
+        if state == STATE_OPEN:
+            self.opened_at = time.monotonic()
+        metrics.incr('circuit_breaker_transitions', breaker=self.name, state=state)
+        log = logger.warning if state == STATE_OPEN else logger.info
+        log("熔断器 %s: %s -> %s（连续失败 %s 次）", self.name, previous, state, self.failures)
+
+    def status(self):
+        """熔断器状态（用于健康检查与指标）"""
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'retry_in': (
+                max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+                if self.state == STATE_OPEN else None
+            )
+        }
+
+
+def _is_connection_error(context):
+    """连接失败、断开等数据库不可用的错误（语句超时、唯一约束冲突等不算）"""
+    if context.is_disconnect:
+        return True
+    if not isinstance(context.sqlalchemy_exception, sa_exc.OperationalError):
+        return False
+    return getattr(context.original_exception, 'pgcode', None) != _QUERY_CANCELED
+
+
+def install_circuit_breaker(engine, breaker):
+    """
+    根据数据库调用结果更新熔断器
+
+    - 连接失败、断开等 OperationalError 计为失败（语句超时、唯一约束冲突等不计）
+    - 语句执行成功时按耗时判断（latency_threshold_ms 为0时不判断）
+    - 只记录请求中的调用：定时任务、就绪检查等后台线程的结果不影响熔断
+
+    Args:
+        engine: SQLAlchemy引擎
+        breaker: CircuitBreaker
+    """
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._breaker_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def record_success(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            breaker.record_success((time.perf_counter() - context._breaker_started) * 1000)
+
+    @event.listens_for(engine, 'handle_error')
+    def record_failure(context):
+        if has_request_context() and _is_connection_error(context):
+            breaker.record_failure()
@@ -162,10 +162,16 @@ def mask_user_data(user_dict):
     Returns:
         脱敏后的用户数据
     """
+    # 用户名是公开标识（可按用户名搜索），不脱敏
     fields_to_mask = {
         'email': 'email',
-        'phone': 'phone',
-        'username': 'username'
+        'phone': 'phone'
     }
 
     return mask_data(user_dict, fields_to_mask)
+
+
+# 用户字段的脱敏函数（与 mask_user_data 一致，供列投影序列化器使用）
+USER_FIELD_MASKERS = {
+    'email': mask_email
+}
@@ -0,0 +1,174 @@
+"""
+数据库连接池工具
+根据工作进程数、线程数与单机连接预算计算连接池大小，并采集连接池指标
+"""
+import logging
+import os
+import time
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import NullPool, QueuePool
+
+from flaskr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# SQLAlchemy QueuePool 的默认 max_overflow
+_DEFAULT_MAX_OVERFLOW = 10
+
+
+class _InstrumentedPoolMixin:
+    """记录连接获取等待时间、溢出连接使用与连接池耗尽次数"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except sa_exc.TimeoutError:
+            metrics.incr('db_pool_exhausted')
+            raise
+        finally:
+            metrics.observe('db_pool_checkout_wait_ms', (time.perf_counter() - started) * 1000)
+
+        metrics.incr('db_pool_checkouts')
+        if isinstance(self, QueuePool) and self.overflow() > 0:
+            metrics.incr('db_pool_overflow_checkouts')
+        return conn
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """带指标的 QueuePool"""
+
+
+class InstrumentedNullPool(_InstrumentedPoolMixin, NullPool):
+    """带指标的 NullPool（外部连接池模式，每次获取都会新建连接）"""
+
+
+def compute_pool_size(workers, threads, budget, engines=1):
+    """
+    计算单个进程中每个引擎的连接池大小
+
+    单机所有进程、所有引擎的连接数（pool_size + max_overflow）之和不超过 budget。
+    每个线程同一时刻最多占用一个连接，因此常驻连接数不超过线程数，余量作为溢出连接。
+    每个引擎至少保留1个连接，workers × engines 超过 budget 时总数会超出预算（由调用方告警）。
+
+    Args:
+        workers: 工作进程数
+        threads: 每个进程的线程数
+        budget: 单机连接预算
+        engines: 每个进程的引擎数（同步引擎与异步视图的 AsyncEngine）
+
+    Returns:
+        (pool_size, max_overflow)
+    """
+    per_engine = max(1, budget // max(1, workers) // max(1, engines))
+    pool_size = max(1, min(threads, per_engine))
+    max_overflow = max(0, min(per_engine - pool_size, threads))
+    return pool_size, max_overflow
+
+
+def _worker_count():
+    """gunicorn 工作进程数（由 gunicorn.conf.py 写入环境变量；非gunicorn运行时为1）"""
+    return int(os.environ.get('GUNICORN_WORKERS', '1'))
+
+
+def _uses_async_engine(app):
+    """异步视图是否会创建独立的 AsyncEngine（ASYNC_DATABASE_URL 或 ASYNC_ENGINE_ENABLED）"""
+    from flaskr.core.async_db import async_database_url
+    return async_database_url(app.config) is not None
+
+
+def configured_max_overflow(app):
+    """
+    同步引擎的最大溢出连接数
+
+    QueuePool 没有公开读取 max_overflow 的接口，从 SQLALCHEMY_ENGINE_OPTIONS 读取（未设置时为SQLAlchemy默认值）。
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        int（不限制溢出时按0计）
+    """
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    return max(0, options.get('max_overflow', _DEFAULT_MAX_OVERFLOW))
+
+
+def apply_pool_settings(app):
+    """
+    根据配置补全 SQLALCHEMY_ENGINE_OPTIONS 与 ASYNC_ENGINE_OPTIONS（需要在 db.init_app 之前调用）
+
+    - DB_EXTERNAL_POOLER: 使用外部连接池（PgBouncer等），本进程不保留连接（NullPool）
+    - DB_POOL_AUTOSIZE: 按 DB_CONNECTION_BUDGET / 工作进程数 / 引擎数 / 线程数 计算连接池大小，
+      同步引擎与异步视图的 AsyncEngine 平分每个进程的预算
+
+    SQLite 不调整（内存库由 Flask-SQLAlchemy 使用 StaticPool）。
+
+    Args:
+        app: Flask应用实例
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    if uri.startswith('sqlite'):
+        return
+
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    async_options = dict(app.config.get('ASYNC_ENGINE_OPTIONS') or {})
+
+    if app.config.get('DB_EXTERNAL_POOLER', False):
+        for key in ('pool_size', 'max_overflow', 'pool_timeout'):
+            options.pop(key, None)
+            async_options.pop(key, None)
+        options['poolclass'] = InstrumentedNullPool
+        async_options['poolclass'] = NullPool
+        logger.info("数据库连接池: 外部连接池模式（NullPool）")
+    else:
+        if app.config.get('DB_POOL_AUTOSIZE', True):
+            workers = app.config.get('DB_POOL_WORKERS') or _worker_count()
+            threads = app.config.get('DB_POOL_THREADS') or int(os.environ.get('GUNICORN_THREADS', '1'))
+            budget = app.config.get('DB_CONNECTION_BUDGET', 100)
+            engines = 2 if _uses_async_engine(app) else 1
+            pool_size, max_overflow = compute_pool_size(workers, threads, budget, engines)
+            if workers * engines > budget:
+                logger.warning(
+                    "数据库连接预算不足: %s 个工作进程 × %s 个引擎至少需要 %s 个连接，超过 DB_CONNECTION_BUDGET=%s；"
+                    "请减少工作进程数、提高预算或使用外部连接池（DB_EXTERNAL_POOLER）",
+                    workers, engines, workers * engines, budget
+                )
+            for target in (options, async_options) if engines == 2 else (options,):
+                target['pool_size'] = pool_size
+                target['max_overflow'] = max_overflow
+            logger.info(
+                "数据库连接池: pool_size=%s, max_overflow=%s (workers=%s, threads=%s, engines=%s, budget=%s)",
+                pool_size, max_overflow, workers, threads, engines, budget
+            )
+        options.setdefault('pool_timeout', app.config.get('DB_POOL_TIMEOUT', 5))
+        async_options.setdefault('pool_timeout', app.config.get('DB_POOL_TIMEOUT', 5))
+        options['poolclass'] = InstrumentedQueuePool
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    app.config['ASYNC_ENGINE_OPTIONS'] = async_options
+
+
+def register_pool_collector(engine, max_overflow=_DEFAULT_MAX_OVERFLOW):
+    """
+    注册连接池状态指标
+
+    Args:
+        engine: SQLAlchemy引擎
+        max_overflow: 配置的最大溢出连接数（见 configured_max_overflow）
+    """
+    pool = engine.pool
+
+    def collect():
+        data = {'class': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'max_overflow': max_overflow,
+            })
+        return data
+
+    metrics.register_collector('db_pool', collect)
@@ -0,0 +1,165 @@
+"""
+请求截止时间工具
+按路由设置处理时间预算，在各阶段之间协作检查，并转换为数据库语句超时
+"""
+import contextvars
+import time
+
+from sqlalchemy import event
+
+# 当前请求的截止时间（time.monotonic() 时间戳），未设置时为None
+_deadline_var = contextvars.ContextVar('request_deadline', default=None)
+
+# 已设置的语句超时比剩余预算多出该值（毫秒）以上时重新设置，避免每条语句都多一次往返
+_TIMEOUT_SLACK_MS = 50
+
+
+class DeadlineExceeded(Exception):
+    """请求超过处理时间预算"""
+
+    def __init__(self, stage):
+        super().__init__(f'请求在 {stage} 阶段超过处理时间预算')
+        self.stage = stage
+
+
+def deadline(ms):
+    """
+    设置路由的处理时间预算（配置 ROUTE_DEADLINES_MS 中的值优先）
+
+    Args:
+        ms: 预算（毫秒）
+
+    Returns:
+        装饰器函数
+    """
+
+    def decorator(f):
+        # 只记录预算，不额外包装视图函数
+        f.deadline_ms = ms
+        return f
+
+    return decorator
+
+
+def start_deadline(budget_ms):
+    """
+    开始计时
+
+    Args:
+        budget_ms: 预算（毫秒）
+
+    Returns:
+        用于 reset_deadline 的token
+    """
+    return _deadline_var.set(time.monotonic() + budget_ms / 1000)
+
+
+def reset_deadline(token):
+    """结束计时"""
+    _deadline_var.reset(token)
+
+
+def remaining_ms():
+    """
+    剩余预算
+
+    Returns:
+        剩余毫秒数，未设置截止时间时返回None
+    """
+    expires_at = _deadline_var.get()
+    if expires_at is None:
+        return None
+    return (expires_at - time.monotonic()) * 1000
+
+
+def check_deadline(stage):
+    """
+    检查是否已超过截止时间（在耗时阶段之间调用）
+
+    Args:
+        stage: 阶段名称（auth / validation / db / bcrypt 等）
+
+    Raises:
+        DeadlineExceeded: 已超过截止时间
+    """
+    expires_at = _deadline_var.get()
+    if expires_at is not None and time.monotonic() >= expires_at:
+        raise DeadlineExceeded(stage)
+
+
+def _sqlite_progress_handler():
+    # SQLite 每执行若干条虚拟机指令调用一次，返回非0时中断当前语句
+    expires_at = _deadline_var.get()
+    return 1 if expires_at is not None and time.monotonic() >= expires_at else 0
+
+
+def _statement_timeout_to_set(info, expires_at, remaining):
+    """
+    计算本条语句前需要设置的 statement_timeout
+
+    statement_timeout 约束的是单条语句，事务中后面的语句开始时剩余预算已经减少，
+    沿用事务开始时的值会让最后一条语句超过截止时间。
+
+    Args:
+        info: 连接的 info 字典（记录本事务已设置的值）
+        expires_at: 截止时间
+        remaining: 剩余预算（毫秒）
+
+    Returns:
+        需要设置的毫秒数，已设置的值仍然足够接近剩余预算时返回None
+    """
+    timeout_ms = max(1, int(remaining))
+    current = info.get('deadline_timeout')
+    if current is not None and current[0] == expires_at and current[1] - timeout_ms <= _TIMEOUT_SLACK_MS:
+        return None
+    info['deadline_timeout'] = (expires_at, timeout_ms)
+    return timeout_ms
+
+
+def install_deadline_hooks(engine, sqlite_progress_ops=10000):
+    """
+    将请求截止时间转换为数据库语句超时
+
+    - PostgreSQL: 语句前执行 SET LOCAL statement_timeout（剩余预算）；事务中剩余预算比已设置的值
+      少 _TIMEOUT_SLACK_MS 以上时重新设置
+    - SQLite: 通过 progress handler 在超过截止时间时中断正在执行的语句
+    - 执行语句前检查截止时间；数据库因超时取消语句时转换为 DeadlineExceeded
+
+    Args:
+        engine: SQLAlchemy引擎
+        sqlite_progress_ops: SQLite progress handler 的调用间隔（虚拟机指令数）
+    """
+    dialect = engine.dialect.name
+
+    if dialect == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def set_progress_handler(dbapi_connection, connection_record):
+            dbapi_connection.set_progress_handler(_sqlite_progress_handler, sqlite_progress_ops)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def apply_statement_timeout(conn, cursor, statement, parameters, context, executemany):
+        expires_at = _deadline_var.get()
+        if expires_at is None:
+            return
+        remaining = (expires_at - time.monotonic()) * 1000
+        if remaining <= 0:
+            raise DeadlineExceeded('db')
+        if dialect == 'postgresql':
+            timeout_ms = _statement_timeout_to_set(conn.info, expires_at, remaining)
+            if timeout_ms is not None:
+                cursor.execute('SET LOCAL statement_timeout = %d' % timeout_ms)
+
+    # SET LOCAL 只在当前事务内有效，事务结束后需要重新设置
+    @event.listens_for(engine, 'commit')
+    @event.listens_for(engine, 'rollback')
+    def clear_statement_timeout(conn):
+        conn.info.pop('deadline_timeout', None)
+
+    @event.listens_for(engine, 'handle_error')
+    def translate_timeout(context):
+        if _deadline_var.get() is None:
+            return
+        orig = context.original_exception
+        # PostgreSQL query_canceled（57014）；SQLite progress handler 中断
+        if getattr(orig, 'pgcode', None) == '57014' or str(orig) == 'interrupted':
+            raise DeadlineExceeded('db') from orig
@@ -5,9 +5,9 @@
 import re
 from functools import wraps
 
-import bleach
-from flask import request
+from flask import request, current_app
 
+from flaskr.utils.deadline import check_deadline
 from flaskr.utils.response import error_response
 
 
@@ -75,7 +75,8 @@ def sanitize_input(data):
         清理后的数据
     """
     if isinstance(data, str):
-        # 使用bleach清理HTML标签
+        # 使用bleach清理HTML标签（延迟导入，不影响应用启动）
+        import bleach
         return bleach.clean(data, tags=[], strip=True)
     elif isinstance(data, dict):
         return {k: sanitize_input(v) for k, v in data.items()}
@@ -241,7 +242,9 @@ def validate_json(required_fields):
                     400
                 )
 
-            return f(*args, **kwargs)
+            check_deadline('validation')
+            # 兼容异步视图
+            return current_app.ensure_sync(f)(*args, **kwargs)
 
         return decorated_function
 
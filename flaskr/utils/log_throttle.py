@@ -0,0 +1,188 @@
+"""
+日志限流工具
+在扫描或洪泛期间对相同事件进行聚合，避免日志写满磁盘
+"""
+import os
+import threading
+import time
+
+# 键数量超过上限后，新键统一归入该溢出键
+OVERFLOW_KEY = ('*', '*', '*')
+
+
+class _Entry:
+    """单个键在当前窗口内的聚合状态"""
+    __slots__ = ('started_at', 'count', 'level', 'total')
+
+    def __init__(self, started_at, level):
+        self.started_at = started_at
+        self.count = 1
+        self.level = level
+        self.total = 0
+
+
+class LogThrottle:
+    """
+    按键聚合的日志限流器
+
+    同一个键在窗口内第一次出现时立即输出原始日志，之后的事件只计数；
+    窗口结束后由后台线程输出一行汇总日志（包含被抑制的次数），不必等到下一次事件；
+    进程退出前调用 flush() 输出尚未结束的窗口。
+    日志消息使用 logging 的惰性格式化，级别被过滤时不会格式化参数。
+    """
+
+    def __init__(self, logger, window=60, max_keys=10000):
+        """
+        Args:
+            logger: 日志记录器
+            window: 聚合窗口（秒）
+            max_keys: 同时跟踪的最大键数量
+        """
+        self.logger = logger
+        self.window = window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._next_sweep = time.monotonic() + window
+        self._events = 0
+        self._suppressed = 0
+        self._pid = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def log(self, level, key, msg, *args):
+        """
+        记录事件
+
+        Args:
+            level: 日志级别
+            key: 聚合键，例如 (status, route, client_ip)
+            msg: 日志消息模板（%-格式）
+            *args: 日志参数（仅在需要输出时格式化）
+        """
+        self.ensure_started()
+        now = time.monotonic()
+        summaries = []
+        emit = False
+
+        with self._lock:
+            self._events += 1
+
+            if now >= self._next_sweep:
+                summaries.extend(self._sweep(now))
+
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.started_at >= self.window:
+                summaries.append(self._summary(key, entry))
+                entry.started_at = now
+                entry.count = 0
+
+            if entry is None:
+                if len(self._entries) >= self.max_keys:
+                    key = OVERFLOW_KEY
+                    entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _Entry(now, level)
+                    emit = True
+                else:
+                    entry.count += 1
+            else:
+                entry.count += 1
+                emit = entry.count == 1
+
+            entry.total += 1
+            if not emit:
+                self._suppressed += 1
+
+        for summary in summaries:
+            self._emit_summary(*summary)
+
+        if emit and self.logger.isEnabledFor(level):
+            self.logger.log(level, msg, *args)
+
+    def ensure_started(self):
+        """启动定时输出汇总的后台线程（fork 后的工作进程会重新启动线程）"""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='log-throttle', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while not self._stop.wait(self.window):
+            self.sweep()
+
+    def stop(self):
+        """停止后台线程"""
+        self._stop.set()
+
+    def sweep(self):
+        """输出已结束窗口的汇总日志"""
+        with self._lock:
+            summaries = self._sweep(time.monotonic())
+
+        for summary in summaries:
+            self._emit_summary(*summary)
+
+    def flush(self):
+        """立即输出所有窗口的汇总日志"""
+        with self._lock:
+            summaries = [self._summary(key, entry) for key, entry in self._entries.items()]
+            self._entries.clear()
+            self._next_sweep = time.monotonic() + self.window
+
+        for summary in summaries:
+            self._emit_summary(*summary)
+
+    def stats(self):
+        """
+        获取聚合计数，供指标接口读取
+
+        Returns:
+            统计字典
+        """
+        with self._lock:
+            keys = {
+                ','.join(str(part) for part in key): {
+                    'window_count': entry.count,
+                    'total': entry.total
+                }
+                for key, entry in self._entries.items()
+            }
+            return {
+                'window_seconds': self.window,
+                'events': self._events,
+                'suppressed': self._suppressed,
+                'tracked_keys': len(self._entries),
+                'keys': keys
+            }
+
+    def _sweep(self, now):
+        """清理已过期的键，返回需要输出的汇总（需持有锁）"""
+        summaries = []
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if now - entry.started_at >= self.window:
+                summaries.append(self._summary(key, entry))
+                del self._entries[key]
+        self._next_sweep = now + self.window
+        return summaries
+
+    @staticmethod
+    def _summary(key, entry):
+        return key, entry.level, entry.count
+
+    def _emit_summary(self, key, level, count):
+        # 第一条已经原样输出，只有被抑制的事件才需要汇总
+        suppressed = count - 1
+        if suppressed > 0 and self.logger.isEnabledFor(level):
+            self.logger.log(
+                level,
+                "重复事件汇总: %s 在 %ss 内共 %d 次（已抑制 %d 次）",
+                key, self.window, count, suppressed
+            )
@@ -0,0 +1,271 @@
+"""
+登录暴力破解限流
+单机共享内存（mmap）中的滑动窗口计数，按用户名与IP统计失败次数，超过阈值的登录在查询数据库与bcrypt之前被拒绝
+"""
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, request
+
+from flaskr.utils.metrics import metrics
+from flaskr.utils.response import error_response
+from flaskr.utils.safe_file import instance_file, open_private_file
+
+# 槽位：键哈希(u64)、窗口编号(u32)、当前窗口计数(u32)、上一窗口计数(u32)
+_SLOT = struct.Struct('<QIII')
+# 哈希冲突时最多探测的槽位数
+_PROBES = 4
+
+logger = logging.getLogger(__name__)
+
+
+class LoginThrottled(Exception):
+    """登录尝试过于频繁"""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f'retry after {retry_after}s')
+
+
+class SlidingWindowCounter:
+    """
+    固定大小的共享计数表（开放寻址哈希表）
+
+    滑动窗口用相邻两个固定窗口近似：估计值 = 上一窗口计数 × 剩余比例 + 当前窗口计数。
+    path 为文件时同一台机器的多个工作进程共享计数（文件锁 + 线程锁保护）；为空时使用进程内匿名内存。
+    表满时淘汰探测范围内计数最小的槽位，只会让攻击者少计几次，不会误伤。
+    """
+
+    def __init__(self, path=None, slots=65536):
+        """
+        Args:
+            path: 共享内存文件路径，为空时使用匿名内存
+            slots: 槽位数（每个槽位20字节）
+        """
+        self.path = path
+        self.slots = slots
+        self._size = slots * _SLOT.size
+        self._thread_lock = threading.Lock()
+        self._fd = None
+        if path:
+            self._fd = open_private_file(path, '限流共享内存文件')
+            if os.fstat(self._fd).st_size < self._size:
+                os.ftruncate(self._fd, self._size)
+            self._map = mmap.mmap(self._fd, self._size)
+        else:
+            self._map = mmap.mmap(-1, self._size)
+
+    @staticmethod
+    def _hash(key):
+        value = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+        # 0 表示空槽位
+        return value or 1
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if self._fd is None:
+                yield
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _find(self, key_hash, window_id, create):
+        """返回 (偏移, 槽位内容)，create 为 False 且不存在时返回 (None, None)"""
+        start = key_hash % self.slots
+        free = None
+        weakest = None
+        for i in range(_PROBES):
+            offset = ((start + i) % self.slots) * _SLOT.size
+            slot = _SLOT.unpack_from(self._map, offset)
+            if slot[0] == key_hash:
+                return offset, slot
+            # 空槽位或两个窗口之前的计数视为空闲
+            if slot[0] == 0 or slot[1] < window_id - 1:
+                if free is None:
+                    free = offset
+            elif weakest is None or slot[2] + slot[3] < weakest[1]:
+                weakest = (offset, slot[2] + slot[3])
+        if not create:
+            return None, None
+        return (free if free is not None else weakest[0]), (key_hash, window_id, 0, 0)
+
+    @staticmethod
+    def _roll(slot, window_id):
+        key_hash, slot_window, current, previous = slot
+        if slot_window == window_id:
+            return slot
+        if slot_window == window_id - 1:
+            return key_hash, window_id, 0, current
+        return key_hash, window_id, 0, 0
+
+    @staticmethod
+    def _estimate(slot, window, now):
+        _, _, current, previous = slot
+        return previous * (1 - (now % window) / window) + current
+
+    def get(self, key, window, now=None):
+        """当前滑动窗口内的估计计数"""
+        now = now or time.time()
+        window_id = int(now // window)
+        with self._locked():
+            _, slot = self._find(self._hash(key), window_id, create=False)
+        if slot is None:
+            return 0.0
+        return self._estimate(self._roll(slot, window_id), window, now)
+
+    def incr(self, key, window, now=None):
+        """计数加一，返回新的估计计数"""
+        now = now or time.time()
+        window_id = int(now // window)
+        with self._locked():
+            offset, slot = self._find(self._hash(key), window_id, create=True)
+            key_hash, slot_window, current, previous = self._roll(slot, window_id)
+            slot = (key_hash, slot_window, current + 1, previous)
+            _SLOT.pack_into(self._map, offset, *slot)
+        return self._estimate(slot, window, now)
+
+    def reset(self, key):
+        """清除计数"""
+        with self._locked():
+            offset, _ = self._find(self._hash(key), 0, create=False)
+            if offset is not None:
+                _SLOT.pack_into(self._map, offset, 0, 0, 0, 0)
+
+
+class LoginThrottle:
+    """
+    登录失败限流
+
+    - 用户名：窗口内失败次数达到 username_limit 后拒绝（覆盖已锁定账号与不存在的用户名）
+    - IP：窗口内失败次数达到 ip_limit 后拒绝（撞库时同一IP尝试大量用户名）
+    """
+
+    def __init__(self, counter, username_limit, ip_limit, window_seconds):
+        """
+        Args:
+            counter: SlidingWindowCounter
+            username_limit: 每个用户名窗口内允许的失败次数
+            ip_limit: 每个IP窗口内允许的失败次数
+            window_seconds: 滑动窗口长度（秒）
+        """
+        self.counter = counter
+        self.username_limit = username_limit
+        self.ip_limit = ip_limit
+        self.window = window_seconds
+
+    @classmethod
+    def from_config(cls, config, path=None):
+        """
+        根据应用配置创建（阈值与窗口由登录锁定配置推导）
+
+        Args:
+            config: 应用配置
+            path: 共享内存文件路径，为空时使用进程内匿名内存
+        """
+        max_attempts = config.get('MAX_LOGIN_ATTEMPTS', 5)
+        return cls(
+            SlidingWindowCounter(path, config.get('LOGIN_THROTTLE_SLOTS', 65536)),
+            username_limit=max_attempts * config.get('LOGIN_THROTTLE_USERNAME_FACTOR', 2),
+            ip_limit=max_attempts * config.get('LOGIN_THROTTLE_IP_FACTOR', 20),
+            window_seconds=config.get('LOCKOUT_DURATION_MINUTES', 30) * 60
+        )
+
+    @staticmethod
+    def _username_key(username):
+        return f'u:{(username or "").strip().lower()}'
+
+    def _limits(self, username, ip_address):
+        """(键, 阈值, 类型)，无法确定客户端IP时不按IP计数"""
+        limits = [(self._username_key(username), self.username_limit, 'username')]
+        if ip_address:
+            limits.append((f'ip:{ip_address}', self.ip_limit, 'ip'))
+        return limits
+
+    def check(self, username, ip_address, now=None):
+        """
+        检查是否应拒绝本次登录
+
+        Args:
+            username: 登录用户名或邮箱
+            ip_address: 客户端IP（client_ip() 的返回值），为空时只按用户名检查
+
+        Raises:
+            LoginThrottled: 用户名或IP的失败次数超过阈值
+        """
+        now = now or time.time()
+        for key, limit, kind in self._limits(username, ip_address):
+            if limit and self.counter.get(key, self.window, now) >= limit:
+                metrics.incr('login_throttled', key=kind)
+                raise LoginThrottled(int(self.window - now % self.window) + 1)
+
+    def record_failure(self, username, ip_address):
+        """记录一次失败的登录"""
+        for key, _, _ in self._limits(username, ip_address):
+            self.counter.incr(key, self.window)
+
+    def record_success(self, username):
+        """登录成功后清除该用户名的失败计数（IP计数保留）"""
+        self.counter.reset(self._username_key(username))
+
+
+def _shared_path(app):
+    """共享内存文件路径（默认在应用的 instance 目录下，每个部署实例独立）"""
+    if not app.config.get('LOGIN_THROTTLE_SHARED', True):
+        return None
+    path = app.config.get('LOGIN_THROTTLE_FILE')
+    if not path:
+        path = instance_file(app, 'login-throttle.bin')
+    return path
+
+
+def get_login_throttle(app=None):
+    """
+    获取当前进程的登录限流器（首次使用时创建，fork 后重新打开共享内存），未启用时返回 None
+
+    共享内存文件不安全或无法打开时退回进程内匿名内存（各工作进程分别计数）。
+
+    Args:
+        app: Flask应用实例，默认 current_app
+    """
+    app = app or current_app._get_current_object()
+    if not app.config.get('LOGIN_THROTTLE_ENABLED', True):
+        return None
+    cached = app.extensions.get('login_throttle')
+    if cached is None or cached[0] != os.getpid():
+        path = _shared_path(app)
+        try:
+            throttle = LoginThrottle.from_config(app.config, path)
+        except OSError as e:
+            logger.warning("登录限流无法使用共享内存文件，改为进程内计数: %s", e)
+            throttle = LoginThrottle.from_config(app.config)
+        cached = (os.getpid(), throttle)
+        app.extensions['login_throttle'] = cached
+    return cached[1]
+
+
+def client_ip():
+    """
+    登录限流使用的客户端IP
+
+    只使用 request.remote_addr：配置 TRUSTED_PROXY_COUNT 后由 ProxyFix 换成 X-Forwarded-For 中的真实客户端IP；
+    未配置时忽略 X-Forwarded-For（客户端可以任意伪造该请求头）。
+    """
+    return request.remote_addr
+
+
+def throttled_response(error):
+    """登录被限流时的响应（429，带 Retry-After）"""
+    response, status = error_response('登录尝试过于频繁，请稍后再试', 429)
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, status
@@ -0,0 +1,253 @@
+"""
+工作进程内存看门狗
+在请求之间采样RSS，超过上限或增长过快时让工作进程优雅退出，由gunicorn重新拉起
+"""
+import fcntl
+import json
+import logging
+import os
+import random
+import resource
+import time
+from collections import deque
+
+from flaskr.utils.metrics import metrics
+from flaskr.utils.safe_file import instance_file, open_private_file
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def read_rss_bytes():
+    """
+    读取当前进程的RSS（字节）
+
+    优先读取 /proc/self/statm（当前值），不可用时退回 getrusage 的峰值
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        # Linux 下单位为KB
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RecycleState:
+    """
+    单机共享的回收状态文件（通过文件锁协调多个工作进程）
+
+    记录最近一次回收时间，用于错开回收；并按原因累计回收次数，
+    工作进程退出后计数仍然保留，供指标接口读取。
+    path 为空时只在进程内记录（不协调其他工作进程）。
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 状态文件路径，为空时使用进程内状态
+
+        Raises:
+            OSError: 状态文件是符号链接或不安全
+        """
+        self.path = path
+        self._local = {}
+        if path:
+            # 启动时校验一次，不安全的文件直接报错，由调用方决定是否退回进程内状态
+            os.close(open_private_file(path, '回收状态文件'))
+
+    def _update(self, func, write=True):
+        if not self.path:
+            return func(self._local)
+        with os.fdopen(open_private_file(self.path, '回收状态文件'), 'r+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                content = f.read()
+                state = json.loads(content) if content else {}
+            except ValueError:
+                state = {}
+            result = func(state)
+            if write:
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+            return result
+
+    def try_acquire(self, reason, min_interval):
+        """
+        申请回收名额
+
+        Args:
+            reason: 回收原因
+            min_interval: 单机两次回收之间的最小间隔（秒）
+
+        Returns:
+            是否允许本进程现在回收
+        """
+        def acquire(state):
+            now = time.time()
+            if now - state.get('last_recycle_at', 0) < min_interval:
+                deferred = state.setdefault('deferred', {})
+                deferred[reason] = deferred.get(reason, 0) + 1
+                return False
+            state['last_recycle_at'] = now
+            reasons = state.setdefault('reasons', {})
+            reasons[reason] = reasons.get(reason, 0) + 1
+            return True
+
+        try:
+            return self._update(acquire)
+        except OSError as e:
+            # 状态文件在运行中被替换或删除目录：记录错误并允许回收（内存超限比错开回收更重要）
+            logger.error("回收状态文件不可用，本次回收不再与其他工作进程错开: %s", e)
+            metrics.incr('worker_recycle_state_errors')
+            return True
+
+    def read(self):
+        """读取回收统计"""
+        def snapshot(state):
+            return {
+                'reasons': dict(state.get('reasons', {})),
+                'deferred': dict(state.get('deferred', {})),
+                'last_recycle_at': state.get('last_recycle_at')
+            }
+
+        try:
+            return self._update(snapshot, write=False)
+        except OSError:
+            return snapshot({})
+
+
+class MemoryWatchdog:
+    """
+    工作进程内存看门狗
+
+    - ceiling: RSS超过上限（每个进程的上限带随机抖动，避免同时触发）
+    - growth: 最近一段时间内RSS增长速度超过阈值（MB/分钟）
+    """
+
+    def __init__(self, ceiling_mb, growth_mb_per_min=0, check_interval=10, ceiling_jitter=0.1,
+                 growth_window_seconds=300, min_recycle_interval=30, state_path=None):
+        """
+        Args:
+            ceiling_mb: RSS上限（MB），0表示不限制
+            growth_mb_per_min: 增长速度上限（MB/分钟），0表示不检查
+            check_interval: 每处理多少个请求采样一次
+            ceiling_jitter: 上限的随机抖动比例
+            growth_window_seconds: 计算增长速度的时间窗口
+            min_recycle_interval: 单机两次回收之间的最小间隔（秒）
+            state_path: 共享回收状态文件路径，为空时只在进程内记录
+
+        Raises:
+            OSError: 状态文件是符号链接或不安全
+        """
+        self.ceiling_bytes = int(ceiling_mb * 1024 * 1024 * (1 + random.uniform(0, ceiling_jitter)))
+        self.growth_bytes_per_sec = growth_mb_per_min * 1024 * 1024 / 60
+        self.check_interval = max(1, check_interval)
+        self.growth_window_seconds = growth_window_seconds
+        self.min_recycle_interval = min_recycle_interval
+        self.state = RecycleState(state_path)
+        self._requests = 0
+        self._samples = deque()
+        self._recycling = False
+
+    @classmethod
+    def from_config(cls, config, state_path=None):
+        """根据应用配置创建看门狗"""
+        return cls(
+            ceiling_mb=config.get('MEMORY_CEILING_MB', 0),
+            growth_mb_per_min=config.get('MEMORY_GROWTH_MB_PER_MIN', 0),
+            check_interval=config.get('MEMORY_CHECK_INTERVAL_REQUESTS', 10),
+            ceiling_jitter=config.get('MEMORY_CEILING_JITTER', 0.1),
+            growth_window_seconds=config.get('MEMORY_GROWTH_WINDOW_SECONDS', 300),
+            min_recycle_interval=config.get('MEMORY_RECYCLE_MIN_INTERVAL', 30),
+            state_path=state_path
+        )
+
+    def after_request(self):
+        """
+        请求结束后调用
+
+        Returns:
+            需要回收时返回原因（'ceiling' / 'growth'），否则返回None
+        """
+        if self._recycling:
+            return None
+
+        self._requests += 1
+        if self._requests % self.check_interval:
+            return None
+
+        now = time.monotonic()
+        rss = read_rss_bytes()
+        metrics.set_gauge('worker_rss_bytes', rss)
+
+        reason = self._check(now, rss)
+        if reason is None:
+            return None
+
+        if not self.state.try_acquire(reason, self.min_recycle_interval):
+            # 其他工作进程刚刚回收，稍后再试，避免同时重启
+            return None
+
+        self._recycling = True
+        metrics.incr('worker_recycles', reason=reason)
+        logger.warning(
+            "工作进程 %s 内存回收: reason=%s, rss=%.1fMB, requests=%s",
+            os.getpid(), reason, rss / 1024 / 1024, self._requests
+        )
+        return reason
+
+    def _check(self, now, rss):
+        if self.ceiling_bytes and rss > self.ceiling_bytes:
+            return 'ceiling'
+
+        if not self.growth_bytes_per_sec:
+            return None
+
+        self._samples.append((now, rss))
+        while self._samples and now - self._samples[0][0] > self.growth_window_seconds:
+            self._samples.popleft()
+
+        first_time, first_rss = self._samples[0]
+        elapsed = now - first_time
+        # 至少观察半个窗口再判断增长速度，避免启动阶段的正常增长触发回收
+        if elapsed >= self.growth_window_seconds / 2 and (rss - first_rss) / elapsed > self.growth_bytes_per_sec:
+            return 'growth'
+        return None
+
+
+_watchdog = None
+
+
+def _state_path(app):
+    """共享回收状态文件路径（默认在应用的 instance 目录下，每个部署实例独立）"""
+    return app.config.get('MEMORY_RECYCLE_STATE_FILE') or instance_file(app, 'memory-recycle.json')
+
+
+def init_watchdog(app):
+    """
+    初始化当前工作进程的看门狗（未配置上限时不启用）
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        MemoryWatchdog 或 None
+    """
+    global _watchdog
+    config = app.config
+    if not config.get('MEMORY_CEILING_MB') and not config.get('MEMORY_GROWTH_MB_PER_MIN'):
+        return None
+    try:
+        _watchdog = MemoryWatchdog.from_config(config, _state_path(app))
+    except OSError as e:
+        logger.error("回收状态文件不可用，各工作进程的回收不再错开: %s", e)
+        _watchdog = MemoryWatchdog.from_config(config)
+    metrics.register_collector('worker_recycles_host', _watchdog.state.read)
+    return _watchdog
+
+
+def get_watchdog():
+    """获取当前工作进程的看门狗"""
+    return _watchdog
@@ -0,0 +1,110 @@
+"""
+指标工具
+进程内指标注册表，供 /api/metrics 接口统一输出
+"""
+import threading
+
+
+def _label_key(labels):
+    """将标签字典转换为稳定的字符串键"""
+    if not labels:
+        return ''
+    return ','.join(f'{k}={v}' for k, v in sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    - counter: 单调递增计数
+    - gauge: 瞬时值
+    - summary: 观测值的次数、总和与最大值（例如耗时）
+    - collector: 在输出快照时调用的回调，返回可JSON序列化的数据
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+        self._collectors = {}
+
+    def incr(self, name, value=1, **labels):
+        """增加计数"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """设置瞬时值"""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name, value, **labels):
+        """记录一次观测值"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            summary = series.get(key)
+            if summary is None:
+                series[key] = {'count': 1, 'sum': value, 'max': value}
+            else:
+                summary['count'] += 1
+                summary['sum'] += value
+                if value > summary['max']:
+                    summary['max'] = value
+
+    def register_collector(self, name, func):
+        """
+        注册指标收集回调（同名覆盖）
+
+        Args:
+            name: 指标名称
+            func: 无参回调，返回可JSON序列化的数据
+        """
+        with self._lock:
+            self._collectors[name] = func
+
+    def snapshot(self):
+        """
+        获取所有指标的快照
+
+        Returns:
+            指标字典
+        """
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            summaries = {
+                name: {key: dict(summary) for key, summary in series.items()}
+                for name, series in self._summaries.items()
+            }
+            collectors = dict(self._collectors)
+
+        collected = {}
+        for name, func in collectors.items():
+            try:
+                collected[name] = func()
+            except Exception as e:
+                collected[name] = {'error': str(e)}
+
+        return {
+            'counters': counters,
+            'gauges': gauges,
+            'summaries': summaries,
+            'collectors': collected
+        }
+
+    def reset(self):
+        """清空所有指标（主要用于测试）"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+            self._collectors.clear()
+
+
+# 全局指标注册表（每个工作进程一份）
+metrics = MetricsRegistry()
@@ -0,0 +1,160 @@
+"""
+就绪检查
+后台线程按固定间隔检查依赖（数据库、连接池、限流存储、日志磁盘空间），请求只读取缓存结果
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from flaskr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def check_database(app):
+    """数据库连通性（熔断期间不访问数据库）"""
+    from flaskr.extensions import db
+
+    breaker = app.extensions.get('db_circuit_breaker')
+    if breaker is not None and breaker.state == 'open':
+        return False, {'circuit': 'open'}
+
+    started = time.perf_counter()
+    with app.app_context():
+        with db.engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+    return True, {'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+def check_pool(app):
+    """连接池饱和度（借出连接数 / 最大连接数）"""
+    from flaskr.extensions import db
+    from flaskr.utils.db_pool import configured_max_overflow
+
+    with app.app_context():
+        pool = db.engine.pool
+    if not isinstance(pool, QueuePool):
+        return True, {'class': type(pool).__name__}
+
+    capacity = pool.size() + configured_max_overflow(app)
+    saturation = pool.checkedout() / capacity if capacity else 0.0
+    return saturation < app.config.get('READINESS_POOL_SATURATION', 0.9), {'saturation': round(saturation, 2)}
+
+
+def check_rate_limit_storage(app):
+    """限流存储可用"""
+    from flaskr.extensions import limiter
+
+    storage = limiter.storage
+    if storage is None:
+        return True, {'storage': None}
+    return bool(storage.check()), {'storage': type(storage).__name__}
+
+
+def check_log_disk(app):
+    """日志目录所在磁盘的剩余空间"""
+    usage = shutil.disk_usage(app.config.get('LOG_DIR', 'logs'))
+    free_mb = usage.free // (1024 * 1024)
+    return free_mb >= app.config.get('READINESS_MIN_FREE_DISK_MB', 100), {'free_mb': free_mb}
+
+
+DEFAULT_CHECKS = {
+    'database': check_database,
+    'pool': check_pool,
+    'rate_limit_storage': check_rate_limit_storage,
+    'log_disk': check_log_disk,
+}
+
+
+class ReadinessProbe:
+    """
+    就绪检查器（每个工作进程一份）
+
+    检查结果预先编码为JSON响应体，请求时直接返回；
+    结果超过 3 个检查间隔未更新（后台线程异常）时视为未就绪。
+    """
+
+    def __init__(self, app, interval=5, checks=None):
+        """
+        Args:
+            app: Flask应用实例
+            interval: 检查间隔（秒）
+            checks: {名称: 检查函数}，检查函数接收 app，返回 (是否通过, 详情)
+        """
+        self.app = app
+        self.interval = interval
+        self.checks = checks or DEFAULT_CHECKS
+        self.ready = False
+        self.body = b''
+        self.checked_at = 0.0
+        self._pid = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run_checks(self):
+        """执行一轮检查并更新缓存结果"""
+        results = {}
+        ready = True
+        for name, check in self.checks.items():
+            started = time.perf_counter()
+            try:
+                ok, detail = check(self.app)
+            except Exception as e:
+                ok, detail = False, {'error': str(e)}
+            results[name] = dict(detail, ok=ok, ms=round((time.perf_counter() - started) * 1000, 2))
+            ready = ready and ok
+
+        if ready != self.ready:
+            logger.log(logging.INFO if ready else logging.WARNING, "就绪状态变化: ready=%s %s", ready, results)
+        metrics.set_gauge('readiness', int(ready))
+
+        payload = {
+            'success': ready,
+            'message': 'success' if ready else '服务未就绪',
+            'data': {'status': 'ready' if ready else 'not_ready', 'checks': results}
+        }
+        self.body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.ready = ready
+        self.checked_at = time.monotonic()
+
+    def ensure_started(self):
+        """启动后台检查线程（首次调用时同步执行一轮检查；fork 后的工作进程会重新启动线程）"""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self.run_checks()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='readiness-probe', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_checks()
+
+    def stop(self):
+        """停止后台检查线程"""
+        self._stop.set()
+
+    def snapshot(self):
+        """
+        当前缓存的检查结果
+
+        Returns:
+            (是否就绪, JSON响应体)
+        """
+        self.ensure_started()
+        if time.monotonic() - self.checked_at > self.interval * 3:
+            return False, json.dumps({
+                'success': False, 'message': '服务未就绪', 'data': {'status': 'stale'}
+            }).encode('utf-8')
+        return self.ready, self.body
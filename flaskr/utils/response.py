@@ -1,7 +1,9 @@
 """
 响应工具
 """
-from flask import jsonify
+import hashlib
+
+from flask import jsonify, request
 
 
 def success_response(data=None, status_code=200, message='success'):
@@ -43,3 +45,23 @@ def error_response(message='error', status_code=400, errors=None):
     }
     return jsonify(response), status_code
 
+
+def conditional_response(data, etag_parts=()):
+    """
+    带ETag的成功响应，If-None-Match 匹配时返回304
+
+    Args:
+        data: 响应数据
+        etag_parts: 参与计算ETag的附加内容（如稀疏字段集合）
+
+    Returns:
+        Response
+    """
+    response, _ = success_response(data)
+    digest = hashlib.sha256(response.get_data())
+    for part in etag_parts:
+        digest.update(b'\0' + str(part).encode('utf-8'))
+    response.set_etag(digest.hexdigest()[:32])
+    # 需要认证的数据只允许客户端缓存，使用前必须重新验证
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
@@ -0,0 +1,104 @@
+"""
+分页总数统计
+支持精确 COUNT(*)、带TTL的进程内缓存、基于统计信息的估算三种策略，避免大表的每次列表请求都全表计数
+"""
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, select, text
+
+from flaskr.extensions import db
+from flaskr.utils.metrics import metrics
+
+STRATEGY_EXACT = 'exact'
+STRATEGY_CACHED = 'cached'
+STRATEGY_ESTIMATED = 'estimated'
+
+# {表名: (行数, 过期时间)}
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def invalidate_count(model):
+    """使该表的缓存行数失效（注册、删除用户后调用，只作用于当前进程）"""
+    with _cache_lock:
+        _cache.pop(model.__tablename__, None)
+
+
+def _exact(model):
+    return db.session.scalar(select(func.count()).select_from(model))
+
+
+def _cached(model, ttl):
+    table = model.__tablename__
+    now = time.monotonic()
+    entry = _cache.get(table)
+    if entry is not None and entry[1] > now:
+        metrics.incr('row_count_cache', table=table, result='hit')
+        return entry[0]
+
+    metrics.incr('row_count_cache', table=table, result='miss')
+    count = _exact(model)
+    with _cache_lock:
+        _cache[table] = (count, now + ttl)
+    return count
+
+
+def _estimated(model):
+    """
+    从统计信息估算行数，没有统计信息时返回 None
+
+    PostgreSQL 读取 pg_class.reltuples（由 VACUUM / ANALYZE 维护）；
+    SQLite 读取 ANALYZE 生成的 sqlite_stat1。
+    """
+    table = model.__tablename__
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        estimate = db.session.execute(
+            text('SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)'), {'table': table}
+        ).scalar()
+        # PostgreSQL 14+ 从未分析过的表为 -1
+        return int(estimate) if estimate is not None and estimate >= 0 else None
+    if dialect == 'sqlite':
+        has_stats = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        ).first()
+        if not has_stats:
+            return None
+        stat = db.session.execute(
+            text('SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1'), {'table': table}
+        ).scalar()
+        return int(stat.split()[0]) if stat else None
+    return None
+
+
+def count_rows(model, strategy=None):
+    """
+    统计表的行数
+
+    estimated 策略在估算值小于 COUNT_EXACT_BELOW 时改用精确计数（小表计数很快），
+    没有统计信息时退回 cached 策略。
+
+    Args:
+        model: SQLAlchemy模型类
+        strategy: exact / cached / estimated，默认读取 COUNT_STRATEGY 配置
+
+    Returns:
+        (行数, 实际使用的策略)
+    """
+    config = current_app.config
+    strategy = strategy or config.get('COUNT_STRATEGY', STRATEGY_EXACT)
+
+    if strategy == STRATEGY_ESTIMATED:
+        estimate = _estimated(model)
+        if estimate is not None:
+            if estimate >= config.get('COUNT_EXACT_BELOW', 10000):
+                return estimate, STRATEGY_ESTIMATED
+            return _exact(model), STRATEGY_EXACT
+        strategy = STRATEGY_CACHED
+
+    if strategy == STRATEGY_CACHED:
+        return _cached(model, config.get('COUNT_CACHE_TTL', 60)), STRATEGY_CACHED
+
+    return _exact(model), STRATEGY_EXACT
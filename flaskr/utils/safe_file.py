@@ -0,0 +1,45 @@
+"""
+本地状态文件的安全打开
+限流计数、回收状态、定时任务锁等文件会被同一台机器上的工作进程共享，
+打开时不跟随符号链接，只接受当前用户所有、其他用户不可写的普通文件
+"""
+import os
+import stat
+
+
+def instance_file(app, name):
+    """
+    应用 instance 目录下的文件路径（每个部署实例独立，目录权限 0700）
+
+    Args:
+        app: Flask应用实例
+        name: 文件名
+
+    Returns:
+        文件的绝对路径
+    """
+    os.makedirs(app.instance_path, mode=0o700, exist_ok=True)
+    return os.path.join(app.instance_path, name)
+
+
+def open_private_file(path, description='状态文件'):
+    """
+    以读写方式打开（不存在时创建，权限 0600）本地状态文件
+
+    Args:
+        path: 文件路径
+        description: 出错时的文件描述
+
+    Returns:
+        文件描述符
+
+    Raises:
+        OSError: 文件是符号链接或无法打开
+        PermissionError: 文件不是当前用户所有的普通文件，或其他用户可写
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC, 0o600)
+    info = os.fstat(fd)
+    if not stat.S_ISREG(info.st_mode) or info.st_uid != os.geteuid() or info.st_mode & 0o022:
+        os.close(fd)
+        raise PermissionError(f'{description}不安全（需为当前用户所有的普通文件且其他用户不可写）: {path}')
+    return fd
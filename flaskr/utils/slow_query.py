@@ -0,0 +1,307 @@
+"""
+慢查询日志
+记录超过阈值或按采样率命中的SQL，后台线程获取执行计划并写入日志文件
+"""
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+
+from flaskr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(statement):
+    """
+    规范化SQL语句，使参数不同的同类查询聚合到一起
+
+    - 字符串、数字字面量替换为 ?
+    - IN 列表等多个占位符合并为 (?)
+    - 合并空白字符
+
+    Args:
+        statement: SQL语句
+
+    Returns:
+        规范化后的语句
+    """
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _PLACEHOLDER_LIST.sub('(?)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+class SlowQueryLog:
+    """
+    慢查询记录器
+
+    请求路径上只做一次计时与比较；命中的查询放入队列，
+    由后台线程获取执行计划（每条规范化语句只获取一次）并追加写入日志文件。
+    """
+
+    def __init__(self, threshold_ms=200, sample_rate=0.0, explain=True, log_file=None, max_statements=500,
+                 max_plans=100):
+        """
+        Args:
+            threshold_ms: 慢查询阈值（毫秒）
+            sample_rate: 未超过阈值的查询的采样率
+            explain: 是否获取执行计划
+            log_file: 慢查询日志文件（JSON Lines），为空时只输出到日志
+            max_statements: 进程内聚合的最大语句数
+            max_plans: 缓存的执行计划数（LRU，超出时淘汰最久未使用的语句）
+        """
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain = explain
+        self.log_file = log_file
+        self.max_statements = max_statements
+        self.max_plans = max_plans
+        self.stats = {}
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=1000)
+        self._worker = None
+        self._engine = None
+
+    def install(self, engine):
+        """
+        在引擎上注册计时事件
+
+        Args:
+            engine: SQLAlchemy引擎
+        """
+        self._engine = engine
+        # 单连接共享（内存SQLite）时不能在后台线程中使用同一个连接
+        if isinstance(engine.pool, StaticPool):
+            self.explain = False
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def start_timer(conn, cursor, statement, parameters, context, executemany):
+            context._slow_query_started = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def stop_timer(conn, cursor, statement, parameters, context, executemany):
+            elapsed_ms = (time.perf_counter() - context._slow_query_started) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                self.record(statement, parameters, elapsed_ms, executemany, sampled=False)
+            elif self.sample_rate and random.random() < self.sample_rate:
+                self.record(statement, parameters, elapsed_ms, executemany, sampled=True)
+
+    def record(self, statement, parameters, elapsed_ms, executemany=False, sampled=False):
+        """
+        记录一条查询（请求线程中只做聚合，其余工作交给后台线程）
+
+        Args:
+            statement: SQL语句
+            parameters: 参数
+            elapsed_ms: 耗时（毫秒）
+            executemany: 是否为批量执行
+            sampled: 是否为采样命中（未超过阈值）
+        """
+        normalized = normalize_statement(statement)
+        route = request.endpoint if has_request_context() else None
+
+        with self._lock:
+            entry = self.stats.get(normalized)
+            if entry is None:
+                if len(self.stats) >= self.max_statements:
+                    metrics.incr('slow_query_dropped')
+                    return
+                entry = self.stats[normalized] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'route': route}
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+
+        if not sampled:
+            metrics.incr('slow_queries')
+            logger.warning("慢查询 %.1fms [%s]: %s", elapsed_ms, route, normalized)
+
+        try:
+            self._queue.put_nowait({
+                'statement': statement,
+                'parameters': None if executemany else parameters,
+                'normalized': normalized,
+                'duration_ms': round(elapsed_ms, 2),
+                'route': route,
+                'sampled': sampled,
+                'at': time.time(),
+                'pid': os.getpid()
+            })
+        except queue.Full:
+            metrics.incr('slow_query_dropped')
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            # fork 后的工作进程需要重新启动后台线程
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='slow-query-log', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._process(item)
+            except Exception as e:
+                logger.warning("慢查询处理失败: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, item):
+        normalized = item['normalized']
+        with self._lock:
+            cached = normalized in self._plans
+            if cached:
+                self._plans.move_to_end(normalized)
+                item['plan'] = self._plans[normalized]
+        if not cached:
+            item['plan'] = None
+            if self.explain and item['parameters'] is not None:
+                item['plan'] = self._explain(item['statement'], item['parameters'])
+                with self._lock:
+                    self._plans[normalized] = item['plan']
+                    while len(self._plans) > self.max_plans:
+                        self._plans.popitem(last=False)
+
+        if self.log_file:
+            record = {key: value for key, value in item.items() if key not in ('statement', 'parameters')}
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _explain(self, statement, parameters):
+        """获取执行计划（只对SELECT执行，不使用 ANALYZE，不会再次执行查询）"""
+        if not statement.lstrip().upper().startswith('SELECT'):
+            return None
+        prefix = 'EXPLAIN QUERY PLAN ' if self._engine.dialect.name == 'sqlite' else 'EXPLAIN '
+        with self._engine.connect() as conn:
+            rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        return [' '.join(str(col) for col in row) for row in rows]
+
+    def flush(self):
+        """等待后台线程处理完队列中的记录"""
+        if self._worker is not None:
+            self._queue.join()
+
+    def top(self, n=10, sort='total_ms'):
+        """
+        进程内聚合的前N条语句
+
+        Args:
+            n: 条数
+            sort: 排序字段（total_ms / count / max_ms）
+
+        Returns:
+            列表
+        """
+        with self._lock:
+            items = [dict(entry, statement=statement) for statement, entry in self.stats.items()]
+            items.sort(key=lambda entry: entry[sort], reverse=True)
+            items = items[:n]
+            for entry in items:
+                entry['plan'] = self._plans.get(entry['statement'])
+        return items
+
+
+def aggregate_log_file(path, n=10, sort='total_ms'):
+    """
+    汇总慢查询日志文件（多个工作进程写入同一文件）
+
+    Args:
+        path: 日志文件路径
+        n: 条数
+        sort: 排序字段（total_ms / count / max_ms）
+
+    Returns:
+        前N条语句的聚合结果
+    """
+    stats = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            entry = stats.setdefault(record['normalized'], {
+                'statement': record['normalized'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'routes': set(), 'plan': None
+            })
+            entry['count'] += 1
+            entry['total_ms'] += record['duration_ms']
+            entry['max_ms'] = max(entry['max_ms'], record['duration_ms'])
+            if record.get('route'):
+                entry['routes'].add(record['route'])
+            entry['plan'] = entry['plan'] or record.get('plan')
+
+    items = sorted(stats.values(), key=lambda entry: entry[sort], reverse=True)[:n]
+    for entry in items:
+        entry['routes'] = sorted(entry['routes'])
+        entry['total_ms'] = round(entry['total_ms'], 2)
+    return items
+
+
+def resolve_log_file(app, path=None):
+    """
+    慢查询日志文件的绝对路径（相对路径按应用的 instance 目录解析，与启动时的工作目录无关）
+
+    Args:
+        app: Flask应用实例
+        path: 日志文件路径，默认 SLOW_QUERY_LOG_FILE
+
+    Returns:
+        绝对路径，未配置时返回None
+    """
+    path = path or app.config.get('SLOW_QUERY_LOG_FILE')
+    if not path:
+        return None
+    return os.path.join(app.instance_path, path)
+
+
+def init_slow_query_log(app, engine):
+    """
+    按配置启用慢查询日志
+
+    Args:
+        app: Flask应用实例
+        engine: SQLAlchemy引擎
+
+    Returns:
+        SlowQueryLog 或 None
+    """
+    if not app.config.get('SLOW_QUERY_LOG_ENABLED', True):
+        return None
+
+    log_file = resolve_log_file(app)
+    if log_file:
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+    slow_query_log = SlowQueryLog(
+        threshold_ms=app.config.get('SLOW_QUERY_THRESHOLD_MS', 200),
+        sample_rate=app.config.get('SLOW_QUERY_SAMPLE_RATE', 0.0),
+        explain=app.config.get('SLOW_QUERY_EXPLAIN', True),
+        log_file=log_file
+    )
+    slow_query_log.install(engine)
+    app.extensions['slow_query_log'] = slow_query_log
+    metrics.register_collector('slow_queries', lambda: slow_query_log.top(10))
+    return slow_query_log
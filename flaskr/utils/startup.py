@@ -0,0 +1,56 @@
+"""
+启动耗时统计
+记录 create_app 各阶段的耗时（包括阶段内触发的模块导入）
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """应用启动阶段计时器"""
+
+    def __init__(self):
+        self.phases = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        记录一个启动阶段
+
+        Args:
+            name: 阶段名称
+        """
+        modules_before = len(sys.modules)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'phase': name,
+                'ms': round((time.perf_counter() - started) * 1000, 2),
+                'modules_imported': len(sys.modules) - modules_before
+            })
+
+    @property
+    def total_ms(self):
+        """从计时器创建到现在的总耗时（毫秒）"""
+        return round((time.perf_counter() - self._started) * 1000, 2)
+
+    def report(self):
+        """
+        获取耗时报告
+
+        Returns:
+            报告字典
+        """
+        return {
+            'total_ms': self.total_ms,
+            'phases': list(self.phases)
+        }
+
+    def summary(self):
+        """单行摘要，用于日志输出"""
+        parts = ', '.join(f"{p['phase']}={p['ms']}ms" for p in self.phases)
+        return f'{self.total_ms}ms ({parts})'
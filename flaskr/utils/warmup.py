@@ -0,0 +1,152 @@
+"""
+工作进程预热工具
+fork 前后的数据库引擎处理，以及工作进程接收流量前的预热
+"""
+import logging
+import os
+import time
+
+from flask import g
+
+from flaskr.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 当前进程是否已完成第一个请求（fork 时该状态被继承，主进程不处理请求）
+_first_request_done = False
+_warmed_up = False
+
+
+def dispose_engines(app):
+    """
+    关闭引擎连接池中的所有连接（fork 前在主进程中调用）
+
+    Args:
+        app: Flask应用实例
+    """
+    from flaskr.extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+    async_db = app.extensions.get('async_db')
+    if async_db is not None:
+        async_db.dispose()
+
+
+def reset_engines_after_fork(app):
+    """
+    丢弃从主进程继承的连接池（fork 后在工作进程中调用）
+
+    close=False 只丢弃引用而不关闭连接，避免关闭主进程仍在使用的socket。
+
+    Args:
+        app: Flask应用实例
+    """
+    from flaskr.extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def _open_connections(engine, count):
+    """同时借出 count 个连接后归还，使连接池中保留这些连接"""
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+
+def _compile_hot_queries():
+    """
+    执行一次认证热点查询（参数不会命中任何行）
+
+    SQLAlchemy 的语句编译缓存只在执行时填充，执行一次即可让首个真实请求跳过编译
+    """
+    from flaskr.extensions import db
+    from flaskr.models.auth import RefreshToken, UserLockout
+    from flaskr.models.user import User
+
+    User.query.filter((User.username == '') | (User.email == '')).first()
+    User.query.filter_by(username='').first()
+    User.query.filter_by(email='').first()
+    db.session.get(User, 0)
+    UserLockout.query.filter_by(user_id=0).first()
+    RefreshToken.query.filter_by(token_digest=RefreshToken.digest('')).first()
+
+
+def warm_up(app):
+    """
+    预热工作进程（在接收流量前调用）
+
+    - 预先建立 DB_POOL_WARM_CONNECTIONS 个数据库连接
+    - 执行认证热点查询，填充语句编译缓存
+    - 生成一次JWT，加载延迟导入的模块
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        各步骤耗时（毫秒）
+    """
+    global _warmed_up
+    from flask_jwt_extended import create_access_token
+    from flaskr.extensions import db
+
+    timings = {}
+
+    def step(name, func):
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            logger.warning("预热步骤 %s 失败: %s", name, e)
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    with app.app_context():
+        engine = db.engine
+        warm_connections = app.config.get('DB_POOL_WARM_CONNECTIONS', 1)
+        pool_size = getattr(engine.pool, 'size', lambda: warm_connections)()
+
+        step('connections', lambda: _open_connections(engine, min(warm_connections, pool_size)))
+        step('queries', _compile_hot_queries)
+        step('jwt', lambda: create_access_token(identity=0))
+        step('imports', lambda: __import__('flaskr.utils.data_masking'))
+        db.session.remove()
+
+    step('routing', lambda: app.url_map.bind('localhost').match('/api/health'))
+
+    _warmed_up = True
+    metrics.register_collector('warmup', lambda: dict(timings))
+    logger.info("工作进程 %s 预热完成: %s", os.getpid(), timings)
+    return timings
+
+
+def register_first_request_metrics(app):
+    """
+    记录每个工作进程第一个请求的耗时（区分是否已预热）
+
+    Args:
+        app: Flask应用实例
+    """
+
+    @app.before_request
+    def mark_first_request_start():
+        if not _first_request_done:
+            g._first_request_started = time.perf_counter()
+
+    @app.teardown_request
+    def record_first_request(exc):
+        global _first_request_done
+        started = g.pop('_first_request_started', None)
+        if started is None or _first_request_done:
+            return
+        _first_request_done = True
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        metrics.set_gauge('first_request_ms', elapsed_ms, warmed=str(_warmed_up).lower())
@@ -2,7 +2,7 @@
 视图模块
 统一导入所有视图
 """
-from flaskr.views import auth, users, health, common
+from flaskr.views import auth, auth_async, users, health, common, metrics
 
-__all__ = ['auth', 'users', 'health', 'common']
+__all__ = ['auth', 'auth_async', 'users', 'health', 'common', 'metrics']
 
@@ -6,11 +6,13 @@ from flask import request
 from flask_jwt_extended import (
     create_access_token,
     get_jwt_identity,
-    jwt_required
+    jwt_required,
+    verify_jwt_in_request
 )
 
 from flaskr.core.auth import AuthService
 from flaskr.core.token import TokenService
+from flaskr.utils.login_throttle import LoginThrottled, throttled_response
 from flaskr.utils.response import success_response, error_response
 
 
@@ -40,12 +42,12 @@ def register():
 
     # 生成JWT token
     access_token = create_access_token(identity=user.id)
-    refresh_token_obj = TokenService.create_refresh_token(user.id)
+    refresh_token = TokenService.create_refresh_token(user.id)
 
     return success_response({
         'user': user.to_dict(),
         'access_token': access_token,
-        'refresh_token': refresh_token_obj.token
+        'refresh_token': refresh_token
     }, 201)
 
 
@@ -58,43 +60,58 @@ def login():
         return error_response('用户名或密码错误', 400)  # 模糊提示
 
     # 登录验证
-    user, error, is_locked = AuthService.login(
-        username_or_email=data['username'],
-        password=data['password']
-    )
+    try:
+        user, error, is_locked = AuthService.login(
+            username_or_email=data['username'],
+            password=data['password']
+        )
+    except LoginThrottled as e:
+        return throttled_response(e)
 
     if error:
         return error_response(error, 401)
 
     # 生成JWT token
     access_token = create_access_token(identity=user.id)
-    refresh_token_obj = TokenService.create_refresh_token(user.id)
+    refresh_token = TokenService.create_refresh_token(user.id)
 
     return success_response({
         'user': user.to_dict(),
         'access_token': access_token,
-        'refresh_token': refresh_token_obj.token
+        'refresh_token': refresh_token
     })
 
 
-@jwt_required(refresh=True)
 def refresh():
-    """刷新Access Token视图"""
-    user_id = get_jwt_identity()
+    """
+    刷新Access Token视图
 
-    # 验证用户是否存在且激活
+    请求体带 refresh_token（登录/注册返回的不透明token）时轮换：旧token作废，返回新的 access_token 与 refresh_token；
+    否则使用 Authorization 头中的JWT刷新token，只返回新的 access_token。
+    """
     from flaskr.models.user import User
+
+    data = request.get_json(silent=True) or {}
+    new_refresh_token = None
+    if data.get('refresh_token'):
+        user_id, new_refresh_token, error = TokenService.rotate_refresh_token(data['refresh_token'])
+        if error:
+            return error_response(error, 401)
+    else:
+        verify_jwt_in_request(refresh=True)
+        user_id = get_jwt_identity()
+
+    # 验证用户是否存在且激活
     user = User.query.get(user_id)
 
     if not user or not user.is_active:
         return error_response('用户不存在或已被禁用', 401)
 
     # 生成新的access token
-    access_token = create_access_token(identity=user_id)
-
-    return success_response({
-        'access_token': access_token
-    })
+    response = {'access_token': create_access_token(identity=user_id)}
+    if new_refresh_token:
+        response['refresh_token'] = new_refresh_token
+    return success_response(response)
 
 
 @jwt_required()
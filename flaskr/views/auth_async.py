@@ -0,0 +1,118 @@
+"""
+异步认证视图
+与 views/auth.py 行为一致，密码哈希与数据库操作不阻塞请求的事件循环
+
+应用以WSGI方式运行（gunicorn gthread），Flask 通过 async_to_sync 为每个请求单独运行一个事件循环，
+同一循环内没有其他请求可以切换，因此并发能力与同步视图相同：来自 GUNICORN_THREADS 的线程数，
+以及bcrypt线程池（计算期间释放GIL，多个线程的哈希可以并行利用多核）。
+
+JWT 校验由路由上的 jwt_required 完成：同步装饰器包装协程函数会在事件循环内嵌套
+async_to_sync，因此这里的视图函数不再叠加装饰器。
+"""
+from flask import request
+from flask_jwt_extended import create_access_token, get_jwt_identity, verify_jwt_in_request
+
+from flaskr.core.async_auth import AsyncAuthService
+from flaskr.utils.login_throttle import LoginThrottled, throttled_response
+from flaskr.utils.response import success_response, error_response
+
+
+async def register():
+    """用户注册视图（异步）"""
+    data = request.get_json()
+
+    # 验证必填字段
+    required_fields = ['username', 'email', 'password']
+    for field in required_fields:
+        if field not in data or not data[field]:
+            return error_response('用户名或密码错误', 400)  # 模糊提示
+
+    # 验证密码强度（至少8位）
+    if len(data['password']) < 8:
+        return error_response('用户名或密码错误', 400)  # 模糊提示
+
+    user, refresh_token, error = await AsyncAuthService.register(
+        username=data['username'],
+        email=data['email'],
+        password=data['password']
+    )
+
+    if error:
+        return error_response(error, 400)
+
+    return success_response({
+        'user': user.to_dict(),
+        'access_token': create_access_token(identity=user.id),
+        'refresh_token': refresh_token
+    }, 201)
+
+
+async def login():
+    """用户登录视图（异步）"""
+    data = request.get_json()
+
+    # 验证必填字段
+    if 'username' not in data or 'password' not in data:
+        return error_response('用户名或密码错误', 400)  # 模糊提示
+
+    try:
+        user, refresh_token, error, is_locked = await AsyncAuthService.login(
+            username_or_email=data['username'],
+            password=data['password']
+        )
+    except LoginThrottled as e:
+        return throttled_response(e)
+
+    if error:
+        return error_response(error, 401)
+
+    return success_response({
+        'user': user.to_dict(),
+        'access_token': create_access_token(identity=user.id),
+        'refresh_token': refresh_token
+    })
+
+
+async def refresh():
+    """
+    刷新Access Token视图（异步，与 /api/auth/refresh 行为一致）
+
+    请求体带 refresh_token 时轮换：旧token作废，返回新的 access_token 与 refresh_token；
+    否则使用 Authorization 头中的JWT刷新token，只返回新的 access_token。
+    """
+    data = request.get_json(silent=True) or {}
+    new_refresh_token = None
+    if data.get('refresh_token'):
+        user_id, new_refresh_token, error = await AsyncAuthService.rotate_refresh_token(data['refresh_token'])
+        if error:
+            return error_response(error, 401)
+    else:
+        verify_jwt_in_request(refresh=True)
+        user_id = get_jwt_identity()
+
+    user, _ = await AsyncAuthService.get_user(user_id)
+    if not user or not user.is_active:
+        return error_response('用户不存在或已被禁用', 401)
+
+    response = {'access_token': create_access_token(identity=user_id)}
+    if new_refresh_token:
+        response['refresh_token'] = new_refresh_token
+    return success_response(response)
+
+
+async def me():
+    """获取当前用户信息视图（异步）"""
+    from flaskr.utils.data_masking import mask_user_data
+
+    user, is_locked = await AsyncAuthService.get_user(get_jwt_identity())
+
+    if not user:
+        return error_response('用户不存在', 404)
+
+    # 返回数据前进行脱敏处理
+    user_data = user.to_dict()
+    user_data['is_locked'] = is_locked
+
+    return success_response({
+        'user': mask_user_data(user_data)
+    })
@@ -1,10 +1,19 @@
 """
 健康检查视图
 """
+from flask import current_app
+
 from flaskr.utils.response import success_response
 
 
 def health_check():
-    """健康检查视图"""
-    return success_response({'status': 'healthy'})
+    """健康检查视图（不访问数据库，数据库熔断时返回 degraded）"""
+    data = {'status': 'healthy'}
+
+    breaker = current_app.extensions.get('db_circuit_breaker')
+    if breaker is not None:
+        data['database'] = breaker.status()
+        if breaker.state != 'closed':
+            data['status'] = 'degraded'
 
+    return success_response(data)
@@ -0,0 +1,27 @@
+"""
+指标视图
+"""
+import hmac
+
+from flask import current_app, request
+
+from flaskr.utils.metrics import metrics
+from flaskr.utils.response import success_response, error_response
+
+
+def get_metrics():
+    """获取进程内指标视图"""
+    if not current_app.config.get('METRICS_ENABLED', True):
+        return error_response('资源不存在', 404)
+
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        # 指标包含客户端IP与连接池等内部信息，开发、测试环境之外必须配置令牌
+        if not (current_app.debug or current_app.testing):
+            return error_response('未配置指标访问令牌', 403)
+    else:
+        provided = request.headers.get('X-Metrics-Token', '')
+        if not hmac.compare_digest(provided, token):
+            return error_response('未授权访问', 401)
+
+    return success_response(metrics.snapshot())
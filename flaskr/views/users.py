@@ -2,47 +2,90 @@
 用户相关视图
 业务逻辑处理
 """
-from flask import request
+import math
+
+from flask import abort, request
 from flask_jwt_extended import get_jwt_identity
 
+from flaskr.core import user_search
 from flaskr.extensions import db
 from flaskr.models.user import User
-from flaskr.utils.response import success_response, error_response
-
+from flaskr.utils.data_masking import USER_FIELD_MASKERS
+from flaskr.utils.projection import InvalidFieldsError, RowSerializer, parse_fields
+from flaskr.utils.response import conditional_response, success_response, error_response
+from flaskr.utils.row_count import count_rows, invalidate_count
 
-def get_users():
-    """获取用户列表视图"""
-    from flaskr.utils.data_masking import mask_user_data
-
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
 
-    pagination = User.query.paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
+def _requested_fields():
+    """解析 ?fields= 参数（白名单为 User.PUBLIC_FIELDS）"""
+    return parse_fields(request.args.get('fields'), User.PUBLIC_FIELDS)
 
-    # 对用户数据进行脱敏
-    users_data = [mask_user_data(user.to_dict()) for user in pagination.items]
 
-    return success_response({
-        'users': users_data,
-        'total': pagination.total,
+def get_users():
+    """获取用户列表视图（列投影读取，只查询并返回 ?fields= 指定的字段）"""
+    page = max(request.args.get('page', 1, type=int) or 1, 1)
+    per_page = request.args.get('per_page', 10, type=int)
+    if per_page is None or per_page < 1:
+        per_page = 10
+    try:
+        fields = _requested_fields()
+    except InvalidFieldsError as e:
+        return error_response(str(e), 400, {'fields': e.invalid})
+
+    serializer = RowSerializer.for_model(User, fields, USER_FIELD_MASKERS)
+    total, count_strategy = count_rows(User)
+    rows = db.session.execute(
+        serializer.select().order_by(User.id).limit(per_page).offset((page - 1) * per_page)
+    ).all()
+
+    return conditional_response({
+        # 序列化时只对选中的字段脱敏
+        'users': serializer.dump_many(rows),
+        'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': pagination.pages
-    })
+        'pages': math.ceil(total / per_page) if total else 0,
+        # 总数的来源：exact / cached / estimated
+        'count_strategy': count_strategy
+    }, etag_parts=fields)
 
 
 def get_user(user_id):
-    """获取单个用户视图"""
-    from flaskr.utils.data_masking import mask_user_data
+    """获取单个用户视图（支持 ?fields=）"""
+    try:
+        fields = _requested_fields()
+    except InvalidFieldsError as e:
+        return error_response(str(e), 400, {'fields': e.invalid})
+
+    serializer = RowSerializer.for_model(User, fields, USER_FIELD_MASKERS)
+    row = db.session.execute(serializer.select().where(User.id == user_id)).first()
+    if row is None:
+        abort(404)
+    return conditional_response(serializer.dump(row), etag_parts=fields)
+
+
+def search_users():
+    """搜索用户视图（?q= 搜索词，?cursor= 游标分页，支持 ?fields=）"""
+    query = (request.args.get('q') or '').strip()
+    if not query or len(query) > 100:
+        return error_response('搜索词长度应为1-100个字符', 400)
+    limit = min(max(request.args.get('limit', 20, type=int) or 20, 1), 100)
+    try:
+        fields = _requested_fields()
+    except InvalidFieldsError as e:
+        return error_response(str(e), 400, {'fields': e.invalid})
 
-    user = User.query.get_or_404(user_id)
-    # 对用户数据进行脱敏
-    user_data = mask_user_data(user.to_dict())
-    return success_response(user_data)
+    serializer = RowSerializer.for_model(User, fields, USER_FIELD_MASKERS)
+    try:
+        rows, next_cursor = user_search.search_users(query, serializer.columns, limit, request.args.get('cursor'))
+    except user_search.InvalidCursorError as e:
+        return error_response(str(e), 400)
+
+    return success_response({
+        # 序列化时同时脱敏
+        'users': serializer.dump_many(rows),
+        'next_cursor': next_cursor
+    })
 
 
 def update_user(user_id):
@@ -95,6 +138,7 @@ def delete_user(user_id):
         # 软删除：设置为非激活状态
         user.is_active = False
         db.session.commit()
+        invalidate_count(User)
         return success_response({'message': '账号已删除'})
     except Exception as e:
         db.session.rollback()
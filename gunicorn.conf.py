@@ -12,6 +12,12 @@ backlog = 2048
 # 工作进程配置
 workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
 worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+# 每个工作进程的线程数，大于1时 sync 自动切换为 gthread，
+# 配合异步认证接口（/api/async/auth/*）可在单进程内并发处理多个登录
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+# 供应用按进程数与线程数计算数据库连接池大小（flaskr/utils/db_pool.py）
+os.environ['GUNICORN_WORKERS'] = str(workers)
+os.environ['GUNICORN_THREADS'] = str(threads)
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -34,8 +40,10 @@ group = os.getenv('GUNICORN_GROUP', None)
 tmp_redirect = False
 
 # 性能调优
-max_requests = 1000
-max_requests_jitter = 50
+# 内存增长由内存看门狗（MEMORY_CEILING_MB / MEMORY_GROWTH_MB_PER_MIN）按实际RSS回收，
+# max_requests 只作为兜底，避免频繁重启正常的工作进程
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '20000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '2000'))
 preload_app = True
 
 # SSL配置（如果需要HTTPS）
@@ -52,15 +60,62 @@ def worker_int(worker):
 
 def pre_fork(server, worker):
     """工作进程fork前的回调"""
-    pass
+    # 关闭主进程（preload_app）中已打开的数据库连接，避免socket被多个工作进程共享
+    if server.cfg.preload_app:
+        from flaskr.utils.warmup import dispose_engines
+        dispose_engines(server.app.wsgi())
 
 def post_fork(server, worker):
     """工作进程fork后的回调"""
     server.log.info("工作进程 %s 已启动", worker.pid)
 
 def post_worker_init(worker):
-    """工作进程初始化后的回调"""
-    pass
+    """工作进程初始化后的回调（开始接收请求之前）"""
+    from flaskr.utils.memory_watchdog import init_watchdog
+    from flaskr.utils.warmup import reset_engines_after_fork, warm_up
+
+    app = worker.wsgi
+    if not hasattr(app, 'app_context'):
+        return
+    reset_engines_after_fork(app)
+    if os.getenv('GUNICORN_WARMUP', 'true').lower() == 'true':
+        warm_up(app)
+    # 接收流量前完成第一轮就绪检查并启动后台检查线程
+    probe = app.extensions.get('readiness_probe')
+    if probe is not None:
+        probe.ensure_started()
+
+    # 定时任务调度器（各工作进程选主，只有一个进程执行任务）
+    from flaskr.crons import start_scheduler
+    start_scheduler(app)
+
+    init_watchdog(app)
+
+def worker_exit(server, worker):
+    """工作进程退出时的回调"""
+    # 释放定时任务锁，其他工作进程可以立即接替
+    from flaskr.crons import stop_scheduler
+    stop_scheduler()
+
+    # 输出错误日志聚合中尚未结束窗口的汇总，避免进程退出时丢失被抑制的次数
+    app = worker.wsgi
+    throttle = getattr(app, 'extensions', {}).get('error_log_throttle')
+    if throttle is not None:
+        throttle.stop()
+        throttle.flush()
+
+def post_request(worker, req, environ, resp):
+    """请求处理完成后的回调"""
+    from flaskr.utils.memory_watchdog import get_watchdog
+
+    watchdog = get_watchdog()
+    if watchdog is None:
+        return
+    reason = watchdog.after_request()
+    if reason:
+        # 处理完当前请求后退出，由主进程拉起新的工作进程
+        worker.log.info("工作进程 %s 因内存（%s）将被回收", worker.pid, reason)
+        worker.alive = False
 
 def worker_abort(worker):
     """工作进程异常退出时的回调"""
@@ -0,0 +1,41 @@
+"""
+测试夹具
+"""
+import pytest
+
+from flaskr import create_app
+from flaskr.extensions import db
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--check-startup',
+        action='store_true',
+        default=False,
+        help='运行冷启动耗时预算测试（STARTUP_BUDGET_MS）'
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--check-startup'):
+        return
+    skip = pytest.mark.skip(reason='需要 --check-startup 选项')
+    for item in items:
+        if 'startup_budget' in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'startup_budget: 冷启动耗时预算测试')
+
+
+@pytest.fixture
+def app():
+    """测试应用（pytest-flask 基于该夹具提供 client）"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,37 @@
+"""
+准入控制测试
+"""
+import time
+
+from flaskr.middleware.admission import parse_request_start
+
+
+def test_parse_request_start_units():
+    """支持秒、毫秒、微秒时间戳"""
+    now = 1700000010.0
+    assert parse_request_start('t=1700000009.5', now) == 500.0
+    assert parse_request_start('1700000009500', now) == 500.0
+    assert parse_request_start('t=1700000009500000', now) == 500.0
+    assert parse_request_start('garbage', now) is None
+    assert parse_request_start(None, now) is None
+
+
+def test_low_priority_shed_before_critical(client):
+    """排队时间过长时拒绝列表接口，认证接口仍然放行"""
+    queued = {'X-Request-Start': f't={time.time() - 2:.3f}'}
+
+    response = client.get('/api/users', headers=queued)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+    response = client.get('/api/users/search?q=a', headers=queued)
+    assert response.status_code == 503
+
+    response = client.get('/api/auth/me', headers=queued)
+    assert response.status_code == 401
+
+
+def test_in_flight_released(app, client):
+    """请求结束后释放并发计数"""
+    client.get('/api/health')
+    assert app.extensions['admission_controller'].in_flight == 0
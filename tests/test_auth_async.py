@@ -0,0 +1,85 @@
+"""
+异步认证接口测试
+"""
+import asyncio
+
+from sqlalchemy import create_engine
+
+from flaskr.core.async_db import AsyncDatabase, derive_async_url
+from flaskr.extensions import db
+
+
+def test_derive_async_url():
+    """异步URL推导"""
+    assert derive_async_url('sqlite:///dev.db') == 'sqlite+aiosqlite:///dev.db'
+    assert derive_async_url('postgresql://u:p@h/db') == 'postgresql+asyncpg://u:p@h/db'
+    assert derive_async_url('sqlite:///:memory:') is None
+
+
+def test_async_register_login_me(client):
+    """异步注册、登录与获取当前用户（内存SQLite回退到同步引擎）"""
+    response = client.post('/api/async/auth/register', json={
+        'username': 'asyncuser',
+        'email': 'async@example.com',
+        'password': 'asyncpass123'
+    })
+    assert response.status_code == 201
+
+    response = client.post('/api/async/auth/login', json={
+        'username': 'asyncuser',
+        'password': 'wrong-password'
+    })
+    assert response.status_code == 401
+
+    response = client.post('/api/async/auth/login', json={
+        'username': 'asyncuser',
+        'password': 'asyncpass123'
+    })
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['refresh_token']
+
+    response = client.get('/api/async/auth/me', headers={
+        'Authorization': f"Bearer {data['access_token']}"
+    })
+    assert response.status_code == 200
+    assert response.get_json()['data']['user']['is_locked'] is False
+
+
+def test_async_engine_runs_on_background_loop(tmp_path):
+    """异步驱动在后台事件循环中执行，跨请求循环复用连接池"""
+    url = f'sqlite:///{tmp_path}/async.db'
+    db.metadata.create_all(create_engine(url))
+    async_db = AsyncDatabase(derive_async_url(url))
+
+    def count_users(conn):
+        return conn.exec_driver_sql('SELECT COUNT(*) FROM users').scalar()
+
+    try:
+        # 模拟两个请求各自的事件循环
+        assert asyncio.run(async_db.run(count_users)) == 0
+        assert asyncio.run(async_db.run(count_users)) == 0
+        assert async_db.is_async
+    finally:
+        async_db.dispose()
+
+
+def test_async_refresh_rotates_opaque_token(client):
+    """异步刷新接口与同步接口一样轮换不透明刷新token"""
+    response = client.post('/api/async/auth/register', json={
+        'username': 'asyncrotator',
+        'email': 'asyncrotator@example.com',
+        'password': 'asyncpass123'
+    })
+    refresh_token = response.get_json()['data']['refresh_token']
+
+    response = client.post('/api/async/auth/refresh', json={'refresh_token': refresh_token})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['access_token'] and data['refresh_token'] != refresh_token
+
+    response = client.post('/api/async/auth/refresh', json={'refresh_token': refresh_token})
+    assert response.status_code == 401
+
+    response = client.post('/api/async/auth/refresh', json={})
+    assert response.status_code == 401
@@ -0,0 +1,24 @@
+"""
+基准测试工具测试
+"""
+from benchmarks.run import compare_with_baseline, percentile
+
+
+def _report(p99, rps, queries):
+    return {'results': {'me': {'p99_ms': p99, 'throughput_rps': rps, 'queries_per_request': queries}}}
+
+
+def test_percentile():
+    """最近秩百分位"""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 99) == 0.0
+
+
+def test_compare_with_baseline():
+    """超过阈值或查询数增加视为退化"""
+    baseline = _report(10.0, 100.0, 2.0)
+    assert compare_with_baseline(_report(11.0, 95.0, 2.0), baseline, 0.2) == []
+    assert len(compare_with_baseline(_report(13.0, 100.0, 2.0), baseline, 0.2)) == 1
+    assert len(compare_with_baseline(_report(10.0, 70.0, 3.0), baseline, 0.2)) == 2
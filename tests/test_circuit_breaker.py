@@ -0,0 +1,85 @@
+"""
+数据库熔断器测试
+"""
+import threading
+from types import SimpleNamespace
+
+from flaskr.utils import circuit_breaker as cb
+from flaskr.utils.circuit_breaker import CircuitBreaker
+
+
+def test_state_transitions(monkeypatch):
+    """连续失败后熔断，超时后放行一个探测请求，探测成功后恢复"""
+    clock = {'now': 0.0}
+    monkeypatch.setattr(cb.time, 'monotonic', lambda: clock['now'])
+
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=10, latency_threshold_ms=100)
+    breaker.record_failure()
+    breaker.record_success(latency_ms=500)
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    clock['now'] = 10.0
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    clock['now'] = 20.0
+    assert breaker.allow()
+    breaker.record_success(latency_ms=5)
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_open_circuit_rejects_db_routes_only(app, client):
+    """熔断期间数据库接口返回503，健康检查继续服务并报告状态"""
+    breaker = app.extensions['db_circuit_breaker']
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    response = client.post('/api/auth/login', json={'username': 'user', 'password': 'password123'})
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+
+    response = client.get('/api/health')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['status'] == 'degraded'
+    assert data['database']['state'] == 'open'
+
+
+
+def test_only_request_connection_errors_count(app):
+    """只有请求中的连接错误计入熔断：后台调用与语句超时不计"""
+    from sqlalchemy import create_engine, exc as sa_exc, text
+
+    engine = create_engine('sqlite://')
+    breaker = CircuitBreaker('test', failure_threshold=1)
+    cb.install_circuit_breaker(engine, breaker)
+
+    def fail():
+        with engine.connect() as conn:
+            try:
+                # SQLite 对不存在的表抛出 OperationalError
+                conn.execute(text('SELECT * FROM missing'))
+            except sa_exc.OperationalError:
+                pass
+
+    # 后台线程没有请求上下文
+    thread = threading.Thread(target=fail)
+    thread.start()
+    thread.join()
+    assert breaker.state == 'closed'
+    with app.test_request_context():
+        fail()
+    assert breaker.state == 'open'
+
+    canceled = SimpleNamespace(pgcode='57014')
+    context = SimpleNamespace(
+        is_disconnect=False, original_exception=canceled,
+        sqlalchemy_exception=sa_exc.OperationalError('SELECT 1', {}, canceled)
+    )
+    assert not cb._is_connection_error(context)
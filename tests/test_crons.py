@@ -0,0 +1,97 @@
+"""
+定时任务调度器测试
+"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from flaskr.crons import FileLeaderLock, Job, Scheduler
+from flaskr.crons.leader import create_leader_lock
+from flaskr.extensions import db
+from flaskr.models.auth import RefreshToken
+from flaskr.models.user import User
+
+
+def test_file_leader_lock_single_holder(tmp_path):
+    """同一锁文件只有一个持有者，释放后可被接替"""
+    path = str(tmp_path / 'cron.lock')
+    first, second = FileLeaderLock(path), FileLeaderLock(path)
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+    first.release()
+    assert second.try_acquire()
+    second.release()
+
+
+def test_file_leader_lock_defaults_to_instance_path(app, tmp_path):
+    """默认锁文件位于应用的 instance 目录，不跟随符号链接"""
+    app.instance_path = str(tmp_path / 'instance')
+    app.config.update(CRON_LEADER_LOCK='file', CRON_LOCK_FILE=None)
+    lock = create_leader_lock(app)
+    assert lock.path == os.path.join(app.instance_path, 'cron.lock')
+    assert lock.try_acquire()
+    assert os.stat(lock.path).st_mode & 0o777 == 0o600
+    lock.release()
+
+    target = tmp_path / 'target'
+    target.write_text('keep')
+    link = tmp_path / 'link.lock'
+    link.symlink_to(target)
+    with pytest.raises(OSError):
+        FileLeaderLock(str(link)).try_acquire()
+    assert target.read_text() == 'keep'
+
+
+def test_overlapping_run_skipped(app, tmp_path):
+    """同一任务上一次未结束时跳过"""
+    calls = []
+    job = Job('noop', lambda: calls.append(1), interval=60)
+    scheduler = Scheduler(app, FileLeaderLock(str(tmp_path / 'cron.lock')), {'noop': job})
+
+    job.running = True
+    scheduler._submit(job)
+    assert calls == []
+
+    job.running = False
+    scheduler.run_job(job)
+    assert calls == [1]
+    assert job.last_duration_ms is not None
+    scheduler.stop()
+
+
+def test_cleanup_expired_tokens_job(app, tmp_path):
+    """清理任务只删除过期token"""
+    from flaskr.crons.scheduler import registered_jobs
+    import flaskr.crons.jobs  # noqa: F401
+
+    user = User(username='cron', email='cron@example.com')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    db.session.add_all([
+        RefreshToken(user_id=user.id, token='expired', expires_at=datetime.utcnow() - timedelta(days=1)),
+        RefreshToken(user_id=user.id, token='valid', expires_at=datetime.utcnow() + timedelta(days=1)),
+    ])
+    db.session.commit()
+
+    job = registered_jobs()['cleanup_expired_tokens']
+    Scheduler(app, FileLeaderLock(str(tmp_path / 'cron.lock')), {}).run_job(job)
+
+    assert job.last_error is None
+    assert [t.token for t in RefreshToken.query.all()] == ['valid']
+
+
+def test_advisory_lock_uses_dedicated_engine(app):
+    """advisory lock 的连接不占用请求连接池"""
+    from sqlalchemy.pool import NullPool
+
+    from flaskr.crons.leader import AdvisoryLeaderLock, create_leader_lock
+
+    app.config['CRON_LEADER_LOCK'] = 'postgres'
+    lock = create_leader_lock(app)
+    assert isinstance(lock, AdvisoryLeaderLock)
+    assert lock.engine is not db.engine
+    assert isinstance(lock.engine.pool, NullPool)
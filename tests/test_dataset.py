@@ -0,0 +1,68 @@
+"""
+合成数据生成测试
+"""
+from sqlalchemy import create_engine, func, select
+
+from flaskr.commands import register_commands
+from flaskr.core.dataset import DATASET_PASSWORD, DatasetSpec, generate_dataset, precompute_password_hashes
+from flaskr.extensions import db
+from flaskr.models.auth import LoginAttempt, RefreshToken, UserLockout
+from flaskr.models.user import User
+
+
+def test_generate_dataset_in_process(app):
+    """生成的数据满足外键关系，合成用户可以用统一密码登录"""
+    spec = DatasetSpec(users=500, attempts=2000, lockout_rate=0.2, password_hashes=precompute_password_hashes(1))
+    counts = generate_dataset(db.engine, spec, chunk_size=300)
+
+    assert counts['users'] == User.query.count() == 500
+    assert counts['login_attempts'] == LoginAttempt.query.count() == 2000
+    assert counts['refresh_tokens'] == RefreshToken.query.count()
+    assert 0 < counts['user_lockouts'] == UserLockout.query.count() < 500
+    orphans = db.session.scalar(
+        select(func.count(RefreshToken.id)).where(RefreshToken.user_id.not_in(select(User.id)))
+    )
+    assert orphans == 0
+
+    user = db.session.get(User, 1)
+    assert user.username == 'user1'
+    assert user.check_password(DATASET_PASSWORD)
+    success_rate = LoginAttempt.query.filter_by(success=True).count() / 2000
+    assert 0.7 < success_rate < 0.9
+
+
+def test_generate_dataset_is_deterministic_across_processes(tmp_path):
+    """相同种子在不同进程数下生成相同数据；再次生成时ID接续"""
+    hashes = precompute_password_hashes(1)
+
+    def run(name, processes):
+        engine = create_engine(f'sqlite:///{tmp_path / name}')
+        db.metadata.create_all(engine)
+        spec = DatasetSpec(users=300, attempts=1000, password_hashes=hashes)
+        generate_dataset(engine, spec, processes=processes, chunk_size=100)
+        return engine
+
+    serial, parallel = run('serial.db', 1), run('parallel.db', 3)
+    query = 'SELECT username, ip_address, success FROM login_attempts ORDER BY username, ip_address, attempted_at'
+    with serial.connect() as a, parallel.connect() as b:
+        assert a.exec_driver_sql(query).fetchall() == b.exec_driver_sql(query).fetchall()
+
+    generate_dataset(serial, DatasetSpec(users=10, attempts=0, password_hashes=hashes))
+    with serial.connect() as conn:
+        assert conn.exec_driver_sql('SELECT count(*), max(id) FROM users').one() == (310, 310)
+
+
+def test_generate_command_refuses_production(app):
+    """生产配置下没有 --force 时拒绝生成"""
+    register_commands(app)
+    app.testing = False
+    result = app.test_cli_runner().invoke(args=['dataset', 'generate', '--users', '5', '--attempts', '5'])
+    assert result.exit_code != 0
+    assert '--force' in result.output
+    assert db.session.query(User).count() == 0
+
+    result = app.test_cli_runner().invoke(args=[
+        'dataset', 'generate', '--users', '5', '--attempts', '5', '--force'
+    ])
+    assert result.exit_code == 0, result.output
+    assert db.session.query(User).count() == 5
@@ -0,0 +1,44 @@
+"""
+请求截止时间测试
+"""
+import pytest
+from sqlalchemy import text
+
+from flaskr.extensions import db
+from flaskr.utils.deadline import DeadlineExceeded, _statement_timeout_to_set, reset_deadline, start_deadline
+
+
+def test_sqlite_statement_interrupted(app):
+    """超过截止时间时中断正在执行的SQLite语句"""
+    slow_query = text(
+        'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n'
+    )
+    token = start_deadline(50)
+    try:
+        with pytest.raises(DeadlineExceeded) as exc_info:
+            db.session.execute(slow_query)
+    finally:
+        reset_deadline(token)
+        db.session.rollback()
+    assert exc_info.value.stage == 'db'
+
+    # 截止时间清除后连接可以继续使用
+    assert db.session.execute(text('SELECT 1')).scalar() == 1
+
+
+def test_route_over_budget_fails_fast(app, client):
+    """超过路由预算的请求返回503"""
+    app.config['ROUTE_DEADLINES_MS'] = {'login_route': 0.001}
+    response = client.post('/api/auth/login', json={'username': 'nobody', 'password': 'password123'})
+    assert response.status_code == 503
+    assert response.get_json()['success'] is False
+
+
+def test_statement_timeout_follows_remaining_budget():
+    """事务中剩余预算减少后重新设置语句超时，变化很小时不重复设置"""
+    info = {}
+    assert _statement_timeout_to_set(info, 100.0, 2000) == 2000
+    assert _statement_timeout_to_set(info, 100.0, 1980) is None
+    assert _statement_timeout_to_set(info, 100.0, 1500) == 1500
+    # 新的请求（截止时间不同）总是重新设置
+    assert _statement_timeout_to_set(info, 200.0, 1500) == 1500
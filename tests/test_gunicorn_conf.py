@@ -0,0 +1,55 @@
+"""
+gunicorn 配置钩子测试
+"""
+import logging
+import os
+import runpy
+from types import SimpleNamespace
+
+import pytest
+
+from flaskr import crons
+from flaskr.utils import memory_watchdog
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py')
+
+
+@pytest.fixture
+def conf(monkeypatch):
+    # 配置文件会写入 GUNICORN_WORKERS / GUNICORN_THREADS，测试结束后恢复
+    monkeypatch.setenv('GUNICORN_WORKERS', '2')
+    monkeypatch.setenv('GUNICORN_THREADS', '1')
+    monkeypatch.setenv('GUNICORN_WARMUP', 'false')
+    monkeypatch.setattr(memory_watchdog, '_watchdog', None)
+    yield runpy.run_path(CONF_PATH)
+    crons.stop_scheduler()
+
+
+def test_hooks_run(app, conf, tmp_path):
+    """各钩子可以执行：工作进程初始化后启动调度器与内存看门狗，退出时停止调度器"""
+    app.config.update(CRON_LOCK_FILE=str(tmp_path / 'cron.lock'), MEMORY_CEILING_MB=512,
+                      MEMORY_RECYCLE_STATE_FILE=str(tmp_path / 'recycle.json'))
+    log = logging.getLogger('gunicorn.test')
+    worker = SimpleNamespace(pid=os.getpid(), wsgi=app, log=log, alive=True)
+    server = SimpleNamespace(log=log, cfg=SimpleNamespace(preload_app=False), app=None)
+
+    conf['when_ready'](server)
+    conf['pre_fork'](server, worker)
+    conf['post_fork'](server, worker)
+    conf['post_worker_init'](worker)
+    assert crons._scheduler is not None
+    assert memory_watchdog.get_watchdog() is not None
+
+    conf['post_request'](worker, None, {}, None)
+    assert worker.alive
+
+    throttle = app.extensions['error_log_throttle']
+    throttle.log(logging.INFO, (404, '<unmatched>', '1.2.3.4'), 'Not Found: %s', '/x')
+    throttle.log(logging.INFO, (404, '<unmatched>', '1.2.3.4'), 'Not Found: %s', '/x')
+
+    conf['worker_int'](worker)
+    conf['worker_abort'](worker)
+    conf['worker_exit'](server, worker)
+    assert crons._scheduler is None
+    # 退出时输出尚未结束窗口的汇总
+    assert throttle.stats()['tracked_keys'] == 0
@@ -0,0 +1,40 @@
+"""
+存活/就绪探针测试
+"""
+
+
+def test_live_probe(client):
+    """存活探针不经过Flask中间件（没有安全响应头）"""
+    response = client.get('/api/health/live')
+    assert response.status_code == 200
+    assert response.get_json()['data']['status'] == 'alive'
+    assert 'X-Content-Type-Options' not in response.headers
+
+
+def test_ready_probe_cached(app, client):
+    """就绪探针返回缓存的检查结果"""
+    probe = app.extensions['readiness_probe']
+    try:
+        response = client.get('/api/health/ready')
+        assert response.status_code == 200
+        checks = response.get_json()['data']['checks']
+        assert set(checks) == {'database', 'pool', 'rate_limit_storage', 'log_disk'}
+        assert all(check['ok'] for check in checks.values())
+
+        checked_at = probe.checked_at
+        client.get('/api/health/ready')
+        assert probe.checked_at == checked_at
+    finally:
+        probe.stop()
+
+
+def test_ready_probe_reports_failure(app, client):
+    """依赖检查失败时返回503"""
+    probe = app.extensions['readiness_probe']
+    probe.checks = {'database': lambda app: (False, {'circuit': 'open'})}
+    try:
+        response = client.get('/api/health/ready')
+        assert response.status_code == 503
+        assert response.get_json()['data']['status'] == 'not_ready'
+    finally:
+        probe.stop()
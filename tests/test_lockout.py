@@ -0,0 +1,67 @@
+"""
+登录失败计数与锁定测试
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from flaskr.core.auth import is_account_locked, record_failed_login, reset_failed_logins
+from flaskr.extensions import db
+from flaskr.models.auth import UserLockout
+from flaskr.models.user import User
+
+
+def _create_user():
+    user = User(username='locked', email='locked@example.com')
+    user.set_password('Password123!')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_failed_logins_lock_and_reset(app):
+    """达到上限时在SQL中设置锁定时间，成功登录后重置"""
+    user = _create_user()
+    conn = db.session.connection()
+    now = datetime.utcnow()
+
+    assert record_failed_login(conn, user.id, 3, 10, now) == (1, None)
+    assert record_failed_login(conn, user.id, 3, 10, now) == (2, None)
+    assert record_failed_login(conn, user.id, 3, 10, now) == (3, now + timedelta(minutes=10))
+    assert is_account_locked(conn, user.id)
+
+    reset_failed_logins(conn, user.id)
+    db.session.commit()
+    lockout = UserLockout.query.filter_by(user_id=user.id).one()
+    assert (lockout.failed_attempts, lockout.locked_until) == (0, None)
+
+
+def test_login_endpoint_locks_account(app, client):
+    """连续输错密码后账号被锁定，正确密码也无法登录"""
+    app.config['MAX_LOGIN_ATTEMPTS'] = 2
+    _create_user()
+    for _ in range(2):
+        response = client.post('/api/auth/login', json={'username': 'locked', 'password': 'wrong-password'})
+    assert response.status_code == 401
+    assert '锁定' in response.get_json()['message']
+
+    response = client.post('/api/auth/login', json={'username': 'locked', 'password': 'Password123!'})
+    assert response.status_code == 401
+
+
+def test_concurrent_failures_are_not_lost(tmp_path):
+    """并发的失败请求不会丢失计数"""
+    engine = create_engine(f'sqlite:///{tmp_path / "lockout.db"}', connect_args={'timeout': 30})
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert().values(id=1, username='u', email='u@example.com', password_hash='x'))
+
+    def fail(_):
+        with engine.begin() as conn:
+            return record_failed_login(conn, 1, 100, 10)[0]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        counts = list(pool.map(fail, range(40)))
+
+    assert sorted(counts) == list(range(1, 41))
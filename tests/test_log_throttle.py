@@ -0,0 +1,71 @@
+"""
+日志限流测试
+"""
+import logging
+
+from flaskr.utils import log_throttle
+from flaskr.utils.log_throttle import LogThrottle
+
+
+def test_identical_events_are_aggregated(caplog):
+    """窗口内相同事件只输出一次，flush时输出汇总"""
+    logger = logging.getLogger('tests.log_throttle')
+    throttle = LogThrottle(logger, window=60)
+
+    with caplog.at_level(logging.INFO, logger='tests.log_throttle'):
+        for _ in range(5):
+            throttle.log(logging.INFO, (404, '<unmatched>', '1.2.3.4'), 'Not Found: %s', '/x')
+        throttle.log(logging.INFO, (404, '<unmatched>', '5.6.7.8'), 'Not Found: %s', '/y')
+        assert len(caplog.records) == 2
+
+        stats = throttle.stats()
+        assert stats['events'] == 6
+        assert stats['suppressed'] == 4
+        assert stats['keys']['404,<unmatched>,1.2.3.4']['window_count'] == 5
+
+        throttle.flush()
+
+    summaries = [r for r in caplog.records if '已抑制 4 次' in r.getMessage()]
+    assert len(summaries) == 1
+
+
+def test_summary_emitted_without_further_events(caplog, monkeypatch):
+    """窗口结束后由后台线程输出汇总，不依赖下一次事件"""
+    clock = {'now': 0.0}
+    monkeypatch.setattr(log_throttle.time, 'monotonic', lambda: clock['now'])
+    logger = logging.getLogger('tests.log_throttle')
+    throttle = LogThrottle(logger, window=60)
+
+    with caplog.at_level(logging.INFO, logger='tests.log_throttle'):
+        for _ in range(3):
+            throttle.log(logging.INFO, (404, '<unmatched>', '1.2.3.4'), 'Not Found: %s', '/x')
+        assert throttle._thread.is_alive()
+        throttle.stop()
+
+        throttle.sweep()
+        assert not any('已抑制' in r.getMessage() for r in caplog.records)
+        clock['now'] = 60.0
+        throttle.sweep()
+
+    assert any('已抑制 2 次' in r.getMessage() for r in caplog.records)
+    assert throttle.stats()['tracked_keys'] == 0
+
+
+def test_not_found_flood_is_counted(client):
+    """404洪泛计入指标"""
+    for _ in range(3):
+        assert client.get('/no-such-page').status_code == 404
+
+    data = client.get('/api/metrics').get_json()['data']
+    throttle_stats = data['collectors']['error_log_throttle']
+    assert throttle_stats['keys']['404,<unmatched>,127.0.0.1']['window_count'] == 3
+
+
+def test_metrics_require_token_outside_testing(app, client):
+    """开发、测试环境之外未配置令牌时拒绝访问指标"""
+    app.testing = False
+    assert client.get('/api/metrics').status_code == 403
+
+    app.config['METRICS_TOKEN'] = 'secret'
+    assert client.get('/api/metrics').status_code == 401
+    assert client.get('/api/metrics', headers={'X-Metrics-Token': 'secret'}).status_code == 200
@@ -0,0 +1,151 @@
+"""
+登录暴力破解限流测试
+"""
+import os
+
+import pytest
+from flask import Flask, request
+
+from flaskr.extensions import db
+from flaskr.middleware import register_proxy_fix
+from flaskr.models.auth import LoginAttempt
+from flaskr.models.user import User
+from flaskr.utils.login_throttle import (
+    LoginThrottle, LoginThrottled, SlidingWindowCounter, client_ip, get_login_throttle
+)
+
+
+def test_sliding_window_counter():
+    """计数在窗口滚动后按比例衰减，reset 清除计数"""
+    counter = SlidingWindowCounter(slots=64)
+    for _ in range(4):
+        counter.incr('u:alice', 60, now=600)
+    assert counter.get('u:alice', 60, now=600) == 4
+    assert counter.get('u:bob', 60, now=600) == 0
+
+    # 下一窗口过去一半：上一窗口计数按一半计入
+    assert counter.get('u:alice', 60, now=690) == 2
+    assert counter.incr('u:alice', 60, now=690) == 3
+    # 两个窗口之后全部过期
+    assert counter.get('u:alice', 60, now=800) == 0
+
+    counter.reset('u:alice')
+    assert counter.get('u:alice', 60, now=690) == 0
+
+
+def test_counter_shared_through_file(tmp_path):
+    """同一文件上的计数器共享计数（对应同一台机器的多个工作进程）"""
+    path = str(tmp_path / 'throttle.bin')
+    first = SlidingWindowCounter(path, slots=64)
+    second = SlidingWindowCounter(path, slots=64)
+    first.incr('ip:10.0.0.1', 60, now=600)
+    second.incr('ip:10.0.0.1', 60, now=600)
+    assert first.get('ip:10.0.0.1', 60, now=600) == 2
+
+
+def test_throttle_limits():
+    """用户名与IP分别计数，成功登录只清除用户名计数"""
+    throttle = LoginThrottle(SlidingWindowCounter(slots=64), username_limit=2, ip_limit=3, window_seconds=60)
+    throttle.record_failure('Alice', '10.0.0.1')
+    throttle.record_failure('alice', '10.0.0.1')
+    with pytest.raises(LoginThrottled) as exc:
+        throttle.check('alice', '10.0.0.2')
+    assert 0 < exc.value.retry_after <= 61
+
+    throttle.record_success('alice')
+    throttle.check('alice', '10.0.0.2')
+    throttle.record_failure('bob', '10.0.0.1')
+    with pytest.raises(LoginThrottled) as exc:
+        throttle.check('carol', '10.0.0.1')
+    assert 0 < exc.value.retry_after <= 61
+
+
+def test_login_endpoint_throttled_before_database(app, client):
+    """超过阈值后直接返回429，不再记录登录尝试"""
+    app.config.update(MAX_LOGIN_ATTEMPTS=2, LOGIN_THROTTLE_USERNAME_FACTOR=1)
+    app.extensions.pop('login_throttle', None)
+
+    for _ in range(2):
+        response = client.post('/api/auth/login', json={'username': 'ghost', 'password': 'wrong'})
+        assert response.status_code == 401
+
+    attempts = db.session.query(LoginAttempt).count()
+    response = client.post('/api/auth/login', json={'username': 'ghost', 'password': 'wrong'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    assert db.session.query(LoginAttempt).count() == attempts
+
+
+def test_successful_login_resets_username(app, client):
+    """成功登录后该用户名的失败计数清零"""
+    app.config.update(MAX_LOGIN_ATTEMPTS=3, LOGIN_THROTTLE_USERNAME_FACTOR=1)
+    app.extensions.pop('login_throttle', None)
+    user = User(username='throttled', email='throttled@example.com')
+    user.set_password('Password123!')
+    db.session.add(user)
+    db.session.commit()
+
+    client.post('/api/auth/login', json={'username': 'throttled', 'password': 'wrong'})
+    response = client.post('/api/auth/login', json={'username': 'throttled', 'password': 'Password123!'})
+    assert response.status_code == 200
+    assert get_login_throttle(app).counter.get('u:throttled', 180) == 0
+
+
+def test_counter_file_must_be_safe(tmp_path):
+    """共享内存文件不跟随符号链接，拒绝其他用户可写的文件"""
+    target = tmp_path / 'target.bin'
+    target.write_bytes(b'')
+    link = tmp_path / 'link.bin'
+    link.symlink_to(target)
+    with pytest.raises(OSError):
+        SlidingWindowCounter(str(link), slots=64)
+
+    writable = tmp_path / 'writable.bin'
+    writable.write_bytes(b'')
+    os.chmod(writable, 0o666)
+    with pytest.raises(PermissionError):
+        SlidingWindowCounter(str(writable), slots=64)
+
+
+def test_shared_file_defaults_to_instance_path(app, tmp_path):
+    """默认共享内存文件位于应用的 instance 目录；文件不安全时退回进程内计数"""
+    app.instance_path = str(tmp_path / 'instance')
+    app.config.update(LOGIN_THROTTLE_SHARED=True, LOGIN_THROTTLE_FILE=None)
+    app.extensions.pop('login_throttle', None)
+    assert get_login_throttle(app).counter.path == os.path.join(app.instance_path, 'login-throttle.bin')
+
+    unsafe = tmp_path / 'unsafe.bin'
+    unsafe.write_bytes(b'')
+    os.chmod(unsafe, 0o666)
+    app.config['LOGIN_THROTTLE_FILE'] = str(unsafe)
+    app.extensions.pop('login_throttle', None)
+    assert get_login_throttle(app).counter.path is None
+
+
+def test_spoofed_forwarded_for_is_ignored(app, client):
+    """未配置可信代理时忽略伪造的 X-Forwarded-For，仍按连接IP限流"""
+    app.config.update(MAX_LOGIN_ATTEMPTS=1, LOGIN_THROTTLE_USERNAME_FACTOR=5, LOGIN_THROTTLE_IP_FACTOR=2)
+    app.extensions.pop('login_throttle', None)
+    statuses = [
+        client.post(
+            '/api/auth/login',
+            json={'username': f'ghost{i}', 'password': 'wrong'},
+            headers={'X-Forwarded-For': f'203.0.113.{i}'}
+        ).status_code
+        for i in range(5)
+    ]
+    assert statuses == [401, 401, 429, 429, 429]
+
+    with app.test_request_context(headers={'X-Forwarded-For': '203.0.113.7'}, environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        assert client_ip() == '10.0.0.1'
+
+
+def test_proxy_fix_uses_forwarded_client_ip():
+    """配置可信代理层数后 remote_addr 取 X-Forwarded-For 中的客户端IP"""
+    proxied = Flask(__name__)
+    proxied.config['TRUSTED_PROXY_COUNT'] = 1
+    register_proxy_fix(proxied)
+    proxied.add_url_rule('/ip', 'ip', lambda: request.remote_addr)
+
+    response = proxied.test_client().get('/ip', headers={'X-Forwarded-For': '198.51.100.1, 203.0.113.7'})
+    assert response.get_data(as_text=True) == '203.0.113.7'
@@ -0,0 +1,66 @@
+"""
+工作进程内存看门狗测试
+"""
+import os
+
+from flaskr.utils import memory_watchdog
+from flaskr.utils.memory_watchdog import MemoryWatchdog, read_rss_bytes
+
+
+def test_read_rss_bytes():
+    """能读取当前进程RSS"""
+    assert read_rss_bytes() > 0
+
+
+def test_ceiling_recycles_once_per_interval(tmp_path, monkeypatch):
+    """超过上限时回收，且同一台机器在最小间隔内只回收一个进程"""
+    monkeypatch.setattr(memory_watchdog, 'read_rss_bytes', lambda: 200 * 1024 * 1024)
+    state_path = str(tmp_path / 'recycle.json')
+
+    first = MemoryWatchdog(ceiling_mb=100, check_interval=1, ceiling_jitter=0, state_path=state_path)
+    second = MemoryWatchdog(ceiling_mb=100, check_interval=1, ceiling_jitter=0, state_path=state_path)
+
+    assert first.after_request() == 'ceiling'
+    assert second.after_request() is None
+
+    state = first.state.read()
+    assert state['reasons'] == {'ceiling': 1}
+    assert state['deferred'] == {'ceiling': 1}
+
+
+def test_growth_rate(tmp_path, monkeypatch):
+    """增长速度超过阈值时回收"""
+    clock = {'now': 0.0, 'rss': 100 * 1024 * 1024}
+    monkeypatch.setattr(memory_watchdog.time, 'monotonic', lambda: clock['now'])
+    monkeypatch.setattr(memory_watchdog, 'read_rss_bytes', lambda: clock['rss'])
+
+    watchdog = MemoryWatchdog(ceiling_mb=0, growth_mb_per_min=10, check_interval=1,
+                              growth_window_seconds=60, state_path=str(tmp_path / 'recycle.json'))
+    assert watchdog.after_request() is None
+
+    clock['now'], clock['rss'] = 60.0, clock['rss'] + 5 * 1024 * 1024
+    assert watchdog.after_request() is None
+
+    clock['now'], clock['rss'] = 90.0, clock['rss'] + 20 * 1024 * 1024
+    assert watchdog.after_request() == 'growth'
+
+
+def test_state_file_defaults_to_instance_path(app, tmp_path, monkeypatch):
+    """默认状态文件位于应用的 instance 目录；文件不安全时退回进程内状态"""
+    monkeypatch.setattr(memory_watchdog, '_watchdog', None)
+    app.instance_path = str(tmp_path / 'instance')
+    app.config.update(MEMORY_CEILING_MB=512, MEMORY_RECYCLE_STATE_FILE=None)
+    watchdog = memory_watchdog.init_watchdog(app)
+    assert watchdog.state.path == os.path.join(app.instance_path, 'memory-recycle.json')
+    assert os.stat(watchdog.state.path).st_mode & 0o777 == 0o600
+
+    target = tmp_path / 'target.json'
+    target.write_text('{}')
+    link = tmp_path / 'link.json'
+    link.symlink_to(target)
+    app.config['MEMORY_RECYCLE_STATE_FILE'] = str(link)
+    watchdog = memory_watchdog.init_watchdog(app)
+    assert watchdog.state.path is None
+    assert watchdog.state.try_acquire('ceiling', 30)
+    assert not watchdog.state.try_acquire('ceiling', 30)
+    assert target.read_text() == '{}'
@@ -0,0 +1,33 @@
+"""
+请求分析钩子测试
+"""
+import os
+
+from flaskr import create_app
+from flaskr.middleware.profiler import sign_profile_token, verify_profile_token
+
+
+def test_profile_token_signature():
+    """签名校验"""
+    token = sign_profile_token('secret')
+    assert verify_profile_token('secret', token)
+    assert not verify_profile_token('other', token)
+    assert not verify_profile_token('secret', '0:' + token.split(':')[1])
+
+
+def test_signed_request_writes_profile(tmp_path):
+    """携带签名头的请求输出pstats文件"""
+    app = create_app('testing')
+    app.config.update(PROFILER_ENABLED=True, PROFILER_SECRET='secret', PROFILER_OUTPUT_DIR=str(tmp_path))
+    # 配置在create_app之后修改，需要重新注册钩子
+    from flaskr.middleware.profiler import register_profiler
+    register_profiler(app)
+
+    client = app.test_client()
+    client.get('/api/health')
+    assert os.listdir(tmp_path) == []
+
+    client.get('/api/health', headers={'X-Profile-Token': sign_profile_token('secret')})
+    files = os.listdir(tmp_path)
+    assert len(files) == 1
+    assert files[0].startswith('main_health_check_route-')
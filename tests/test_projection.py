@@ -0,0 +1,73 @@
+"""
+列投影读取测试
+"""
+from datetime import datetime
+
+from flask_jwt_extended import create_access_token
+
+from flaskr.extensions import db
+from flaskr.models.user import User
+from flaskr.utils.data_masking import USER_FIELD_MASKERS, mask_user_data
+from flaskr.utils.projection import RowSerializer
+
+
+def _add_users(count):
+    for i in range(count):
+        user = User(username=f'member{i}', email=f'member{i}@example.com', password_hash='x',
+                    last_login=datetime(2024, 1, 1) if i % 2 else None)
+        db.session.add(user)
+    db.session.commit()
+
+
+def test_serializer_matches_to_dict(app):
+    """投影序列化结果与 to_dict + mask_user_data 一致"""
+    _add_users(3)
+    serializer = RowSerializer.for_model(User, User.PUBLIC_FIELDS, USER_FIELD_MASKERS)
+    rows = db.session.execute(serializer.select().order_by(User.id)).all()
+
+    expected = [mask_user_data(user.to_dict()) for user in User.query.order_by(User.id)]
+    assert serializer.dump_many(rows) == expected
+    assert 'password_hash' not in str(serializer.select())
+    # 同一组合复用已编译的序列化器
+    assert RowSerializer.for_model(User, User.PUBLIC_FIELDS, USER_FIELD_MASKERS) is serializer
+
+
+def test_get_users_paginates_projected_rows(app, client):
+    """列表接口按ID分页，返回脱敏后的数据"""
+    _add_users(5)
+    token = create_access_token(identity='1')
+    response = client.get('/api/users?page=2&per_page=2', headers={'Authorization': f'Bearer {token}'})
+
+    data = response.get_json()['data']
+    assert response.status_code == 200
+    assert (data['total'], data['pages'], data['page']) == (5, 3, 2)
+    assert [u['id'] for u in data['users']] == [3, 4]
+    assert data['users'][0]['email'] == 'm*****2@example.com'
+
+    response = client.get('/api/users/99', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 404
+
+
+def test_sparse_fieldsets_and_etag(app, client):
+    """?fields= 限制查询与返回的字段，ETag 随字段集合变化，If-None-Match 命中返回304"""
+    _add_users(2)
+    headers = {'Authorization': f"Bearer {create_access_token(identity='1')}"}
+
+    response = client.get('/api/users?fields=username,id', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['data']['users'][0] == {'id': 1, 'username': 'member0'}
+    etag = response.headers['ETag']
+
+    response = client.get('/api/users?fields=id,username', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    response = client.get('/api/users?fields=id', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+    response = client.get('/api/users/2?fields=email', headers=headers)
+    assert response.get_json()['data'] == {'email': 'm*****1@example.com'}
+
+    response = client.get('/api/users?fields=id,password_hash', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == {'fields': ['password_hash']}
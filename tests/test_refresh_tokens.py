@@ -0,0 +1,144 @@
+"""
+刷新token数量限制与轮换测试
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, text
+
+from flaskr.commands import register_commands
+from flaskr.core.token import TokenService, token_cache
+from flaskr.extensions import db
+from flaskr.models.auth import RefreshToken
+from flaskr.models.user import User
+
+
+def _create_user():
+    user = User(username='rotator', email='rotator@example.com')
+    user.set_password('Password123!')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_create_prunes_oldest_tokens(app):
+    """超过上限时删除最旧的token，已撤销的token一并删除"""
+    app.config['MAX_ACTIVE_REFRESH_TOKENS'] = 3
+    user = _create_user()
+    tokens = [TokenService.create_refresh_token(user.id) for _ in range(5)]
+
+    remaining = [t.token_digest for t in RefreshToken.query.order_by(RefreshToken.id)]
+    assert remaining == [RefreshToken.digest(t) for t in tokens[-3:]]
+
+    TokenService.revoke_refresh_token(tokens[-1])
+    TokenService.create_refresh_token(user.id)
+    assert RefreshToken.query.count() == 3
+    assert RefreshToken.query.filter_by(token_digest=RefreshToken.digest(tokens[-1])).first() is None
+
+
+def test_rotation_is_single_use(app):
+    """轮换后旧token失效，新token可用"""
+    user = _create_user()
+    token = TokenService.create_refresh_token(user.id)
+
+    user_id, new_token, error = TokenService.rotate_refresh_token(token)
+    assert (user_id, error) == (user.id, None)
+    assert new_token != token
+
+    assert TokenService.rotate_refresh_token(token)[2] is not None
+    assert TokenService.rotate_refresh_token(new_token)[0] == user.id
+
+
+def test_refresh_endpoint_rotates_opaque_token(app, client):
+    """刷新接口接受请求体中的不透明token并返回新的一对token"""
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=1)
+    response = client.post('/api/auth/register', json={
+        'username': 'rotator', 'email': 'rotator@example.com', 'password': 'Password123!'
+    })
+    refresh_token = response.get_json()['data']['refresh_token']
+
+    response = client.post('/api/auth/refresh', json={'refresh_token': refresh_token})
+    data = response.get_json()['data']
+    assert response.status_code == 200
+    assert data['access_token'] and data['refresh_token'] != refresh_token
+
+    response = client.post('/api/auth/refresh', json={'refresh_token': refresh_token})
+    assert response.status_code == 401
+
+    response = client.post('/api/auth/refresh', json={})
+    assert response.status_code == 401
+
+
+def test_tokens_stored_as_digest_with_legacy_backfill(app):
+    """新token只保存摘要；旧版原文token迁移前可用，迁移后按摘要查找"""
+    user = _create_user()
+    token = TokenService.create_refresh_token(user.id)
+    stored = RefreshToken.query.one()
+    assert stored.token is None and len(stored.token_digest) == 32
+
+    db.session.add(RefreshToken(
+        user_id=user.id, token='legacy-token', expires_at=datetime.utcnow() + timedelta(days=1)
+    ))
+    db.session.commit()
+    app.config['REFRESH_TOKEN_LEGACY_LOOKUP'] = True
+    assert TokenService.validate_refresh_token('legacy-token')[1] is None
+
+    token_cache.clear()
+    assert TokenService.backfill_digests(batch_size=1) == 1
+    legacy = RefreshToken.query.filter_by(token_digest=RefreshToken.digest('legacy-token')).one()
+    assert legacy.token is None
+    app.config['REFRESH_TOKEN_LEGACY_LOOKUP'] = False
+    assert TokenService.validate_refresh_token('legacy-token')[0].user_id == user.id
+    assert TokenService.validate_refresh_token(token)[0].user_id == user.id
+
+
+def test_validation_cache_is_updated_on_revoke(app):
+    """验证结果被缓存，本进程撤销后立即失效"""
+    token_cache.clear()
+    user = _create_user()
+    token = TokenService.create_refresh_token(user.id)
+    assert TokenService.validate_refresh_token(token)[1] is None
+
+    # 缓存命中时不访问数据库
+    RefreshToken.query.delete()
+    db.session.commit()
+    assert TokenService.validate_refresh_token(token)[1] is None
+
+    TokenService.revoke_refresh_token(token)
+    assert TokenService.validate_refresh_token(token)[0] is None
+    assert TokenService.validate_refresh_token('unknown')[0] is None
+
+
+def test_migrate_digests_upgrades_legacy_schema(app):
+    """旧版表结构（token 原文非空且有唯一索引）升级后按摘要查找"""
+    db.session.execute(text('DROP TABLE refresh_tokens'))
+    db.session.execute(text(
+        'CREATE TABLE refresh_tokens (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES users (id), '
+        'token VARCHAR(255) NOT NULL, expires_at DATETIME NOT NULL, created_at DATETIME, revoked BOOLEAN)'
+    ))
+    db.session.execute(text('CREATE UNIQUE INDEX ix_refresh_tokens_token ON refresh_tokens (token)'))
+    user = _create_user()
+    db.session.execute(text(
+        "INSERT INTO refresh_tokens (user_id, token, expires_at, revoked) "
+        "VALUES (:user_id, 'legacy-token', :expires, 0)"
+    ), {'user_id': user.id, 'expires': datetime.utcnow() + timedelta(days=1)})
+    db.session.commit()
+
+    register_commands(app)
+    result = app.test_cli_runner().invoke(args=['tokens', 'migrate-digests'])
+    assert result.exit_code == 0, result.output
+    assert '已迁移 1 个刷新token' in result.output
+
+    inspector = inspect(db.engine)
+    indexes = {index['name']: index for index in inspector.get_indexes('refresh_tokens')}
+    assert 'ix_refresh_tokens_token' not in indexes
+    assert indexes['ix_refresh_tokens_token_digest']['unique']
+
+    token_cache.clear()
+    app.config['REFRESH_TOKEN_LEGACY_LOOKUP'] = False
+    assert TokenService.validate_refresh_token('legacy-token')[0].user_id == user.id
+    assert TokenService.create_refresh_token(user.id)
+
+    # 已是新结构时重复执行不做修改
+    result = app.test_cli_runner().invoke(args=['tokens', 'migrate-digests'])
+    assert result.exit_code == 0, result.output
+    assert '表结构' not in result.output
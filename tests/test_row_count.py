@@ -0,0 +1,61 @@
+"""
+分页总数统计策略测试
+"""
+from flask_jwt_extended import create_access_token
+
+from flaskr.extensions import db
+from flaskr.models.user import User
+from flaskr.utils.row_count import count_rows, invalidate_count
+
+
+def _add_users(count, start=0):
+    for i in range(start, start + count):
+        db.session.add(User(username=f'counted{i}', email=f'counted{i}@example.com', password_hash='x'))
+    db.session.commit()
+
+
+def test_cached_count_until_invalidated(app):
+    """缓存策略在TTL内返回旧值，失效后重新计数"""
+    invalidate_count(User)
+    _add_users(3)
+    assert count_rows(User, 'cached') == (3, 'cached')
+
+    _add_users(2, start=3)
+    assert count_rows(User, 'cached') == (3, 'cached')
+    assert count_rows(User, 'exact') == (5, 'exact')
+
+    invalidate_count(User)
+    assert count_rows(User, 'cached') == (5, 'cached')
+
+
+def test_estimated_count_uses_statistics(app):
+    """估算策略读取 ANALYZE 统计；没有统计时退回缓存，小表精确计数"""
+    invalidate_count(User)
+    _add_users(4)
+    assert count_rows(User, 'estimated') == (4, 'cached')
+
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+    assert count_rows(User, 'estimated') == (4, 'exact')
+
+    app.config['COUNT_EXACT_BELOW'] = 2
+    _add_users(1, start=4)
+    # 统计信息未更新，返回估算值
+    assert count_rows(User, 'estimated') == (4, 'estimated')
+
+
+def test_list_reports_count_strategy(app, client):
+    """列表响应说明总数的来源，注册后缓存失效"""
+    invalidate_count(User)
+    app.config['COUNT_STRATEGY'] = 'cached'
+    headers = {'Authorization': f"Bearer {create_access_token(identity='1')}"}
+
+    data = client.get('/api/users', headers=headers).get_json()['data']
+    assert (data['total'], data['count_strategy']) == (0, 'cached')
+
+    response = client.post('/api/auth/register', json={
+        'username': 'newcomer', 'email': 'newcomer@example.com', 'password': 'Password123!'
+    })
+    assert response.status_code == 201, response.get_json()
+    data = client.get('/api/users', headers=headers).get_json()['data']
+    assert data['total'] == 1
@@ -0,0 +1,71 @@
+"""
+慢查询日志测试
+"""
+import json
+import os
+
+from sqlalchemy import create_engine, text
+
+from flaskr.commands import register_commands
+from flaskr.utils.slow_query import SlowQueryLog, init_slow_query_log, normalize_statement, resolve_log_file
+
+
+def test_normalize_statement():
+    """字面量与占位符列表被规范化"""
+    assert normalize_statement("SELECT * FROM users WHERE id IN (?, ?, ?) AND name = 'bob'  LIMIT 10") == \
+        'SELECT * FROM users WHERE id IN (?) AND name = ? LIMIT ?'
+
+
+def test_slow_queries_logged_with_plan_and_reported(app, tmp_path):
+    """慢查询写入日志文件（含执行计划），并可通过命令行汇总"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)'))
+
+    log_file = tmp_path / 'slow_queries.jsonl'
+    slow_query_log = SlowQueryLog(threshold_ms=0, log_file=str(log_file))
+    slow_query_log.install(engine)
+
+    with engine.connect() as conn:
+        for i in range(3):
+            conn.execute(text('SELECT name FROM items WHERE id = :id'), {'id': i})
+    slow_query_log.flush()
+
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    selects = [r for r in records if r['normalized'].startswith('SELECT name')]
+    assert len(selects) == 3
+    assert selects[0]['plan']
+
+    register_commands(app)
+    result = app.test_cli_runner().invoke(args=['slow-queries', 'report', '--file', str(log_file), '--sort', 'count'])
+    assert result.exit_code == 0
+    assert 'count=3' in result.output
+
+
+def test_explain_plans_are_bounded(tmp_path):
+    """执行计划缓存按LRU淘汰"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)'))
+
+    slow_query_log = SlowQueryLog(max_plans=2)
+    slow_query_log._engine = engine
+    for column in ('id', 'name', 'id', 'name || id'):
+        statement = f'SELECT {column} FROM items WHERE id = ?'
+        slow_query_log._process({'statement': statement, 'parameters': (1,), 'normalized': statement})
+
+    assert list(slow_query_log._plans) == [
+        'SELECT id FROM items WHERE id = ?', 'SELECT name || id FROM items WHERE id = ?'
+    ]
+
+
+def test_relative_log_file_resolved_against_instance_path(app, tmp_path):
+    """相对路径的日志文件按 instance 目录解析"""
+    app.instance_path = str(tmp_path / 'instance')
+    app.config['SLOW_QUERY_LOG_FILE'] = 'slow/queries.jsonl'
+    slow_query_log = init_slow_query_log(app, create_engine(f"sqlite:///{tmp_path / 'slow.db'}"))
+    assert slow_query_log.log_file == os.path.join(app.instance_path, 'slow', 'queries.jsonl')
+    assert os.path.isdir(os.path.dirname(slow_query_log.log_file))
+
+    app.config['SLOW_QUERY_LOG_FILE'] = str(tmp_path / 'absolute.jsonl')
+    assert resolve_log_file(app) == str(tmp_path / 'absolute.jsonl')
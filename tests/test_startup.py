@@ -0,0 +1,48 @@
+"""
+启动耗时测试
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在全新的解释器中测量：导入 flaskr 并创建应用
+COLD_START_SCRIPT = '''
+import json, time
+started = time.perf_counter()
+from flaskr import create_app
+app = create_app('testing')
+print(json.dumps({
+    'total_ms': (time.perf_counter() - started) * 1000,
+    'create_app': app.extensions['startup_timings']
+}))
+'''
+
+
+def _cold_start():
+    output = subprocess.check_output(
+        [sys.executable, '-c', COLD_START_SCRIPT],
+        cwd=ROOT,
+        stderr=subprocess.DEVNULL
+    )
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def test_startup_phases_recorded(app):
+    """create_app 记录各阶段耗时"""
+    report = app.extensions['startup_timings']
+    phases = [p['phase'] for p in report['phases']]
+    assert phases == ['flask', 'basic_logging', 'config', 'logging', 'extensions', 'middlewares', 'blueprints']
+
+
+@pytest.mark.startup_budget
+def test_cold_start_within_budget():
+    """冷启动耗时不超过预算（取3次中的最小值以降低噪声）"""
+    budget_ms = float(os.environ.get('STARTUP_BUDGET_MS', '1500'))
+    runs = [_cold_start() for _ in range(3)]
+    best = min(runs, key=lambda r: r['total_ms'])
+    assert best['total_ms'] <= budget_ms, f"冷启动 {best['total_ms']:.0f}ms 超过预算 {budget_ms:.0f}ms: {best['create_app']}"
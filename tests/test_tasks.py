@@ -0,0 +1,75 @@
+"""
+后台任务队列测试
+"""
+from datetime import datetime, timedelta
+
+from flaskr.models.auth import LoginAttempt
+from flaskr.tasks import SQLiteTaskStore, TaskWorker, enqueue_many, get_task_store, registered_tasks, task
+
+calls = []
+
+
+@task(name='tests.flaky', max_retries=1)
+def flaky(value):
+    calls.append(value)
+    if value == 'bad':
+        raise ValueError('boom')
+
+
+def test_claim_visibility_timeout(tmp_path):
+    """可见性超时前不会被再次领取，超时后重新领取"""
+    store = SQLiteTaskStore(str(tmp_path / 'tasks.db'))
+    store.push('tests.flaky', '{"args": [1]}')
+
+    # 可见性超时已过（模拟工作进程异常退出）
+    assert len(store.claim(10, visibility_timeout=-1)) == 1
+
+    records = store.claim(10, visibility_timeout=60)
+    assert [record.attempts for record in records] == [2]
+    assert store.claim(10, visibility_timeout=60) == []
+    assert store.stats() == {'running': 1}
+
+
+def test_worker_retries_then_fails(app, tmp_path):
+    """成功的任务被删除，失败的任务重试后标记为失败"""
+    app.config['TASK_QUEUE_URL'] = f"sqlite:///{tmp_path / 'tasks.db'}"
+    enqueue_many('tests.flaky', [(['ok'], {}), (['bad'], {})])
+    store = get_task_store(app)
+
+    worker = TaskWorker(app, store, registered_tasks(), concurrency=2, backoff_base=0)
+    worker.run(max_batches=1)
+    assert sorted(calls) == ['bad', 'ok']
+    assert store.stats() == {'queued': 1}
+
+    worker = TaskWorker(app, store, registered_tasks(), concurrency=2, backoff_base=0)
+    worker.run(max_batches=1)
+    assert store.stats() == {'failed': 1}
+
+
+def test_login_attempt_written_by_task(app, client, tmp_path):
+    """AUDIT_ASYNC 开启时登录尝试由后台任务写入"""
+    app.config.update(AUDIT_ASYNC=True, TASK_QUEUE_URL=f"sqlite:///{tmp_path / 'tasks.db'}")
+
+    client.post('/api/auth/login', json={'username': 'ghost', 'password': 'password123'})
+    assert LoginAttempt.query.count() == 0
+
+    TaskWorker(app, get_task_store(app), registered_tasks()).run(max_batches=1)
+    assert LoginAttempt.query.filter_by(username='ghost').count() == 1
+
+
+def test_async_login_attempt_keeps_attempt_time(app, client, tmp_path, monkeypatch):
+    """异步登录同样遵循 AUDIT_ASYNC，记录的是登录发生的时间而不是任务执行的时间"""
+    app.config.update(AUDIT_ASYNC=True, TASK_QUEUE_URL=f"sqlite:///{tmp_path / 'tasks.db'}")
+
+    before = datetime.utcnow()
+    client.post('/api/async/auth/login', json={'username': 'ghost', 'password': 'password123'})
+    after = datetime.utcnow()
+    assert LoginAttempt.query.count() == 0
+
+    later = after + timedelta(hours=1)
+    monkeypatch.setattr('flaskr.tasks.audit.datetime', type('FakeDatetime', (datetime,), {
+        'utcnow': staticmethod(lambda: later)
+    }))
+    TaskWorker(app, get_task_store(app), registered_tasks()).run(max_batches=1)
+    attempt = LoginAttempt.query.filter_by(username='ghost').one()
+    assert before <= attempt.attempted_at <= after
@@ -0,0 +1,79 @@
+"""
+批量导入用户测试
+"""
+import json
+
+from flaskr.commands import register_commands
+from flaskr.core.user_import import UserImporter, read_records
+from flaskr.extensions import db
+from flaskr.models.user import User
+
+
+def _write_csv(path, rows):
+    lines = ['username,email,password'] + [','.join(row) for row in rows]
+    path.write_text('\n'.join(lines) + '\n')
+
+
+def test_import_deduplicates_and_validates(app, tmp_path):
+    """文件内重复、数据库已存在与无效的行被跳过"""
+    existing = User(username='taken', email='taken@example.com')
+    existing.set_password('password123')
+    db.session.add(existing)
+    db.session.commit()
+
+    path = tmp_path / 'users.csv'
+    _write_csv(path, [
+        ('alice', 'alice@example.com', 'password123'),
+        ('alice', 'alice2@example.com', 'password123'),
+        ('bob', 'not-an-email', 'password123'),
+        ('taken', 'other@example.com', 'password123'),
+        ('carol', 'carol@example.com', 'password123'),
+    ])
+
+    stats = UserImporter(chunk_size=2, processes=2, rounds=4).run(read_records(str(path)))
+
+    assert stats.to_dict() == {
+        'processed': 5, 'inserted': 2, 'invalid': 1, 'duplicate_in_file': 1, 'duplicate_in_db': 1
+    }
+    alice = User.query.filter_by(username='alice').one()
+    assert alice.check_password('password123')
+
+
+def test_import_resumes_from_checkpoint(app, tmp_path):
+    """从断点继续时跳过已处理的行"""
+    path = tmp_path / 'users.ndjson'
+    path.write_text('\n'.join(json.dumps({
+        'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'password123'
+    }) for i in range(4)))
+    checkpoint = tmp_path / 'users.checkpoint.json'
+    checkpoint.write_text(json.dumps({'offset': 2, 'stats': {'processed': 2, 'inserted': 2}}))
+
+    register_commands(app)
+    result = app.test_cli_runner().invoke(args=[
+        'users', 'import', str(path), '--processes', '1', '--checkpoint', str(checkpoint)
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert '从断点继续' in result.output
+    assert [u.username for u in User.query.order_by(User.username)] == ['user2', 'user3']
+    assert not checkpoint.exists()
+
+
+def test_resume_ignores_invalid_rows_before_checkpoint(app, tmp_path):
+    """断点之前的无效行不参与文件内去重，与从头导入结果一致"""
+    path = tmp_path / 'users.csv'
+    _write_csv(path, [
+        ('dave', 'not-an-email', 'password123'),
+        ('erin', 'erin@example.com', 'password123'),
+        ('dave', 'dave@example.com', 'password123'),
+    ])
+    checkpoint = tmp_path / 'users.checkpoint.json'
+    checkpoint.write_text(json.dumps({'offset': 2, 'stats': {'processed': 2, 'inserted': 1, 'invalid': 1}}))
+
+    stats = UserImporter(chunk_size=2, processes=1, rounds=4, checkpoint_path=str(checkpoint)).run(
+        read_records(str(path))
+    )
+
+    assert stats.duplicate_in_file == 0
+    assert stats.inserted == 2
+    assert User.query.filter_by(username='dave').one().email == 'dave@example.com'
@@ -0,0 +1,76 @@
+"""
+用户搜索测试
+"""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from flaskr.extensions import db
+from flaskr.models.search import SQLITE_TRIGRAM_SUPPORTED
+from flaskr.models.user import User
+
+
+@pytest.fixture
+def headers(app):
+    for username, email in [
+        ('alice', 'alice@example.com'),
+        ('alicia', 'a.smith@example.org'),
+        ('malice', 'm@example.net'),
+        ('bob', 'bob@alice.dev'),
+        ('carol', 'carol@example.com'),
+    ]:
+        db.session.add(User(username=username, email=email, password_hash='x'))
+    db.session.commit()
+    return {'Authorization': f"Bearer {create_access_token(identity='1')}"}
+
+
+def _search(client, headers, query):
+    response = client.get(f'/api/users/search?{query}', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['data']
+
+
+def test_search_ranks_exact_prefix_then_substring(client, headers):
+    """完全匹配、前缀匹配、子串匹配依次排序"""
+    data = _search(client, headers, 'q=alice&fields=id')
+    assert [u['id'] for u in data['users']] == [1, 3]
+    assert data['next_cursor'] is None
+
+    data = _search(client, headers, 'q=al&fields=id,username')
+    assert [u['id'] for u in data['users']] == [1, 2]
+    assert data['users'][1]['username'] == 'alicia'
+
+
+def test_search_keyset_pagination(client, headers):
+    """游标分页遍历全部结果且不重复"""
+    seen = []
+    cursor = ''
+    while True:
+        data = _search(client, headers, f'q=lic&limit=2&fields=id&cursor={cursor}')
+        seen += [u['id'] for u in data['users']]
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert sorted(seen) == [1, 2, 3]
+
+    response = client.get('/api/users/search?q=lic&cursor=bogus', headers=headers)
+    assert response.status_code == 400
+
+
+def test_search_does_not_match_email(client, headers):
+    """邮箱不参与搜索（避免按前缀还原脱敏的邮箱）"""
+    assert _search(client, headers, 'q=alice%40example.com&fields=id')['users'] == []
+    assert _search(client, headers, 'q=carol%40&fields=id')['users'] == []
+    assert _search(client, headers, 'q=example&fields=id')['users'] == []
+
+
+@pytest.mark.skipif(not SQLITE_TRIGRAM_SUPPORTED, reason='SQLite 不支持 trigram 分词')
+def test_search_index_follows_updates(client, headers):
+    """触发器在更新与删除时同步 FTS 索引"""
+    user = db.session.get(User, 5)
+    user.username = 'caroline'
+    db.session.commit()
+    assert [u['id'] for u in _search(client, headers, 'q=roli&fields=id')['users']] == [5]
+
+    db.session.delete(user)
+    db.session.commit()
+    assert _search(client, headers, 'q=roli&fields=id')['users'] == []
@@ -0,0 +1,49 @@
+"""
+工作进程预热测试
+"""
+import logging
+import warnings
+
+from sqlalchemy.exc import LegacyAPIWarning
+
+from flaskr.utils import warmup
+from flaskr.utils.warmup import warm_up
+
+
+def _failed_steps(caplog):
+    return [r.getMessage() for r in caplog.records if r.getMessage().startswith('预热步骤')]
+
+
+def test_warm_up_runs_all_steps(app, caplog):
+    """预热执行全部步骤且没有步骤失败"""
+    with caplog.at_level(logging.WARNING, logger='flaskr.utils.warmup'):
+        timings = warm_up(app)
+    assert set(timings) == {'connections', 'queries', 'jwt', 'imports', 'routing'}
+    assert _failed_steps(caplog) == []
+
+
+def test_hot_queries_avoid_legacy_api(app):
+    """热点查询不使用已废弃的 Query.get"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', LegacyAPIWarning)
+        warmup._compile_hot_queries()
+
+
+def test_warm_up_reports_failed_step(app, caplog, monkeypatch):
+    """步骤失败时记录告警，不中断其余步骤"""
+    def broken():
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(warmup, '_compile_hot_queries', broken)
+    with caplog.at_level(logging.WARNING, logger='flaskr.utils.warmup'):
+        timings = warm_up(app)
+    assert 'routing' in timings
+    assert _failed_steps(caplog) == ['预热步骤 queries 失败: boom']
+
+
+def test_first_request_latency_recorded(client):
+    """记录工作进程首个请求耗时"""
+    from flaskr.utils.metrics import metrics
+
+    client.get('/api/health')
+    assert 'first_request_ms' in metrics.snapshot()['gauges']